@@ -0,0 +1,132 @@
+import json
+import os
+import sys
+import time
+import traceback
+from typing import Callable
+
+from app.consts.bookmarks_consts import (
+    BOOKMARK_FINALIZER_LOCK_FILENAME,
+    BOOKMARK_FINALIZER_LOG_FILENAME,
+    BOOKMARK_FINALIZER_MARKER_FILENAME,
+    IS_DEBUG,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, finalize in the foreground
+    fcntl = None
+
+
+def get_bookmark_finalizer_lock_path(bookmark_path_slash_abs: str) -> str:
+    return os.path.join(bookmark_path_slash_abs, BOOKMARK_FINALIZER_LOCK_FILENAME)
+
+
+def get_bookmark_finalizer_marker_path(bookmark_path_slash_abs: str) -> str:
+    return os.path.join(bookmark_path_slash_abs, BOOKMARK_FINALIZER_MARKER_FILENAME)
+
+
+def get_bookmark_finalizer_log_path(bookmark_path_slash_abs: str) -> str:
+    return os.path.join(bookmark_path_slash_abs, BOOKMARK_FINALIZER_LOG_FILENAME)
+
+
+def run_detached_bookmark_finalizer(bookmark_path_slash_abs: str, finalize: Callable[[], int]) -> bool:
+    """
+    Run `finalize` (slow, non-interactive writes into the bookmark) in a forked child, so the prompt returns right away.
+    The child holds the bookmark's finalizer lock (flock) while it runs, logs to the bookmark's finalizer log, and
+    writes a completion marker with its result when done.
+    Returns: False if we can't detach here (no fork/flock) - the caller should finalize in the foreground.
+    """
+    if fcntl is None or not hasattr(os, "fork"):
+        return False
+
+    # Take the lock before forking, so that a `bm` started right after us can't slip in before the child holds it.
+    lock_file = open(get_bookmark_finalizer_lock_path(bookmark_path_slash_abs), "a")
+    fcntl.flock(lock_file, fcntl.LOCK_EX)
+    marker_path = get_bookmark_finalizer_marker_path(bookmark_path_slash_abs)
+    if os.path.exists(marker_path):
+        os.remove(marker_path)
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid:
+        # Parent: the child's copy of the lock file keeps the lock held.
+        lock_file.close()
+        if IS_DEBUG:
+            print(f"🔍 Finalizing in the background (pid {pid}), log: {get_bookmark_finalizer_log_path(bookmark_path_slash_abs)}")
+        return True
+
+    # Child: detach from the terminal, and never return into the caller's flow.
+    result = 1
+    start_time = time.perf_counter()
+    try:
+        os.setsid()
+        log_fd = os.open(get_bookmark_finalizer_log_path(bookmark_path_slash_abs), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(log_fd, sys.stdout.fileno())
+        os.dup2(log_fd, sys.stderr.fileno())
+        result = finalize()
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            with open(marker_path, "w") as f:
+                json.dump({"result": result, "pid": os.getpid(), "finished_at": time.time(),
+                           "seconds": time.perf_counter() - start_time}, f)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            lock_file.close()
+            os._exit(0)
+
+
+def wait_for_bookmark_finalizer(bookmark_path_slash_abs: str | None, is_report_failure: bool = True) -> int:
+    """
+    Before reading a bookmark's states: wait until a background finalizer (of a previous run) on it is done.
+    Only this bookmark's lock is waited on, so runs on other bookmarks are never held up.
+    A failed (or unfinished) finalizer is reported once: its marker is then flagged as reported, so the next call goes on.
+    is_report_failure: False from background processes that nobody sees, to leave the report for the next run.
+    Returns: 0, or 1 if the finalizer failed - the bookmark's redis_after may be missing or stale, don't read it.
+    """
+    if not bookmark_path_slash_abs or fcntl is None:
+        return 0
+    lock_path = get_bookmark_finalizer_lock_path(bookmark_path_slash_abs)
+    if not os.path.exists(lock_path):
+        return 0
+
+    with open(lock_path, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            if is_report_failure:
+                print(f"⏳ Waiting for the previous run's finalizer on {bookmark_path_slash_abs}...")
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    marker_path = get_bookmark_finalizer_marker_path(bookmark_path_slash_abs)
+    try:
+        with open(marker_path, "r") as f:
+            finalizer_marker = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        finalizer_marker = None
+
+    if finalizer_marker and (finalizer_marker.get("result") == 0 or finalizer_marker.get("is_reported")):
+        return 0
+    if not is_report_failure:
+        return 1
+
+    if finalizer_marker is None:
+        print(f"❌ The previous run's finalizer on {bookmark_path_slash_abs} did not finish, "
+              f"see {get_bookmark_finalizer_log_path(bookmark_path_slash_abs)}")
+        finalizer_marker = {"result": None}
+    else:
+        print(f"❌ The previous run's finalizer on {bookmark_path_slash_abs} failed, "
+              f"see {get_bookmark_finalizer_log_path(bookmark_path_slash_abs)}")
+
+    # Reported: don't hold up the next runs on this bookmark with the same failure.
+    try:
+        with open(marker_path, "w") as f:
+            json.dump({**finalizer_marker, "is_reported": True}, f)
+    except OSError:
+        pass
+    return 1
@@ -1,25 +1,29 @@
-import json
 import os
 import shutil
+from typing import Iterator
 
 from app.bookmarks.bookmark_dir_processes import get_all_valid_root_dir_names
 from app.bookmarks.bookmarks_meta import (
     load_bookmark_meta_from_abs,
     load_bookmark_meta_from_rel,
     load_folder_meta,
+    read_bookmark_meta_file,
 )
 from app.consts.bookmarks_consts import (
+    ABS_OBS_BOOKMARKS_DIR,
     IS_DEBUG,
     IS_DEBUG_PRINT_ALL_BOOKMARKS_JSON,
     REPO_ROOT,
 )
 from app.types.bookmark_types import (
     BookmarkInfo,
+    BookmarkListEntry,
     BookmarkPathDictionary,
     MatchedBookmarkObj,
 )
 from app.utils.decorators import memoize, print_def_name
 from app.utils.printing_utils import pprint, print_color
+from app.utils.sorting_utils import natural_sort_key
 
 IS_AGGREGATE_TAGS_AND_HOIST_GROUPED = True
 IS_PRINT_DEF_NAME = True
@@ -102,94 +106,105 @@ def get_all_shallow_bookmark_abs_paths_in_dir(
     return result
 
 
-@print_def_name(False)
-@memoize
-def get_all_live_bookmarks_in_json_format(_is_override_run_once: bool = False):
+def scan_live_bookmark_folder(folder_path: str, depth_left: int | None = None) -> dict:
     """
-    Recursively scan all live folders and build a nested JSON structure with folder and bookmark tags/descriptions, including aggregated tags as 'tags'.
+    Build the nested JSON node of a folder: its meta, bookmarks, and sub folders, with aggregated tags as 'tags'.
+    depth_left: how many more folder levels to load below this one (None: all). Sub folders past it are not read, they
+    become {"is_collapsed": True} nodes (bookmarks are always loaded with their folder).
     """
-    # TODO(MFB): Look into this, as this is likely a (relatively) VERY heavy operation.
-
-    def scan_folder(folder_path):
-        node = {}
-        # Add folder meta if present
-        folder_meta = load_folder_meta(folder_path)
-        folder_tags = set()
-        if folder_meta:
-            folder_tags = set(folder_meta.get("tags", []))
-            node["description"] = folder_meta.get("description", "")
-            node["video_filename"] = folder_meta.get("video_filename", "")
-
-        # List all items in this folder
-        try:
-            items = os.listdir(folder_path)
-        except Exception:
-            return node
+    node = {}
+    # Add folder meta if present
+    folder_meta = load_folder_meta(folder_path)
+    folder_tags = set()
+    if folder_meta:
+        folder_tags = set(folder_meta.get("tags", []))
+        node["description"] = folder_meta.get("description", "")
+        node["video_filename"] = folder_meta.get("video_filename", "")
+
+    # List all items in this folder
+    try:
+        items = os.listdir(folder_path)
+    except Exception:
+        return node
 
-        sub_dirs = {}
+    sub_dirs = {}
 
-        for item in items:
-            file_abs_path = os.path.join(folder_path, item)
-            if os.path.isdir(file_abs_path):
+    for item in items:
+        file_abs_path = os.path.join(folder_path, item)
+        if os.path.isdir(file_abs_path):
+            if depth_left == 0 and not os.path.exists(os.path.join(file_abs_path, "bookmark_meta.json")):
+                # Past the depth limit: don't read the folder
+                sub_dirs[item] = {"is_collapsed": True}
+            else:
                 # Recurse into subfolder
-                sub_dirs[item] = scan_folder(file_abs_path)
-            elif item == "bookmark_meta.json":
-                # This folder is a bookmark (leaf)
-                bookmark_meta = load_bookmark_meta_from_abs(folder_path)
-                if bookmark_meta:
-                    node.update(
-                        {
-                            "tags": bookmark_meta.get("tags", []),
-                            "description": bookmark_meta.get("description", ""),
-                            "timestamp": bookmark_meta.get("timestamp_formatted", ""),
-                            "video_filename": bookmark_meta.get("video_filename", ""),
-                            "type": "bookmark",
-                        }
-                    )
-                return node  # Do not process further, this is a bookmark
-
-        # Attach sub_dirs to node
-        for sub_dir_name, sub_dir_node in sub_dirs.items():
-            node[sub_dir_name] = sub_dir_node
-
-        if IS_AGGREGATE_TAGS_AND_HOIST_GROUPED:
-            # --- Tag aggregation logic ---
-            # Gather tags from all children (sub_dirs and bookmarks)
-            child_tag_sets = []
-            for sub_dir_node in sub_dirs.values():
-                child_tags = set(sub_dir_node.get("tags", []))
-                if child_tags:
-                    child_tag_sets.append(child_tags)
-
-            # Only hoist if there are children
-            if child_tag_sets:
-                grouped_tags = (
-                    set.intersection(*child_tag_sets) if child_tag_sets else set()
+                sub_dirs[item] = scan_live_bookmark_folder(
+                    file_abs_path, None if depth_left is None else max(depth_left - 1, 0))
+        elif item == "bookmark_meta.json":
+            # This folder is a bookmark (leaf)
+            bookmark_meta = load_bookmark_meta_from_abs(folder_path)
+            if bookmark_meta:
+                node.update(
+                    {
+                        "tags": bookmark_meta.get("tags", []),
+                        "description": bookmark_meta.get("description", ""),
+                        "timestamp": bookmark_meta.get("timestamp_formatted", ""),
+                        "video_filename": bookmark_meta.get("video_filename", ""),
+                        "type": "bookmark",
+                    }
+                )
+            return node  # Do not process further, this is a bookmark
+
+    # Attach sub_dirs to node
+    for sub_dir_name, sub_dir_node in sub_dirs.items():
+        node[sub_dir_name] = sub_dir_node
+
+    if IS_AGGREGATE_TAGS_AND_HOIST_GROUPED:
+        # --- Tag aggregation logic ---
+        # Gather tags from all children (sub_dirs and bookmarks)
+        child_tag_sets = []
+        for sub_dir_node in sub_dirs.values():
+            child_tags = set(sub_dir_node.get("tags", []))
+            if child_tags:
+                child_tag_sets.append(child_tags)
+
+        # Only hoist if there are children
+        if child_tag_sets:
+            grouped_tags = (
+                set.intersection(*child_tag_sets) if child_tag_sets else set()
+            )
+        else:
+            grouped_tags = set()
+
+        # Remove grouped_tags from all children
+        for sub_dir_node in sub_dirs.values():
+            if "tags" in sub_dir_node:
+                sub_dir_node["tags"] = list(
+                    set(sub_dir_node["tags"]) - grouped_tags
                 )
-            else:
-                grouped_tags = set()
 
-            # Remove grouped_tags from all children
-            for sub_dir_node in sub_dirs.values():
-                if "tags" in sub_dir_node:
-                    sub_dir_node["tags"] = list(
-                        set(sub_dir_node["tags"]) - grouped_tags
-                    )
+        # Combine folder's own tags and grouped tags, and unique-ify
+        all_tags = folder_tags.union(grouped_tags)
+        if all_tags:
+            node["tags"] = list(sorted(all_tags))
+        elif "tags" in node:
+            # Remove empty tags list if present
+            del node["tags"]
 
-            # Combine folder's own tags and grouped tags, and unique-ify
-            all_tags = folder_tags.union(grouped_tags)
-            if all_tags:
-                node["tags"] = list(sorted(all_tags))
-            elif "tags" in node:
-                # Remove empty tags list if present
-                del node["tags"]
+    return node
 
-        return node
+
+@print_def_name(False)
+@memoize
+def get_all_live_bookmarks_in_json_format(_is_override_run_once: bool = False):
+    """
+    Recursively scan all live folders and build a nested JSON structure with folder and bookmark tags/descriptions, including aggregated tags as 'tags'.
+    """
+    # TODO(MFB): Look into this, as this is likely a (relatively) VERY heavy operation.
 
     all_bookmarks = {}
     for folder_path in get_all_valid_root_dir_names():
         folder_name = os.path.basename(folder_path)
-        all_bookmarks[folder_name] = scan_folder(folder_path)
+        all_bookmarks[folder_name] = scan_live_bookmark_folder(folder_path)
 
     if IS_DEBUG_PRINT_ALL_BOOKMARKS_JSON:
         global has_printed_all_bookmarks_json
@@ -205,6 +220,82 @@ def get_all_live_bookmarks_in_json_format(_is_override_run_once: bool = False):
     return all_bookmarks
 
 
+@print_def_name(False)
+def get_scoped_live_bookmarks_in_json_format(
+    under_path_colon_rel: str | None = None,
+    depth: int | None = None,
+) -> dict:
+    """
+    Like get_all_live_bookmarks_in_json_format, but only loading what a scoped printout shows: the subtree of
+    `under_path_colon_rel` (all root folders if None), `depth` folder levels deep.
+    The folders above `under_path_colon_rel` are kept as bare nodes, so paths in the result stay library-relative.
+    """
+    if not under_path_colon_rel:
+        return {
+            os.path.basename(folder_path): scan_live_bookmark_folder(folder_path, depth)
+            for folder_path in get_all_valid_root_dir_names()
+        }
+
+    under_path_slash_abs = os.path.join(ABS_OBS_BOOKMARKS_DIR, *under_path_colon_rel.split(":"))
+    if not os.path.isdir(under_path_slash_abs):
+        print(f"❌ Folder not found: {under_path_colon_rel}")
+        return {}
+
+    scoped_bookmarks = scan_live_bookmark_folder(under_path_slash_abs, depth)
+    for folder_name in reversed(under_path_colon_rel.split(":")):
+        scoped_bookmarks = {folder_name: scoped_bookmarks}
+    return scoped_bookmarks
+
+
+def iter_live_bookmark_list_entries(under_path_colon_rel: str | None = None) -> Iterator[BookmarkListEntry]:
+    """
+    Walk the live folders (or the subtree of `under_path_colon_rel`) in natural order (see natural_sort_key), yielding each bookmark as soon as
+    its meta is read, so consumers get the first results right away and memory doesn't grow with the library.
+    """
+
+    def walk_folder(folder_path: str, folder_path_colon_rel: str, inherited_tags: frozenset[str]):
+        if os.path.exists(os.path.join(folder_path, "bookmark_meta.json")):
+            bookmark_meta = load_bookmark_meta_from_abs(folder_path) or {}
+            yield {
+                "bookmark_path_colon_rel": folder_path_colon_rel,
+                "tags": bookmark_meta.get("tags", []),
+                "inherited_tags": sorted(inherited_tags),
+                "description": bookmark_meta.get("description", ""),
+                "timestamp": bookmark_meta.get("timestamp"),
+                "timestamp_formatted": bookmark_meta.get("timestamp_formatted"),
+                "video_filename": bookmark_meta.get("video_filename"),
+                "has_redis_before": os.path.isfile(os.path.join(folder_path, "redis_before.json")),
+                "has_redis_after": os.path.isfile(os.path.join(folder_path, "redis_after.json")),
+                "has_screenshot": os.path.isfile(os.path.join(folder_path, "screenshot.jpg")),
+            }
+            return
+
+        folder_tags = inherited_tags | frozenset(load_folder_meta(folder_path).get("tags", []))
+        try:
+            entries = sorted(os.listdir(folder_path), key=natural_sort_key)
+        except OSError:
+            return
+        for entry in entries:
+            entry_path = os.path.join(folder_path, entry)
+            if os.path.isdir(entry_path):
+                yield from walk_folder(entry_path, f"{folder_path_colon_rel}:{entry}", folder_tags)
+
+    if under_path_colon_rel:
+        # The tags of the folders above the subtree still apply
+        inherited_tags = frozenset()
+        under_path_parts = under_path_colon_rel.split(":")
+        for part_index in range(1, len(under_path_parts)):
+            inherited_tags |= frozenset(load_folder_meta(
+                os.path.join(ABS_OBS_BOOKMARKS_DIR, *under_path_parts[:part_index])).get("tags", []))
+        under_path_slash_abs = os.path.join(ABS_OBS_BOOKMARKS_DIR, *under_path_parts)
+        if os.path.isdir(under_path_slash_abs):
+            yield from walk_folder(under_path_slash_abs, under_path_colon_rel, inherited_tags)
+        return
+
+    for folder_path in sorted(get_all_valid_root_dir_names(), key=lambda root_dir_path: natural_sort_key(os.path.basename(root_dir_path))):
+        yield from walk_folder(folder_path, os.path.basename(folder_path), frozenset())
+
+
 @print_def_name(IS_PRINT_DEF_NAME)
 def get_bookmark_info(
     cli_bookmark_obj: BookmarkPathDictionary,
@@ -221,12 +312,11 @@ def get_bookmark_info(
         return None
 
     try:
-        with open(meta_file, "r") as f:
-            meta_data = json.load(f)
-            return {
-                **cli_bookmark_obj,
-                "bookmark_info": meta_data,
-            }
+        meta_data = read_bookmark_meta_file(meta_file)
+        return {
+            **cli_bookmark_obj,
+            "bookmark_info": meta_data,
+        }
     except Exception as e:
         print(f"❌ Error loading bookmark metadata: {e}")
         return None
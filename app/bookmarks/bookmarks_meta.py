@@ -1,14 +1,65 @@
+import copy
 import json
 import os
+import time
 from datetime import datetime
 
-from app.consts.bookmarks_consts import IS_DEBUG, IS_DEBUG_FULL
+from app.consts.bookmarks_consts import IS_DEBUG, IS_DEBUG_FULL, LIBRARY_GENERATION_PATH
 from app.obs.videos import construct_full_video_file_path
 from app.types.bookmark_types import MatchedBookmarkObj
 from app.utils.decorators import print_def_name
 
 IS_PRINT_DEF_NAME = True
 
+# Parsed bookmark_meta.json files of this process: meta file path -> ((mtime_ns, size), parsed meta)
+parsed_bookmark_metas: dict[str, tuple[tuple[int, int], dict]] = {}
+
+
+def get_library_generation() -> str:
+    """
+    A token that changes whenever a bookmark or folder meta is written (see bump_library_generation).
+    """
+    try:
+        with open(LIBRARY_GENERATION_PATH, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def bump_library_generation() -> None:
+    """
+    Called after every meta write. A fresh unique token rather than a counter, so concurrent writers can't lose a bump.
+    """
+    try:
+        tmp_library_generation_path = f"{LIBRARY_GENERATION_PATH}.{os.getpid()}.tmp"
+        with open(tmp_library_generation_path, "w") as f:
+            f.write(f"{time.time_ns()}-{os.getpid()}")
+        os.replace(tmp_library_generation_path, LIBRARY_GENERATION_PATH)
+    except OSError as e:
+        print(f"⚠️  Could not bump the library generation: {e}")
+
+
+def read_bookmark_meta_file(meta_file: str) -> dict:
+    """
+    json.load of a bookmark_meta.json, reusing an earlier parse in this process while the file is unchanged (the tree,
+    matching, and navigation all read the same metas). Returns a copy that the caller may modify.
+    """
+    meta_file_stat = os.stat(meta_file)
+    meta_file_signature = (meta_file_stat.st_mtime_ns, meta_file_stat.st_size)
+    parsed_bookmark_meta = parsed_bookmark_metas.get(meta_file)
+    if parsed_bookmark_meta is None or parsed_bookmark_meta[0] != meta_file_signature:
+        with open(meta_file, 'r') as f:
+            parsed_bookmark_meta = (meta_file_signature, json.load(f))
+        parsed_bookmark_metas[meta_file] = parsed_bookmark_meta
+    return copy.deepcopy(parsed_bookmark_meta[1])
+
+
+def forget_parsed_bookmark_meta(meta_file: str) -> None:
+    """
+    After writing a meta: a rewrite within the same mtime tick, with the same size, would look unchanged.
+    """
+    parsed_bookmark_metas.pop(meta_file, None)
+
 
 @print_def_name(False) # This is loaded for all bookmarks to create a tree of bookmarks and tags.
 def load_folder_meta(folder_path):
@@ -32,8 +83,7 @@ def load_bookmark_meta_from_rel(bookmark_dir_rel):
     meta_file = os.path.join(bookmark_dir_rel, "bookmark_meta.json")
     if os.path.exists(meta_file):
         try:
-            with open(meta_file, 'r') as f:
-                meta_data = json.load(f)
+            meta_data = read_bookmark_meta_file(meta_file)
 
             if IS_DEBUG_FULL:
                 print(f"🔍 Debug - Loading bookmark metadata from: {meta_file}")
@@ -78,8 +128,7 @@ def load_bookmark_meta_from_abs(bookmark_path_abs):
     """Load bookmark metadata from bookmark_meta.json"""
     bookmark_meta_path = os.path.join(bookmark_path_abs, "bookmark_meta.json")
     if os.path.exists(bookmark_meta_path):
-        with open(bookmark_meta_path, 'r') as f:
-            return json.load(f)
+        return read_bookmark_meta_file(bookmark_meta_path)
     return None
 
 # TODO(KERCH): Implement is_patch_updates
@@ -126,6 +175,7 @@ def create_directory_meta(
     try:
         with open(dir_meta_file_path, 'w') as f:
             json.dump(meta_data, f, indent=2)
+        bump_library_generation()
         return True
     except Exception as e:
         print(f"❌ Error creating folder metadata: {e}")
@@ -158,6 +208,8 @@ def create_bookmark_meta(
 
     with open(meta_file, 'w') as f:
         json.dump(meta_data, f, indent=2)
+    bump_library_generation()
+    forget_parsed_bookmark_meta(meta_file)
 
     if IS_DEBUG:
         print(f"📋 Created bookmark metadata with tags: {tags}")
@@ -196,6 +248,8 @@ def update_bookmark_meta(
         meta_data["created_at"] = datetime.now().isoformat()
     with open(meta_file, 'w') as f:
         json.dump(meta_data, f, indent=2)
+    bump_library_generation()
+    forget_parsed_bookmark_meta(meta_file)
 
 
 @print_def_name(IS_PRINT_DEF_NAME)
@@ -231,6 +285,8 @@ def patch_bookmark_meta(
         meta_data["created_at"] = datetime.now().isoformat()
     with open(meta_file, 'w') as f:
         json.dump(meta_data, f, indent=2)
+    bump_library_generation()
+    forget_parsed_bookmark_meta(meta_file)
     if IS_DEBUG:
         print(f"📋 Patched bookmark metadata with tags: {tags}")
 
@@ -267,5 +323,7 @@ def update_missing_bookmark_meta_fields(
         meta_data["created_at"] = datetime.now().isoformat()
     with open(meta_file, 'w') as f:
         json.dump(meta_data, f, indent=2)
+    bump_library_generation()
+    forget_parsed_bookmark_meta(meta_file)
     if IS_DEBUG:
         print(f"📋 Patched bookmark metadata with tags: {tags}")
@@ -1,20 +1,30 @@
+import hashlib
 import json
 import os
+import sys
 
-from app.bookmarks.bookmarks import get_all_live_bookmarks_in_json_format
+from app.bookmarks.bookmark_dir_processes import get_all_valid_root_dir_names
+from app.bookmarks.bookmarks import (
+    get_all_live_bookmarks_in_json_format,
+    get_scoped_live_bookmarks_in_json_format,
+)
+from app.bookmarks.bookmarks_meta import get_library_generation
 from app.bookmarks.last_used import get_last_used_bookmark
+from app.bookmarks.tree_print_options import NEAR_DEFAULT_DEPTH, is_tree_print_scoped
 from app.consts.bookmarks_consts import (
     ABS_OBS_BOOKMARKS_DIR,
+    BOOKMARK_TREE_CACHE_PATH,
     HIDDEN_COLOR,
     IS_PRINT_JUST_CURRENT_DIRECTORY_BOOKMARKS,
     NON_NAME_BOOKMARK_KEYS,
     RESET_COLOR,
 )
 from app.tags.bookmark_tags import compute_hoistable_tags
-from app.types.bookmark_types import CurrentRunSettings
+from app.types.bookmark_types import CurrentRunSettings, TreePrintOptions
 from app.utils.bookmark_utils import abs_to_rel_path
 from app.utils.decorators import only_run_once, print_def_name
-from app.utils.printing_utils import get_embedded_bookmark_file_link, print_color
+from app.utils.printing_utils import get_color_text, get_embedded_bookmark_file_link
+from app.utils.sorting_utils import natural_sort_key
 
 IS_PRINT_VIDEO_FILE_NAMES = True
 IS_HOIST_TAGS_WHEN_SINGLE_CHILD = True
@@ -23,6 +33,9 @@ IS_HOIST_TAGS_WHEN_SINGLE_CHILD = True
 IS_DEBUG = True
 IS_PRINT_DEF_NAME = True
 
+# Bump when the rendering changes, to drop trees cached by an older version.
+BOOKMARK_TREE_CACHE_VERSION = 2
+
 
 @print_def_name(IS_PRINT_DEF_NAME)
 def is_ancestor_path(candidate, target):
@@ -30,72 +43,44 @@ def is_ancestor_path(candidate, target):
     return target == candidate or target.startswith(candidate + ":")
 
 
-@print_def_name(False)
-@only_run_once
-def print_all_live_directories_and_bookmarks(
-    is_print_just_current_directory_bookmarks=IS_PRINT_JUST_CURRENT_DIRECTORY_BOOKMARKS,
-    current_run_settings_obj: CurrentRunSettings | None = None,
-):
-    """Print all folders and their bookmarks, highlighting the current one"""
-    print("")
-    print("=" * 50)
-
-    # Get last used bookmark for highlighting if not provided with the current bookmark object.
-    if current_run_settings_obj is not None and current_run_settings_obj.get(
-        "current_bookmark_obj"
-    ):
-        current_bookmark_obj = (
-            current_run_settings_obj.get("current_bookmark_obj") or {}
-        )
-    else:
-        current_bookmark_obj = get_last_used_bookmark() or {}
-
-    current_bm_tail_name = current_bookmark_obj.get("bookmark_tail_name", None)
-    current_bm_dir_slash_abs = current_bookmark_obj.get("bookmark_dir_slash_abs", None)
-    current_bm_path_colon_rel = current_bookmark_obj.get(
-        "bookmark_path_colon_rel", None
-    )
-
-    all_bookmarks = get_all_live_bookmarks_in_json_format(_is_override_run_once=True)
+def render_bookmark_tree_entries(all_bookmarks) -> list[list]:
+    """
+    Render the bookmark tree once, independent of the current bookmark: a list of
+    [kind, dir_col_rel, bm_col_rel, text, current_text] entries, where kind is
+    - "line": always printed (blank lines, folder tags/descriptions)
+    - "dir": a folder line, green (current_text) when it leads to the current bookmark, hidden in just-current-directory mode otherwise
+    - "bookmark": a bookmark line, current_text when it is the current bookmark
+    - "bookmark_detail": a bookmark's description/tags, shown with its bookmark
+    The highlighting is applied per print (see print_all_live_directories_and_bookmarks), so the entries can be cached.
+    """
+    tree_entries = []
 
-    def print_tree_recursive(
+    def add_tree_recursive(
         indent_level,
         parent_bm_dir_name,
         parent_bm_dir_col_rel,
         bookmark_dir_json_without_parent,
-        inherited_tags=None,
     ):
         """
         bookmark_dir_json_without_parent: The JSON object for the current directory, without the parent directory.
         parent_bm_dir_name: The name of the parent directory.
         indent_level: The level of indentation for the current directory.
         parent_bm_dir_col_rel: The relative colon path of the parent directory.
-        current_bm_tail_name: The name of the current bookmark.
-        current_bm_dir_slash_abs: The absolute path of the current directory.
-        inherited_tags: The tags that are inherited from the parent directory.
         """
-
-        if inherited_tags is None:
-            inherited_tags = set()
         indent = "   " * indent_level
-        is_parent_dir_current = False
 
         if parent_bm_dir_name is not None:
-            # Is this the current directory/bookmark?
-            is_parent_dir_current = (
-                current_bm_path_colon_rel
-                and parent_bm_dir_col_rel
-                and current_bm_path_colon_rel.startswith(parent_bm_dir_col_rel)
-            )
             parent_bm_path_slash_abs = os.path.join(
                 ABS_OBS_BOOKMARKS_DIR, parent_bm_dir_col_rel.replace(":", "/")
             )
-
             parent_bm_dir_name_print_string = f"{indent}{get_embedded_bookmark_file_link(parent_bm_path_slash_abs, '📁')} {parent_bm_dir_name}"
-            if is_parent_dir_current:
-                print_color(parent_bm_dir_name_print_string, "green")
-            elif not is_print_just_current_directory_bookmarks:
-                print(parent_bm_dir_name_print_string)
+            if bookmark_dir_json_without_parent.get("is_collapsed"):
+                # Not loaded (past --depth)
+                parent_bm_dir_name_print_string += " …"
+            tree_entries.append([
+                "dir", parent_bm_dir_col_rel, None,
+                parent_bm_dir_name_print_string, get_color_text(parent_bm_dir_name_print_string, "green"),
+            ])
 
         # Recursively gather all tags in this folder
         bm_sub_dir_tags = set()
@@ -104,28 +89,18 @@ def print_all_live_directories_and_bookmarks(
             and bookmark_dir_json_without_parent["tags"]
         ):
             bm_sub_dir_tags = set(bookmark_dir_json_without_parent["tags"])
-        # TODO(MFB): Do we want to do this?
-        # else:
-        #     # Prefer node's own tags if present, else compute from children
-        #     all_tags = collect_all_bookmark_tags_recursive(bookmark_dir_json_without_parent)
-        #     bm_sub_dir_tags = set.intersection(*all_tags) if all_tags else set()
 
         if bm_sub_dir_tags:
-            print_color(
-                f"{indent}🏷️ {' '.join(f'•{tag}' for tag in sorted(bm_sub_dir_tags))}",
-                "cyan",
-            )
-
-        # effective_inherited_tags = inherited_tags | bm_sub_dir_tags
+            tree_entries.append(["line", None, None, get_color_text(
+                f"{indent}🏷️ {' '.join(f'•{tag}' for tag in sorted(bm_sub_dir_tags))}", "cyan"), None])
 
         # Print folder description
         if (
             "description" in bookmark_dir_json_without_parent
             and bookmark_dir_json_without_parent["description"]
         ):
-            print_color(
-                f"{indent}   {bookmark_dir_json_without_parent['description']}", "cyan"
-            )
+            tree_entries.append(["line", None, None, get_color_text(
+                f"{indent}   {bookmark_dir_json_without_parent['description']}", "cyan"), None])
 
         # Gather bookmarks and sub_dirs
         bookmarks_in_tree = []
@@ -147,9 +122,9 @@ def print_all_live_directories_and_bookmarks(
                         (sub_parent_bm_dir_name, sub_dir_json_without_parent)
                     )
 
-        # Print bookmarks_in_tree at this level (do NOT treat as folders)
-        for tree_bookmark_tail_name, tree_bookmark_json in sorted(bookmarks_in_tree):
-            # bookmark_tags = set(bookmark_info.get('tags', [])) - effective_inherited_tags
+        # Bookmarks at this level (do NOT treat as folders)
+        for tree_bookmark_tail_name, tree_bookmark_json in sorted(
+                bookmarks_in_tree, key=lambda bookmark_in_tree: natural_sort_key(bookmark_in_tree[0])):
             bookmark_tags = set(tree_bookmark_json.get("tags", []))
             timestamp = tree_bookmark_json.get("timestamp", "unknown time")
             if len(timestamp) < 5:
@@ -165,62 +140,189 @@ def print_all_live_directories_and_bookmarks(
                 ABS_OBS_BOOKMARKS_DIR, tree_bm_path_slash_rel
             )
 
-            is_current = (
-                parent_bm_dir_col_rel
-                and current_bm_path_colon_rel
-                and current_bm_path_colon_rel.startswith(tree_bm_path_col_rel)
-            )
-
-            if is_print_just_current_directory_bookmarks and not is_parent_dir_current:
-                continue
-
             hidden_ref_text = f" {HIDDEN_COLOR} {tree_bm_path_col_rel}{RESET_COLOR}"
-            if is_current:
-                print(
-                    f"\033[32m{indent}   • {timestamp} {get_embedded_bookmark_file_link(tree_bm_path_slash_abs, '📖')} {tree_bookmark_tail_name} (current)\033[0m"
-                    + hidden_ref_text
-                )
-            else:
-                print(
-                    f"{indent}   • {timestamp} {get_embedded_bookmark_file_link(tree_bm_path_slash_abs, '📖')} {tree_bookmark_tail_name} {hidden_ref_text}"
-                )
+            tree_entries.append([
+                "bookmark", parent_bm_dir_col_rel, tree_bm_path_col_rel,
+                f"{indent}   • {timestamp} {get_embedded_bookmark_file_link(tree_bm_path_slash_abs, '📖')} {tree_bookmark_tail_name} {hidden_ref_text}",
+                f"\033[32m{indent}   • {timestamp} {get_embedded_bookmark_file_link(tree_bm_path_slash_abs, '📖')} {tree_bookmark_tail_name} (current)\033[0m"
+                + hidden_ref_text,
+            ])
 
             bookmark_description = tree_bookmark_json.get("description", "")
             if bookmark_description:
-                print_color(f"{indent}      {bookmark_description}", "cyan")
+                tree_entries.append(["bookmark_detail", parent_bm_dir_col_rel, None,
+                                     get_color_text(f"{indent}      {bookmark_description}", "cyan"), None])
             if bookmark_tags:
-                print_color(
-                    f"{indent}      🏷️ {' '.join(f'•{tag}' for tag in sorted(bookmark_tags))}",
-                    "cyan",
-                )
+                tree_entries.append(["bookmark_detail", parent_bm_dir_col_rel, None, get_color_text(
+                    f"{indent}      🏷️ {' '.join(f'•{tag}' for tag in sorted(bookmark_tags))}", "cyan"), None])
 
         # Recurse into sub_dirs_in_tree
-        for sub_dir_name, sub_dir_node in sorted(sub_dirs_in_tree):
+        for sub_dir_name, sub_dir_node in sorted(sub_dirs_in_tree, key=lambda sub_dir_in_tree: natural_sort_key(sub_dir_in_tree[0])):
             next_path = (
                 f"{parent_bm_dir_col_rel}:{sub_dir_name}"
                 if parent_bm_dir_col_rel
                 else sub_dir_name
             )
-            print_tree_recursive(
+            add_tree_recursive(
                 indent_level=indent_level + 1,
                 parent_bm_dir_name=sub_dir_name,
                 parent_bm_dir_col_rel=next_path,
                 bookmark_dir_json_without_parent=sub_dir_node,
-                # inherited_tags=effective_inherited_tags
             )
 
-    # Start printing from the root level
-    for parent_bm_dir_name, sub_dir_json_without_parent in all_bookmarks.items():
-        print("")
-        print_tree_recursive(
+    # Start from the root level
+    for parent_bm_dir_name, sub_dir_json_without_parent in sorted(
+            all_bookmarks.items(), key=lambda root_dir_in_tree: natural_sort_key(root_dir_in_tree[0])):
+        tree_entries.append(["line", None, None, "", None])
+        add_tree_recursive(
             indent_level=0,
             parent_bm_dir_name=parent_bm_dir_name,
             parent_bm_dir_col_rel=parent_bm_dir_name,
             bookmark_dir_json_without_parent=sub_dir_json_without_parent,
         )
 
-    print("")
-    print("=" * 50)
+    return tree_entries
+
+
+def add_folder_stats_to_digest(folder_path: str, folder_stats_digest) -> None:
+    """
+    Stat-only walk of a live folder (no meta parsing): every sub folder's mtime, which changes when anything is added,
+    removed, or renamed in it, and the mtime and size of every bookmark_meta.json / folder_meta.json.
+    """
+    try:
+        with os.scandir(folder_path) as folder_entries:
+            entries = sorted(folder_entries, key=lambda entry: entry.name)
+    except OSError:
+        return
+
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                folder_stats_digest.update(f"{entry.name}/{entry.stat().st_mtime_ns}\n".encode("utf-8"))
+                add_folder_stats_to_digest(entry.path, folder_stats_digest)
+                folder_stats_digest.update(b"..\n")
+            elif entry.name in ("bookmark_meta.json", "folder_meta.json"):
+                entry_stat = entry.stat()
+                folder_stats_digest.update(f"{entry.name}:{entry_stat.st_mtime_ns}:{entry_stat.st_size}\n".encode("utf-8"))
+        except OSError:
+            continue
+
+
+def get_library_fingerprint() -> list:
+    """
+    What the cached tree is valid for: the library generation (bumped on every meta write), plus a digest of a stat-only
+    walk of the live folders, which catches bookmarks and folders added, moved, removed, or edited by hand at any depth.
+    (Not the library root's own mtime: writing the cache and generation files there changes it.)
+    """
+    library_fingerprint: list = [BOOKMARK_TREE_CACHE_VERSION, ABS_OBS_BOOKMARKS_DIR, get_library_generation()]
+    for root_dir_path in sorted(get_all_valid_root_dir_names()):
+        folder_stats_digest = hashlib.sha256()
+        try:
+            folder_stats_digest.update(f"{os.stat(root_dir_path).st_mtime_ns}\n".encode("utf-8"))
+        except OSError:
+            continue
+        add_folder_stats_to_digest(root_dir_path, folder_stats_digest)
+        library_fingerprint.append([os.path.basename(root_dir_path), folder_stats_digest.hexdigest()])
+    return library_fingerprint
+
+
+def get_bookmark_tree_entries() -> list[list]:
+    """
+    The rendered tree entries, from BOOKMARK_TREE_CACHE_PATH while the library is unchanged, otherwise rescanned,
+    rendered, and re-cached.
+    """
+    library_fingerprint = get_library_fingerprint()
+    try:
+        with open(BOOKMARK_TREE_CACHE_PATH, "r") as f:
+            bookmark_tree_cache = json.load(f)
+        if bookmark_tree_cache.get("fingerprint") == library_fingerprint:
+            return bookmark_tree_cache["entries"]
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    tree_entries = render_bookmark_tree_entries(get_all_live_bookmarks_in_json_format(_is_override_run_once=True))
+    try:
+        tmp_bookmark_tree_cache_path = f"{BOOKMARK_TREE_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_bookmark_tree_cache_path, "w") as f:
+            json.dump({"fingerprint": library_fingerprint, "entries": tree_entries}, f)
+        os.replace(tmp_bookmark_tree_cache_path, BOOKMARK_TREE_CACHE_PATH)
+    except OSError as e:
+        if IS_DEBUG:
+            print(f"⚠️  Could not cache the bookmark tree: {e}")
+    return tree_entries
+
+
+@print_def_name(False)
+@only_run_once
+def print_all_live_directories_and_bookmarks(
+    is_print_just_current_directory_bookmarks=IS_PRINT_JUST_CURRENT_DIRECTORY_BOOKMARKS,
+    current_run_settings_obj: CurrentRunSettings | None = None,
+    tree_print_options: TreePrintOptions | None = None,
+):
+    """
+    Print all folders and their bookmarks, highlighting the current one.
+    The tree is rendered once per library generation (get_bookmark_tree_entries); only the highlighting is redone here,
+    and the whole printout goes out in a single write.
+    With tree_print_options (--depth/--under/--near), only the folders shown are loaded and rendered, uncached.
+    """
+    if tree_print_options and tree_print_options["is_no_tree"]:
+        return
+
+    output_lines = ["", "=" * 50]
+
+    # Get last used bookmark for highlighting if not provided with the current bookmark object.
+    if current_run_settings_obj is not None and current_run_settings_obj.get(
+        "current_bookmark_obj"
+    ):
+        current_bookmark_obj = (
+            current_run_settings_obj.get("current_bookmark_obj") or {}
+        )
+    else:
+        current_bookmark_obj = get_last_used_bookmark() or {}
+
+    current_bm_tail_name = current_bookmark_obj.get("bookmark_tail_name", None)
+    current_bm_dir_slash_abs = current_bookmark_obj.get("bookmark_dir_slash_abs", None)
+    current_bm_path_colon_rel = current_bookmark_obj.get(
+        "bookmark_path_colon_rel", None
+    )
+
+    if is_tree_print_scoped(tree_print_options):
+        # An explicit scope replaces the just-current-directory filter.
+        is_print_just_current_directory_bookmarks = False
+        under_path_colon_rel = tree_print_options["under_path_colon_rel"]
+        depth = tree_print_options["depth"]
+        if tree_print_options["is_near"] and under_path_colon_rel is None:
+            if current_bm_path_colon_rel:
+                # The current bookmark's folder's parent, so that its sibling folders are shown too
+                under_path_colon_rel = ":".join(current_bm_path_colon_rel.split(":")[:-2]) or None
+                depth = NEAR_DEFAULT_DEPTH if depth is None else depth
+            else:
+                print("⚠️  --near: no current bookmark, printing the whole tree")
+        tree_entries = render_bookmark_tree_entries(
+            get_scoped_live_bookmarks_in_json_format(under_path_colon_rel, depth))
+    else:
+        tree_entries = get_bookmark_tree_entries()
+
+    def is_dir_current(dir_col_rel) -> bool:
+        return bool(current_bm_path_colon_rel and dir_col_rel and current_bm_path_colon_rel.startswith(dir_col_rel))
+
+    for kind, dir_col_rel, bm_col_rel, text, current_text in tree_entries:
+        if kind == "line":
+            output_lines.append(text)
+        elif kind == "dir":
+            if is_dir_current(dir_col_rel):
+                output_lines.append(current_text)
+            elif not is_print_just_current_directory_bookmarks:
+                output_lines.append(text)
+        elif is_print_just_current_directory_bookmarks and not is_dir_current(dir_col_rel):
+            continue
+        elif kind == "bookmark" and is_dir_current(dir_col_rel) and current_bm_path_colon_rel.startswith(bm_col_rel):
+            output_lines.append(current_text)
+        else:
+            output_lines.append(text)
+
+    output_lines.append("")
+    output_lines.append("=" * 50)
 
     if current_bm_tail_name and current_bm_dir_slash_abs:
         current_bookmark = current_bm_dir_slash_abs + ":" + current_bm_tail_name
@@ -231,7 +333,9 @@ def print_all_live_directories_and_bookmarks(
         rel_current_bookmark = None
         rel_current_bookmark = None
 
-    print_color(f"🔍 Current bookmark: bm {rel_current_bookmark}", "magenta")
+    output_lines.append(get_color_text(f"🔍 Current bookmark: bm {rel_current_bookmark}", "magenta"))
+    sys.stdout.write("\n".join(output_lines) + "\n")
+    sys.stdout.flush()
     return
 
 
@@ -2,6 +2,7 @@ from typing import List
 
 from app.bookmarks.bookmarks import get_all_live_bookmark_path_slash_rels
 from app.bookmarks.matching.matching_utils import (
+    build_bookmark_match_index,
     find_bookmarks_by_exact_trailing_live_bm_path_parts,
     find_bookmarks_by_substring_with_all_live_bm_path_parts,
     find_bookmarks_by_substring_with_trailing_live_bm_path_parts,
@@ -12,6 +13,8 @@ from app.bookmarks.matching.matching_utils import (
 from app.bookmarks.navigation.process_navigation import process_main_cli_arg_navigation
 from app.types.bookmark_types import (
     NAVIGATION_COMMANDS,
+    BookmarkMatchIndex,
+    BookmarkMatchStage,
     CurrentRunSettings,
     MatchedBookmarkObj,
 )
@@ -21,109 +24,100 @@ from app.utils.printing_utils import print_color
 IS_PRINT_DEF_NAME = True
 
 
-@print_def_name(IS_PRINT_DEF_NAME)
-def find_best_bookmark_match_or_create(
+def find_bookmark_match_candidates(
     cli_bookmark_string: str,
-    current_run_settings_obj: CurrentRunSettings | None = None,
-    is_prompt_user_for_selection: bool = True,
-    is_prompt_user_for_create_bm_option: bool = True,
-    context: str | None = None,
-) -> MatchedBookmarkObj | List[MatchedBookmarkObj] | int | None:
+    bookmark_match_index: BookmarkMatchIndex | None = None,
+) -> tuple[BookmarkMatchStage | None, list[str]]:
     """
-    Example Target: `GRANDPARENT:PARENT:BOOKMARK -t comp domination`
-
+    Run the matching stages in order (without printing or prompting), stopping at the first one with matches.
+    Returns: the stage that matched (None if none did) and its candidate bookmark paths.
+    bookmark_match_index: build it once (build_bookmark_match_index) when matching many strings against the library.
     """
-    # 1. Does the string match a reserved command?
-    if cli_bookmark_string in NAVIGATION_COMMANDS:
-        # TODO(MFB): Other than return bookmark, is there anything else with this one?
-        return process_main_cli_arg_navigation(cli_bookmark_string)
-
     # Convert to slash-separated format for matching
     cli_bookmark_string_slash = cli_bookmark_string.replace(":", "/")
 
     # Get all valid bookmark paths in slash-separated format (relative)
-    all_live_bookmark_path_slash_rels = get_all_live_bookmark_path_slash_rels()
-
-
-
-
-    # TODO(KERCH): For anything other than an exact match, even if there is a single match, we should prompt the user for selection (create new bookmark/cancel). We should also tell the user which stage the match got to.
-
-    # TODO(): Pull all of these into their own functions to clean up the code and be able to more easily show documentation for each.
-
+    if bookmark_match_index is None:
+        bookmark_match_index = build_bookmark_match_index(get_all_live_bookmark_path_slash_rels())
 
     # 2. Exact match (full path)
     # Match: `GRANDPARENT:PARENT:BOOKMARK`
-    if cli_bookmark_string_slash in all_live_bookmark_path_slash_rels:
-        print_color(f'Found exact match! {cli_bookmark_string_slash}', 'green')
-        return handle_bookmark_matches(
-            cli_bookmark_string,
-            [cli_bookmark_string],
-            current_run_settings_obj,
-            is_prompt_user_for_selection=False,
-            is_prompt_user_for_create_bm_option=False,
-            context=context
-        )
+    if cli_bookmark_string_slash in bookmark_match_index["live_bm_path_slash_rels"]:
+        return "exact", [cli_bookmark_string_slash]
 
     # 3. Exact match (without some parents)
     # Match: `PARENT:BOOKMARK`
-    matches = find_bookmarks_by_exact_trailing_live_bm_path_parts(cli_bookmark_string, all_live_bookmark_path_slash_rels)
+    matches = find_bookmarks_by_exact_trailing_live_bm_path_parts(cli_bookmark_string, bookmark_match_index)
     if matches:
-        return handle_bookmark_matches(
-            cli_bookmark_string,
-            matches,
-            current_run_settings_obj,
-            is_prompt_user_for_selection,
-            is_prompt_user_for_create_bm_option=is_prompt_user_for_create_bm_option,
-            context=context
-        )
+        return "exact_trailing", matches
 
     # 4. Substring match (with full path)
     # Match: `GRAND:PAR:MARK`
     matches = find_bookmarks_by_substring_with_all_live_bm_path_parts(
-        cli_bookmark_string, all_live_bookmark_path_slash_rels)
+        cli_bookmark_string, bookmark_match_index)
     if matches:
-        return handle_bookmark_matches(
-            cli_bookmark_string,
-            matches,
-            current_run_settings_obj,
-            is_prompt_user_for_selection,
-            is_prompt_user_for_create_bm_option=is_prompt_user_for_create_bm_option,
-            context=context
-        )
+        return "substring", matches
 
     # 5. Substring match (without some parents)
     # Match: `PAR:MARK`
     matches = find_bookmarks_by_substring_with_trailing_live_bm_path_parts(
-        cli_bookmark_string, all_live_bookmark_path_slash_rels)
+        cli_bookmark_string, bookmark_match_index)
     if matches:
-        return handle_bookmark_matches(
-            cli_bookmark_string,
-            matches,
-            current_run_settings_obj,
-            is_prompt_user_for_selection,
-            is_prompt_user_for_create_bm_option=is_prompt_user_for_create_bm_option,
-            context=context
-        )
+        return "substring_trailing", matches
 
     # 6. Tag/description match
     # Searches through all names, directories, tags and descriptions -- and does not take order into consideration. Looks for exact matches.
     matches = find_exact_matches_by_bookmark_tokens(
         cli_bookmark_string, include_tags_and_descriptions=True)
     if matches:
+        return "tokens", matches
+
+    # 7. Tag/description partial matches
+    # Searches through all names, directories, tags and descriptions -- and does not take order into consideration. Looks for exact matches.
+    matches = find_partial_substring_matches_by_bookmark_tokens(
+        cli_bookmark_string, True )
+    if matches:
+        return "tokens_partial", matches
+
+    # TODO(MFB): Implement fuzzy matching
+    # # 8. Fuzzy match across names, directories, tags and descriptions
+
+    return None, []
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def find_best_bookmark_match_or_create(
+    cli_bookmark_string: str,
+    current_run_settings_obj: CurrentRunSettings | None = None,
+    is_prompt_user_for_selection: bool = True,
+    is_prompt_user_for_create_bm_option: bool = True,
+    context: str | None = None,
+) -> MatchedBookmarkObj | List[MatchedBookmarkObj] | int | None:
+    """
+    Example Target: `GRANDPARENT:PARENT:BOOKMARK -t comp domination`
+
+    """
+    # 1. Does the string match a reserved command?
+    if cli_bookmark_string in NAVIGATION_COMMANDS:
+        # TODO(MFB): Other than return bookmark, is there anything else with this one?
+        return process_main_cli_arg_navigation(cli_bookmark_string)
+
+    # TODO(KERCH): For anything other than an exact match, even if there is a single match, we should prompt the user for selection (create new bookmark/cancel). We should also tell the user which stage the match got to.
+
+    # 2.-7. Exact, substring, and tag/description matches (see find_bookmark_match_candidates)
+    match_stage, matches = find_bookmark_match_candidates(cli_bookmark_string)
+
+    if match_stage == "exact":
+        print_color(f'Found exact match! {matches[0]}', 'green')
         return handle_bookmark_matches(
             cli_bookmark_string,
-            matches,
+            [cli_bookmark_string],
             current_run_settings_obj,
-            is_prompt_user_for_selection,
-            is_prompt_user_for_create_bm_option=is_prompt_user_for_create_bm_option,
+            is_prompt_user_for_selection=False,
+            is_prompt_user_for_create_bm_option=False,
             context=context
         )
 
-    # 7. Tag/description partial matches
-    # Searches through all names, directories, tags and descriptions -- and does not take order into consideration. Looks for exact matches.
-    matches = find_partial_substring_matches_by_bookmark_tokens(
-        cli_bookmark_string, True )
     if matches:
         return handle_bookmark_matches(
             cli_bookmark_string,
@@ -134,9 +128,6 @@ def find_best_bookmark_match_or_create(
             context=context
         )
 
-    # TODO(MFB): Implement fuzzy matching
-    # # 8. Fuzzy match across names, directories, tags and descriptions
-    
     # X. Handle no matches - prompt to create new bookmark
     if is_prompt_user_for_selection:
         return handle_bookmark_matches(
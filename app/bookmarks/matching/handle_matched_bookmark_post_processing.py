@@ -2,6 +2,9 @@ from app.bookmarks.last_used import save_last_used_bookmark
 from app.bookmarks.redis_states.handle_bookmark_post_run_redis_states import (
     handle_bookmark_post_run_redis_states,
 )
+from app.bookmarks.redis_states.handle_stage_next_bookmark_redis_state import (
+    handle_stage_next_bookmark_redis_state,
+)
 from app.types.bookmark_types import CurrentRunSettings, MatchedBookmarkObj
 
 
@@ -14,7 +17,8 @@ def handle_matched_bookmark_post_processing(
 
     It will handle the following:
     - Copy the redis_after.json to the bookmark's redis_after.json
-    - Update the last_used_bookmark.json
+    - Update the last_used_bookmark.json (not with --verify, which leaves everything as it was)
+    - Pre-stage the next bookmark's redis state (--stage-next)
     """
 
     # Run Redis Post-Processing
@@ -23,8 +27,12 @@ def handle_matched_bookmark_post_processing(
         return result
 
     # Save the last used bookmark at the end of successful operations
-    if matched_bookmark_obj["bookmark_dir_slash_abs"]:
+    if matched_bookmark_obj["bookmark_dir_slash_abs"] and not current_run_settings_obj["is_verify_redis_after"]:
         # TODO(?): If dry-run, should we not save the last used bookmark?
         save_last_used_bookmark(matched_bookmark_obj)
 
+    # Pre-stage the upcoming bookmark's redis state into the spare Redis DB
+    if current_run_settings_obj["is_stage_next_redis_state"]:
+        handle_stage_next_bookmark_redis_state(matched_bookmark_obj, current_run_settings_obj)
+
     return 0
@@ -1,11 +1,25 @@
+import io
 import os
+import sys
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
 
+from app.bookmarks.bookmark_finalizer import wait_for_bookmark_finalizer
 from app.bookmarks.navigation.process_alt_source_bookmark import (
     process_alt_source_bookmark,
 )
 from app.bookmarks.redis_states.handle_bookmark_pre_run_redis_states import (
     handle_bookmark_pre_run_redis_states,
 )
+from app.bookmarks.redis_states.redis_state_handlers.handle_validate_reserved_redis_dbs import (
+    handle_validate_reserved_redis_dbs,
+)
+from app.consts.bookmarks_consts import (
+    IS_PRE_RUN_STAGES_IN_PARALLEL,
+    IS_REDIS_DIRECTLY_REACHABLE,
+)
 from app.obs.handle_bookmark_obs import (
     handle_bookmark_obs_pre_run,
 )
@@ -15,6 +29,99 @@ from app.utils.decorators import print_def_name
 IS_PRINT_DEF_NAME = True
 
 
+class StageBufferedStdout(io.TextIOBase):
+    """
+    Stands in for sys.stdout while the pre-run stages run on their threads: each stage's thread prints into its own
+    buffer (written out in one piece when the stage is done), any other thread prints straight through.
+    """
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.stage_buffers = threading.local()
+
+    def get_stage_buffer(self) -> io.StringIO | None:
+        return getattr(self.stage_buffers, "buffer", None)
+
+    def write(self, text: str) -> int:
+        stage_buffer = self.get_stage_buffer()
+        return (stage_buffer or self.stdout).write(text)
+
+    def flush(self) -> None:
+        if self.get_stage_buffer() is None:
+            self.stdout.flush()
+
+
+def run_pre_run_stages_in_parallel(stages: dict[str, Callable[[threading.Event], int]]) -> int:
+    """
+    Run independent pre-run stages on their own threads, each given a shared cancel event. When a stage fails (non-zero
+    result or exception), the event is set so the others stop at their next checkpoint, and stages that have not started
+    are cancelled. Every stage is waited for, so nothing is still touching Redis/OBS when we return.
+    Each stage's output is buffered and printed as one block, headed by the stage name, when the stage is done, so the
+    stages' lines don't interleave.
+    Returns: 0 if all succeeded, otherwise the result of the stage that failed first (1 for an exception).
+    """
+    cancel_event = threading.Event()
+    stage_results: dict[str, int] = {}
+    stage_errors: dict[str, BaseException] = {}
+    failed_stage_names: list[str] = []  # in the order they failed: the first one is the cause
+
+    stdout = sys.stdout
+    stage_buffered_stdout = StageBufferedStdout(stdout)
+    stage_output_lock = threading.Lock()
+
+    def run_buffered_stage(stage_name: str, stage: Callable[[threading.Event], int]) -> int:
+        stage_buffered_stdout.stage_buffers.buffer = io.StringIO()
+        try:
+            return stage(cancel_event)
+        finally:
+            stage_output = stage_buffered_stdout.stage_buffers.buffer.getvalue()
+            stage_buffered_stdout.stage_buffers.buffer = None
+            if stage_output:
+                with stage_output_lock:
+                    stdout.write(f"── {stage_name} ──\n{stage_output}")
+                    stdout.flush()
+
+    sys.stdout = stage_buffered_stdout
+    try:
+        with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+            futures = {
+                executor.submit(run_buffered_stage, stage_name, stage): stage_name
+                for stage_name, stage in stages.items()
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage_name = futures[future]
+                    if future.cancelled():
+                        continue
+                    error = future.exception()
+                    if error is not None:
+                        stage_errors[stage_name] = error
+                        traceback.print_exception(error)
+                    else:
+                        stage_results[stage_name] = future.result()
+                    if error is not None or stage_results[stage_name] != 0:
+                        failed_stage_names.append(stage_name)
+                        cancel_event.set()
+                        for pending_future in pending:
+                            pending_future.cancel()
+    finally:
+        sys.stdout = stdout
+
+    if not failed_stage_names:
+        return 0
+
+    for stage_name in failed_stage_names:
+        if stage_name in stage_errors:
+            print(f"❌ Error in {stage_name}: {stage_errors[stage_name]}")
+        elif stage_name == failed_stage_names[0]:
+            print(f"❌ Error in {stage_name}")
+        else:
+            print(f"🛑 {stage_name} stopped after {failed_stage_names[0]} failed")
+    return stage_results.get(failed_stage_names[0], 1)
+
+
 @print_def_name(IS_PRINT_DEF_NAME)
 def handle_matched_bookmark_pre_processing(
     matched_bookmark_obj: MatchedBookmarkObj,
@@ -26,6 +133,7 @@ def handle_matched_bookmark_pre_processing(
     It will handle the following:
     - Load the Redis state into redis
     - Load the OBS bookmark into OBS
+    The two are independent I/O waits, so they run concurrently (IS_PRE_RUN_STAGES_IN_PARALLEL).
     """
     matched_bookmark_path_abs = matched_bookmark_obj["bookmark_path_slash_abs"]
 
@@ -48,7 +156,31 @@ def handle_matched_bookmark_pre_processing(
             return alt_source_bookmark_results
         current_run_settings_obj = alt_source_bookmark_results
 
-    # REDIS STATES
+    # A previous run's background finalizer may still be writing these bookmarks' states.
+    if wait_for_bookmark_finalizer(matched_bookmark_path_abs) != 0:
+        return 1
+    alt_source_bookmark_obj = current_run_settings_obj.get("alt_source_bookmark_obj")
+    if (
+        is_use_alt_source_bookmark
+        and alt_source_bookmark_obj
+        and wait_for_bookmark_finalizer(alt_source_bookmark_obj["bookmark_path_slash_abs"]) != 0
+    ):
+        return 1
+
+    # RESERVED REDIS DBS (staging, snapshots, signal) - before anything is flushed into them
+
+    if IS_REDIS_DIRECTLY_REACHABLE and handle_validate_reserved_redis_dbs() != 0:
+        return 1
+
+    # REDIS STATES + OBS
+
+    if IS_PRE_RUN_STAGES_IN_PARALLEL and not current_run_settings_obj["is_no_obs"]:
+        return run_pre_run_stages_in_parallel({
+            "handle_bookmark_pre_run_redis_states": lambda cancel_event: handle_bookmark_pre_run_redis_states(
+                matched_bookmark_obj, current_run_settings_obj, cancel_event=cancel_event),
+            "handle_bookmark_obs_pre_run": lambda cancel_event: handle_bookmark_obs_pre_run(
+                matched_bookmark_obj, current_run_settings_obj, cancel_event=cancel_event),
+        })
 
     results = handle_bookmark_pre_run_redis_states(matched_bookmark_obj, current_run_settings_obj)
     if results != 0:
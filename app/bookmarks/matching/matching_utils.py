@@ -6,7 +6,11 @@ from app.bookmarks.bookmarks import (
     get_all_live_bookmarks_in_json_format,
 )
 from app.bookmarks.handle_create_bookmark import handle_create_bookmark_and_parent_dirs
-from app.types.bookmark_types import CurrentRunSettings, MatchedBookmarkObj
+from app.types.bookmark_types import (
+    BookmarkMatchIndex,
+    CurrentRunSettings,
+    MatchedBookmarkObj,
+)
 from app.utils.bookmark_utils import (
     convert_exact_bookmark_path_to_bm_obj,
     does_path_exist_in_bookmarks,
@@ -308,39 +312,49 @@ def handle_bookmark_matches(
     ]
 
 
+def build_bookmark_match_index(all_live_bookmark_path_slash_rels: list[str]) -> BookmarkMatchIndex:
+    """
+    Split the live bookmark paths once, for the path matching stages below (instead of once per stage and query).
+    """
+    live_bm_path_parts = []
+    live_bm_paths_by_trailing_parts: dict[tuple[str, ...], list[str]] = {}
+    for live_bm_path in all_live_bookmark_path_slash_rels:
+        parts = live_bm_path.split("/")
+        live_bm_path_parts.append((live_bm_path, parts))
+        for part_index in range(len(parts)):
+            live_bm_paths_by_trailing_parts.setdefault(tuple(parts[part_index:]), []).append(live_bm_path)
+    return {
+        "live_bm_path_slash_rels": set(all_live_bookmark_path_slash_rels),
+        "live_bm_path_parts": live_bm_path_parts,
+        "live_bm_paths_by_trailing_parts": live_bm_paths_by_trailing_parts,
+    }
+
+
 @print_def_name(IS_PRINT_DEF_NAME)
 def find_bookmarks_by_exact_trailing_live_bm_path_parts(
-    cli_bookmark_string, all_live_bookmark_path_slash_rels
+    cli_bookmark_string, bookmark_match_index: BookmarkMatchIndex
 ):
     """
     Find all bookmarks where the last N path parts match the input, in order.
     Example:
       cli_bookmark_string: "PARENT:BOOKMARK"
-      all_live_bookmark_path_slash_rels: ["GRANDPARENT/PARENT/BOOKMARK", "OTHER/PARENT/BOOKMARK", "PARENT/BOOKMARK", "GRANDPARENT/BOOKMARK"]
+      live bookmark paths: ["GRANDPARENT/PARENT/BOOKMARK", "OTHER/PARENT/BOOKMARK", "PARENT/BOOKMARK", "GRANDPARENT/BOOKMARK"]
       Returns: ["GRANDPARENT/PARENT/BOOKMARK", "OTHER/PARENT/BOOKMARK", "PARENT/BOOKMARK"]
     """
     # Convert input to list of parts
     cli_input_parts = cli_bookmark_string.replace(":", "/").split("/")
-    matches = []
-    for path in all_live_bookmark_path_slash_rels:
-        live_bm_path_parts = path.split("/")
-        if (
-            len(live_bm_path_parts) >= len(cli_input_parts)
-            and live_bm_path_parts[-len(cli_input_parts) :] == cli_input_parts
-        ):
-            matches.append(path)
-    return matches
+    return list(bookmark_match_index["live_bm_paths_by_trailing_parts"].get(tuple(cli_input_parts), []))
 
 
 @print_def_name(IS_PRINT_DEF_NAME)
 def find_bookmarks_by_substring_with_all_live_bm_path_parts(
-    cli_bookmark_string, all_live_bookmark_path_slash_rels
+    cli_bookmark_string, bookmark_match_index: BookmarkMatchIndex
 ):
     """
     Find all bookmarks where the input is a substring of the path.
     Example:
         cli_bookmark_string: "PAR:PAR:MARK"
-        all_live_bookmark_path_slash_rels: [
+        live bookmark paths: [
             "GRANDPARENT_1/PARENT_1/BOOKMARK_1",
             "GRANDPARENT_2/PARENT_2/BOOKMARK_2",
             "PARENT_3/PARENT_2/BOOKMARK_2",
@@ -356,8 +370,7 @@ def find_bookmarks_by_substring_with_all_live_bm_path_parts(
     # Convert input to list of parts
     cli_input_parts = cli_bookmark_string.replace(":", "/").split("/")
     matches = []
-    for live_bm_path in all_live_bookmark_path_slash_rels:
-        live_bm_path_parts = live_bm_path.split("/")
+    for live_bm_path, live_bm_path_parts in bookmark_match_index["live_bm_path_parts"]:
         if len(live_bm_path_parts) == len(cli_input_parts):
             if all(
                 cli_input_parts[i] in live_bm_path_parts[i]
@@ -369,13 +382,13 @@ def find_bookmarks_by_substring_with_all_live_bm_path_parts(
 
 @print_def_name(IS_PRINT_DEF_NAME)
 def find_bookmarks_by_substring_with_trailing_live_bm_path_parts(
-    cli_bookmark_string, all_live_bookmark_path_slash_rels
+    cli_bookmark_string, bookmark_match_index: BookmarkMatchIndex
 ):
     """
     Find all bookmarks where the input is a substring of the path.
     Example:
         cli_bookmark_string: "PAR:MARK"
-        all_live_bookmark_path_slash_rels: [
+        live bookmark paths: [
             "GRANDPARENT_1/PARENT_1/BOOKMARK_1",
             "GRANDPARENT_2/2_PARENT_2/BOOKMARK_2",
             "PARENT_3/PARENT_2/BOOKMARK_2",
@@ -392,8 +405,7 @@ def find_bookmarks_by_substring_with_trailing_live_bm_path_parts(
     cli_input_parts = cli_bookmark_string.replace(":", "/").split("/")
     matches = []
 
-    for live_bm_path in all_live_bookmark_path_slash_rels:
-        live_bm_path_parts = live_bm_path.split("/")
+    for live_bm_path, live_bm_path_parts in bookmark_match_index["live_bm_path_parts"]:
         if len(live_bm_path_parts) >= len(cli_input_parts):
             is_match = True
             for i in range(1, len(cli_input_parts) + 1):
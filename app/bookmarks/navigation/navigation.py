@@ -1,11 +1,17 @@
+import os
 from typing import Literal
 
 from app.bookmarks.bookmarks import get_all_shallow_bookmark_abs_paths_in_dir
 from app.bookmarks.last_used import get_last_used_bookmark
 from app.consts.bookmarks_consts import IS_DEBUG
-from app.types.bookmark_types import MatchedBookmarkObj, NavigationCommand
+from app.types.bookmark_types import (
+    FolderNavigationIndex,
+    MatchedBookmarkObj,
+    NavigationCommand,
+)
 from app.utils.bookmark_utils import convert_exact_bookmark_path_to_bm_obj
-from app.utils.decorators import print_def_name
+from app.utils.decorators import memoize, print_def_name
+from app.utils.sorting_utils import natural_sort_key
 
 IS_PRINT_DEF_NAME = True
 
@@ -39,12 +45,36 @@ IS_PRINT_DEF_NAME = True
 #     return None
 
 
+@memoize
+def build_folder_navigation_index(bookmark_dir_slash_abs: str, folder_mtime_ns: int) -> FolderNavigationIndex:
+    """
+    The folder's bookmarks in natural order, with each one's position. Memoized per folder mtime, so adding or removing
+    a bookmark in the folder rebuilds it.
+    """
+    sibling_paths = sorted(
+        get_all_shallow_bookmark_abs_paths_in_dir(bookmark_dir_slash_abs, _is_override_run_once=True),
+        key=lambda sibling_path: natural_sort_key(os.path.basename(sibling_path)),
+    )
+    return {
+        "sibling_paths": sibling_paths,
+        "positions": {sibling_path: index for index, sibling_path in enumerate(sibling_paths)},
+    }
+
+
+def get_folder_navigation_index(bookmark_dir_slash_abs: str) -> FolderNavigationIndex | None:
+    try:
+        folder_mtime_ns = os.stat(bookmark_dir_slash_abs).st_mtime_ns
+    except OSError:
+        return None
+    return build_folder_navigation_index(bookmark_dir_slash_abs, folder_mtime_ns)
+
+
 @print_def_name(IS_PRINT_DEF_NAME)
 def find_nav_sibling_bookmark_obj_in_folder(
     bookmark_obj: MatchedBookmarkObj, mode: str = "previous"
 ) -> MatchedBookmarkObj | None:
     """
-    Find a sibling bookmark relative to the given one, in the same folder.
+    Find a sibling bookmark relative to the given one, in the same folder (in natural order, see natural_sort_key).
     Mode can be: 'first', 'previous', 'next', 'last', 'last_used/again/current'.
     """
     bookmark_obj_dir_slash_abs = bookmark_obj.get("bookmark_dir_slash_abs")
@@ -52,17 +82,14 @@ def find_nav_sibling_bookmark_obj_in_folder(
     if not bookmark_obj_dir_slash_abs:
         return None
 
-    sibling_paths = get_all_shallow_bookmark_abs_paths_in_dir(
-        bookmark_obj_dir_slash_abs
-    )
-    if not sibling_paths:
+    folder_navigation_index = get_folder_navigation_index(bookmark_obj_dir_slash_abs)
+    if not folder_navigation_index or not folder_navigation_index["sibling_paths"]:
         return None
 
-    sibling_paths = sorted(sibling_paths)
+    sibling_paths = folder_navigation_index["sibling_paths"]
 
-    try:
-        index = sibling_paths.index(bookmark_obj_path_slash_abs)
-    except ValueError:
+    index = folder_navigation_index["positions"].get(bookmark_obj_path_slash_abs)
+    if index is None:
         if IS_DEBUG:
             print(
                 f"⚠️ Current bookmark not found in sibling list: {bookmark_obj_dir_slash_abs}"
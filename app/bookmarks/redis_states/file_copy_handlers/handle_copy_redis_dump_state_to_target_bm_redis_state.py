@@ -1,11 +1,31 @@
 import os
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from typing import Literal
 
+from app.bookmarks.bookmark_finalizer import run_detached_bookmark_finalizer
 from app.bookmarks.redis_states.redis_friendly_converter import (
-    convert_redis_state_file_to_friendly_and_save,
+    get_friendly_redis_state_path,
+    write_friendly_redis_state_data,
+)
+from app.bookmarks.redis_states.redis_state_handlers.handle_snapshot_redis_to_snapshot_db import (
+    handle_materialize_redis_snapshot_to_dump,
+)
+from app.bookmarks.redis_states.redis_state_storage import (
+    is_redis_state_delta_folder,
+    save_redis_state_file,
+)
+from app.bookmarks.redis_states.redis_state_utils import (
+    get_before_or_after_from_temp_redis_state_name,
+    get_redis_dump_state_data,
+)
+from app.consts.bookmarks_consts import (
+    IS_DEBUG,
+    IS_DETACHED_FINALIZER,
+    IS_SAVE_FRIENDLY_REDIS_STATES,
+    IS_SAVE_REDIS_STATE_FILES_IN_PARALLEL,
+    REDIS_DUMP_DIR,
+    REDIS_STATE_STORAGE_MODE,
 )
-from app.consts.bookmarks_consts import IS_DEBUG, REDIS_DUMP_DIR
 from app.utils.decorators import print_def_name
 
 IS_PRINT_DEF_NAME = True
@@ -16,12 +36,20 @@ def handle_copy_redis_dump_state_to_target_bm_redis_state(
     target_bookmark_path_slash_abs: str,
     target_bm_redis_state_before_or_after: Literal["before", "after"],
     redis_temp_state_filename: Literal["bookmark_temp", "bookmark_temp_after"],
+    base_bm_redis_state_path: str | None = None,
 ) -> int:
     """
     Handles saving the final Redis state (bookmark_temp or bookmark_temp_after) to redis_after.json or redis_before.json
+    base_bm_redis_state_path: the state this one came from, preferred as the delta base in "delta" storage mode.
     Returns: True if redis_after was saved, False otherwise
     """
 
+    # Server-side snapshot: write it to the redis dump now that we need the file.
+    results = handle_materialize_redis_snapshot_to_dump(
+        get_before_or_after_from_temp_redis_state_name(redis_temp_state_filename))
+    if results != 0:
+        return results
+
     # Redis dump state
     redis_temp_state_filename_json = redis_temp_state_filename + ".json"
     redis_dump_state_filepath = os.path.join(
@@ -42,17 +70,58 @@ def handle_copy_redis_dump_state_to_target_bm_redis_state(
         print(
             f"💾 Saving Redis dump state:\n{redis_dump_state_filepath}\nto target bookmark:\n{target_bm_redis_state_filepath}...")
 
-    # Move the final Redis export to the bookmark directory
-    # shutil.move(redis_dump_state_filepath, target_bm_redis_state_filepath)
-    shutil.copy(redis_dump_state_filepath, target_bm_redis_state_filepath)
-    if IS_DEBUG:
-        print(
-            f"💾 Saved final Redis state to: {target_bm_redis_state_filepath}")
-
-    # Convert to friendly
-    results = convert_redis_state_file_to_friendly_and_save(
-        target_bm_redis_state_filepath)
-    if results == 1:
+    # Hold the state in memory once (straight from the export if it happened in this run), and write both files from it.
+    try:
+        data = get_redis_dump_state_data(redis_temp_state_filename)
+    except Exception as e:
+        print(f"❌ Error reading Redis dump state {redis_dump_state_filepath}: {e}")
         return 1
 
-    return 0
+    def save_flat_redis_state():
+        save_redis_state_file(target_bm_redis_state_filepath, data, base_bm_redis_state_path)
+
+    def save_friendly_redis_state():
+        write_friendly_redis_state_data(data, get_friendly_redis_state_path(target_bm_redis_state_filepath))
+
+    # Friendly views are built on demand (--friendly) unless eager saving is turned on. Drop a stale eager one.
+    if not IS_SAVE_FRIENDLY_REDIS_STATES:
+        stale_friendly_redis_state_path = get_friendly_redis_state_path(target_bm_redis_state_filepath)
+        if os.path.exists(stale_friendly_redis_state_path):
+            os.remove(stale_friendly_redis_state_path)
+
+    def save_redis_state_files() -> int:
+        try:
+            if not IS_SAVE_FRIENDLY_REDIS_STATES:
+                save_flat_redis_state()
+            elif IS_SAVE_REDIS_STATE_FILES_IN_PARALLEL:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    futures = [executor.submit(save_flat_redis_state),
+                               executor.submit(save_friendly_redis_state)]
+                    for future in futures:
+                        future.result()
+            else:
+                save_flat_redis_state()
+                save_friendly_redis_state()
+        except Exception as e:
+            print(f"❌ Error saving Redis state to {target_bm_redis_state_filepath}: {e}")
+            return 1
+
+        if IS_DEBUG:
+            print(
+                f"💾 Saved final Redis state to: {target_bm_redis_state_filepath}")
+
+        return 0
+
+    # The after-state is the last thing a run writes: finish it in the background (the next run on this bookmark waits).
+    # Not when deltas may be stored in the folder: saving rebases sibling deltas, which are not under this bookmark's lock.
+    if (
+        IS_DETACHED_FINALIZER
+        and target_bm_redis_state_before_or_after == "after"
+        and REDIS_STATE_STORAGE_MODE != "delta"
+        and not is_redis_state_delta_folder(os.path.dirname(os.path.normpath(target_bookmark_path_slash_abs)))
+        and run_detached_bookmark_finalizer(target_bookmark_path_slash_abs, save_redis_state_files)
+    ):
+        print(f"💾 Saving {target_bm_redis_state_filename_json} in the background")
+        return 0
+
+    return save_redis_state_files()
@@ -1,7 +1,9 @@
 import os
-import shutil
 from typing import Literal
 
+from app.bookmarks.redis_states.redis_state_storage import (
+    export_redis_state_file_to_plain_json,
+)
 from app.consts.bookmarks_consts import IS_DEBUG, REDIS_DUMP_DIR
 from app.utils.decorators import print_def_name
 
@@ -30,8 +32,8 @@ def handle_copy_source_bm_redis_state_to_redis_dump(
         print(
             f"💾 Saving {origin_bm_redis_state_path} to Redis Temp as {redis_temp_state_filename_json}...")
 
-    # Move the source file to the dump directory
-    shutil.copy(origin_bm_redis_state_path, redis_dump_state_path_json)
+    # Move the source file to the dump directory (as plain JSON, whatever its storage format)
+    export_redis_state_file_to_plain_json(origin_bm_redis_state_path, redis_dump_state_path_json)
     if IS_DEBUG:
         print(
             f"💾 Saved the target final Redis state \n {origin_bm_redis_state_path} \n to dump directory: \n {redis_dump_state_path_json}")
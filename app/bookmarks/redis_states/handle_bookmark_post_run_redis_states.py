@@ -3,6 +3,9 @@ import os
 from app.bookmarks.redis_states.file_copy_handlers.handle_copy_redis_dump_state_to_target_bm_redis_state import (
     handle_copy_redis_dump_state_to_target_bm_redis_state,
 )
+from app.bookmarks.redis_states.handle_verify_bookmark_redis_after import (
+    handle_verify_bookmark_redis_after,
+)
 from app.bookmarks.redis_states.redis_state_handlers.handle_export_from_redis import (
     handle_export_from_redis,
 )
@@ -23,6 +26,7 @@ def handle_bookmark_post_run_redis_states(
     It will determine if it needs to save the redis_after state to redis_after.json+
     - Pull the redis state into temp
     - Determine if we need to save the redis_after state to the bookmark
+    - With --verify, compare it with the stored redis_after.json instead (nothing is saved)
     """
 
     ## INIT ##
@@ -36,6 +40,7 @@ def handle_bookmark_post_run_redis_states(
     is_save_updates = current_run_settings_obj["is_save_updates"]
     is_overwrite_bm_redis_after = current_run_settings_obj["is_overwrite_bm_redis_after"]
     is_no_saving_dry_run = current_run_settings_obj["is_no_saving_dry_run"]
+    is_verify_redis_after = current_run_settings_obj["is_verify_redis_after"]
 
     is_skip_redis_processing = current_run_settings_obj[
         "is_no_docker_no_redis"] or is_no_saving_dry_run
@@ -46,6 +51,9 @@ def handle_bookmark_post_run_redis_states(
         print("Skipping all Redis operations (no Docker/Redis mode).")
         return 0
 
+    if is_verify_redis_after:
+        return handle_verify_bookmark_redis_after(matched_bookmark_obj)
+
     # We never pull the redis-after state from another bookmark (atm), so always export from Redis unless dry run.
     # TODO(MFB): Figure our which of the two we should be using here.
     handle_export_from_redis(
@@ -1,4 +1,5 @@
 import os
+import threading
 
 from app.bookmarks.redis_states.file_copy_handlers.handle_copy_redis_dump_state_to_target_bm_redis_state import (
     handle_copy_redis_dump_state_to_target_bm_redis_state,
@@ -12,6 +13,9 @@ from app.bookmarks.redis_states.redis_state_handlers.handle_export_from_redis im
 from app.bookmarks.redis_states.redis_state_handlers.handle_load_into_redis import (
     handle_load_into_redis,
 )
+from app.bookmarks.redis_states.redis_state_handlers.handle_stage_redis_state import (
+    handle_swap_staged_redis_state_into_sessions_db,
+)
 from app.consts.bookmarks_consts import (
     INITIAL_REDIS_STATE_DIR,
 )
@@ -64,6 +68,7 @@ def determine_origin_bm_redis_state_path_from_context(
 def handle_bookmark_pre_run_redis_states(
     matched_bookmark_obj: MatchedBookmarkObj,
     current_run_settings_obj: CurrentRunSettings,
+    cancel_event: threading.Event | None = None,
 ) -> int:
     """
     This function is used to handle the Redis states for a bookmark before starting the main process.
@@ -82,6 +87,9 @@ def handle_bookmark_pre_run_redis_states(
     - Dry Run: No lasting changes will be made. It will still update Redis, but all redis state files will remain the same. NO code changes.
     - is_no_docker_no_redis: We will skip ALL redis operations, and proceed with updates and such that we can.
     - is_save_updates: We ignore the redis_before / redis_after states in our matched bookmark, and save any changes that happen.
+
+    When run next to the OBS pre-run, `cancel_event` is set if that fails: we stop before loading into Redis or saving
+    into the bookmark.
     """
 
     ## INIT ##
@@ -126,13 +134,20 @@ def handle_bookmark_pre_run_redis_states(
         if result != 0:
             return result
 
+    if cancel_event and cancel_event.is_set():
+        print("🛑 Redis pre-run cancelled")
+        return 1
+
     ### LOAD TEMP TO REDIS ###
 
     # For all cases other than is_skip_redis_processing and when the state is already in redis, we will load the temp file into redis.
+    # If the origin state was pre-staged (--stage-next), it is swapped into place instead.
     if origin_bm_redis_state_path != 'redis':
-        handle_load_into_redis(
-            before_or_after="before"
-        )
+        if handle_swap_staged_redis_state_into_sessions_db(origin_bm_redis_state_path) != 0:
+            handle_load_into_redis(
+                before_or_after="before",
+                origin_bm_redis_state_path=origin_bm_redis_state_path,
+            )
 
     ### SAVING TEMP TO BOOKMARK ###
 
@@ -141,11 +156,21 @@ def handle_bookmark_pre_run_redis_states(
         # unless we are in is_save_updates mode.
         return 0
 
+    if current_run_settings_obj["is_verify_redis_after"]:
+        # --verify never writes to the bookmark, not even a missing redis_before
+        return 0
+
+    if cancel_event and cancel_event.is_set():
+        print("🛑 Redis pre-run cancelled, not saving redis_before")
+        return 1
+
     # Copy the temp file to the bookmark directory.
     handle_copy_redis_dump_state_to_target_bm_redis_state(
         target_bookmark_path_slash_abs=matched_bookmark_path_abs,
         target_bm_redis_state_before_or_after="before",
-        redis_temp_state_filename="bookmark_temp"
+        redis_temp_state_filename="bookmark_temp",
+        base_bm_redis_state_path=(
+            origin_bm_redis_state_path if origin_bm_redis_state_path != 'redis' else None),
     )
 
     return 0
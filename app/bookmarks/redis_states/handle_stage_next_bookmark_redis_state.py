@@ -0,0 +1,73 @@
+import os
+
+from app.bookmarks.bookmark_finalizer import get_bookmark_finalizer_lock_path
+from app.bookmarks.navigation.navigation import find_nav_sibling_bookmark_obj_in_folder
+from app.bookmarks.redis_states.redis_state_handlers.handle_stage_redis_state import (
+    handle_stage_redis_state_in_background,
+)
+from app.consts.bookmarks_consts import INITIAL_REDIS_STATE_DIR, IS_DEBUG
+from app.types.bookmark_types import CurrentRunSettings, MatchedBookmarkObj
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def determine_next_bm_redis_state_path_to_stage(
+    matched_bookmark_obj: MatchedBookmarkObj,
+    current_run_settings_obj: CurrentRunSettings,
+) -> str | None:
+    """
+    Predict the redis state that the next run will load, assuming the user moves on to the `next` sibling with the same flags.
+    Mirrors the order of determine_origin_bm_redis_state_path_from_context.
+    """
+
+    # Blank Slate: the next run will load the initial state again.
+    if current_run_settings_obj["is_blank_slate"]:
+        return os.path.join(INITIAL_REDIS_STATE_DIR, "initial_redis_before.json")
+
+    # Alt Source (`next -p`): the next bookmark will use our redis_after.json as its template.
+    # Its finalizer may still be writing it: the stager waits for that before reading it.
+    if current_run_settings_obj["is_use_alt_source_bookmark"]:
+        matched_bm_redis_after_path = os.path.join(
+            matched_bookmark_obj["bookmark_path_slash_abs"], "redis_after.json")
+        if os.path.exists(matched_bm_redis_after_path) or os.path.exists(
+            get_bookmark_finalizer_lock_path(matched_bookmark_obj["bookmark_path_slash_abs"])
+        ):
+            return matched_bm_redis_after_path
+        return None
+
+    # Standard Rerun: the next bookmark's own redis_before.json.
+    next_bookmark_obj = find_nav_sibling_bookmark_obj_in_folder(
+        matched_bookmark_obj, "next")
+    if not next_bookmark_obj:
+        return None
+
+    next_bm_redis_before_path = os.path.join(
+        next_bookmark_obj["bookmark_path_slash_abs"], "redis_before.json")
+    if os.path.exists(next_bm_redis_before_path):
+        return next_bm_redis_before_path
+
+    return None
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_stage_next_bookmark_redis_state(
+    matched_bookmark_obj: MatchedBookmarkObj,
+    current_run_settings_obj: CurrentRunSettings,
+) -> int:
+    """
+    Pre-stage the redis state of the upcoming bookmark into the spare staging DB, in the background.
+    On the next run, handle_bookmark_pre_run_redis_states will SWAPDB it into place instead of loading it.
+    """
+    if current_run_settings_obj["is_no_docker_no_redis"] or current_run_settings_obj["is_no_saving_dry_run"]:
+        return 0
+
+    next_bm_redis_state_path = determine_next_bm_redis_state_path_to_stage(
+        matched_bookmark_obj, current_run_settings_obj)
+    if not next_bm_redis_state_path:
+        if IS_DEBUG:
+            print("🎭 No upcoming redis state to stage")
+        return 0
+
+    return handle_stage_redis_state_in_background(next_bm_redis_state_path)
@@ -0,0 +1,83 @@
+import os
+from typing import Any
+
+from app.bookmarks.redis_states.redis_state_diff import (
+    diff_redis_state_key_hashes,
+    get_redis_state_data_key_hashes,
+    get_redis_state_key_hashes,
+    is_redis_state_diff_empty,
+    print_redis_state_diff_summary,
+)
+from app.bookmarks.redis_states.redis_state_handlers.handle_export_docker_redis_to_dump import (
+    handle_export_docker_redis_to_redis_dump,
+)
+from app.bookmarks.redis_states.redis_state_utils import (
+    get_redis_client,
+    get_redis_dump_state_data,
+    read_redis_state_data_from_redis,
+)
+from app.consts.bookmarks_consts import (
+    IS_LOCAL_REDIS_DEV,
+    IS_REDIS_DIRECTLY_REACHABLE,
+    STATE_DIFF_IGNORED_KEY_PATTERNS,
+)
+from app.types.bookmark_types import MatchedBookmarkObj
+from app.utils.decorators import print_def_name
+from app.utils.printing_utils import print_color
+
+IS_PRINT_DEF_NAME = True
+
+
+def read_current_redis_after_state() -> dict[str, Any] | None:
+    """
+    The processed redis state, straight from Redis into memory when we can reach it (nothing is written),
+    otherwise through the `docker exec` export into the redis dump (never into the bookmark).
+    """
+    if IS_REDIS_DIRECTLY_REACHABLE:
+        try:
+            return read_redis_state_data_from_redis(get_redis_client())
+        except Exception as e:
+            if IS_LOCAL_REDIS_DEV:
+                print(f"❌ Error reading the redis state from Redis: {e}")
+                return None
+            print("⚠️  Direct Docker Redis read failed, falling back to docker exec")
+
+    if handle_export_docker_redis_to_redis_dump("after") != 0:
+        return None
+    return get_redis_dump_state_data("bookmark_temp_after")
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_verify_bookmark_redis_after(matched_bookmark_obj: MatchedBookmarkObj) -> int:
+    """
+    --verify: compare the redis state the processor just produced with the bookmark's stored (golden) redis_after.json,
+    by per-key hashes, ignoring STATE_DIFF_IGNORED_KEY_PATTERNS. Nothing is saved to the bookmark.
+    Returns: 0 if they match, 1 if they differ (or could not be compared).
+    """
+    bookmark_path_colon_rel = matched_bookmark_obj["bookmark_path_colon_rel"]
+    golden_redis_after_path = os.path.join(matched_bookmark_obj["bookmark_path_slash_abs"], "redis_after.json")
+    if not os.path.exists(golden_redis_after_path):
+        print_color(f"⚠️  VERIFY: {bookmark_path_colon_rel} has no redis_after.json to compare against", "yellow")
+        return 1
+
+    current_redis_after_data = read_current_redis_after_state()
+    if current_redis_after_data is None:
+        return 1
+
+    try:
+        state_diff = diff_redis_state_key_hashes(
+            *get_redis_state_key_hashes(golden_redis_after_path),
+            *get_redis_state_data_key_hashes(current_redis_after_data),
+            STATE_DIFF_IGNORED_KEY_PATTERNS,
+        )
+    except Exception as e:
+        print(f"❌ Error comparing with {golden_redis_after_path}: {e}")
+        return 1
+
+    if is_redis_state_diff_empty(state_diff):
+        print_color(f"✅ VERIFY PASSED: {bookmark_path_colon_rel}", "green")
+        return 0
+
+    print_color(f"❌ VERIFY FAILED: {bookmark_path_colon_rel} (stored redis_after → this run)", "red")
+    print_redis_state_diff_summary(state_diff)
+    return 1
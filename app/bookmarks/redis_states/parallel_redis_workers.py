@@ -0,0 +1,236 @@
+import os
+import shlex
+import subprocess
+import sys
+import time
+from typing import Any, TypedDict
+
+import redis
+
+from app.bookmarks.bookmark_finalizer import wait_for_bookmark_finalizer
+from app.bookmarks.redis_states.redis_state_diff import (
+    diff_redis_state_key_hashes,
+    get_redis_state_data_key_hashes,
+    get_redis_state_key_hashes,
+    is_redis_state_diff_empty,
+)
+from app.bookmarks.redis_states.redis_state_utils import (
+    get_redis_client,
+    load_encoded_redis_state,
+    read_redis_state_data_from_redis,
+    write_encoded_redis_state_to_redis,
+)
+from app.consts.bookmarks_consts import (
+    ASYNC_WAIT_TIME,
+    DOCKER_REDIS_SESSIONS_HOST,
+    IS_LOCAL_REDIS_DEV,
+    LOCAL_REDIS_SESSIONS_DB,
+    LOCAL_REDIS_SESSIONS_HOST,
+    PARALLEL_REDIS_FIRST_WORKER_DB,
+    PARALLEL_REDIS_LAST_WORKER_DB,
+    PARALLEL_REDIS_WORKER_PORTS,
+    PROCESSOR_COMMAND_TIMEOUT,
+    PROCESSOR_COMPLETION_SIGNAL,
+    PROCESSOR_COMPLETION_TIMEOUT,
+    PROCESSOR_SIGNAL_DB,
+    PROCESSOR_TRIGGER,
+    REDIS_CONNECT_TIMEOUT,
+    REDIS_SESSIONS_PASSWORD,
+    REDIS_SESSIONS_USERNAME,
+    REPO_ROOT,
+    STATE_DIFF_IGNORED_KEY_PATTERNS,
+)
+from app.processor.processor_completion_signal import (
+    close_processor_completion_wait,
+    get_processor_signal_docker_exec_options,
+    new_processor_run_id,
+    start_processor_completion_wait,
+    wait_for_processor_completion,
+)
+from app.processor.processor_queue import (
+    get_processor_redis_host,
+    is_processor_worker_alive,
+    new_processor_run_request,
+    run_processor_via_queue,
+)
+from app.types.bookmark_types import MatchedBookmarkObj
+
+
+class RedisWorkerSlot(TypedDict):
+    worker: int
+    host: str
+    port: int
+    db: int
+    socket_path: str | None
+
+
+class RedisWorkerResult(TypedDict):
+    bookmark_path_colon_rel: str
+    worker: int
+    status: str  # "passed" | "failed" | "no_golden" | "error"
+    seconds: float
+    async_seconds: float | None  # time from the processor exiting to its completion signal
+    state_diff: dict[str, Any] | None
+    error: str | None
+
+
+def get_parallel_redis_worker_slots(worker_count: int) -> list[RedisWorkerSlot]:
+    """
+    One Redis per worker: a local redis-server per port in PARALLEL_REDIS_WORKER_PORTS, or otherwise one DB each
+    (PARALLEL_REDIS_FIRST_WORKER_DB..PARALLEL_REDIS_LAST_WORKER_DB) on the sessions Redis - never the sessions DB itself.
+    """
+    if PARALLEL_REDIS_WORKER_PORTS:
+        host = LOCAL_REDIS_SESSIONS_HOST if IS_LOCAL_REDIS_DEV else DOCKER_REDIS_SESSIONS_HOST
+        return [
+            {"worker": worker, "host": host, "port": port, "db": LOCAL_REDIS_SESSIONS_DB, "socket_path": None}
+            for worker, port in enumerate(PARALLEL_REDIS_WORKER_PORTS[:worker_count])
+        ]
+
+    connection_kwargs = get_redis_client().connection_pool.connection_kwargs
+    worker_dbs = range(PARALLEL_REDIS_FIRST_WORKER_DB, PARALLEL_REDIS_LAST_WORKER_DB + 1)
+    return [
+        {
+            "worker": worker,
+            "host": connection_kwargs.get("host", LOCAL_REDIS_SESSIONS_HOST),
+            "port": connection_kwargs.get("port", 6379),
+            "db": db,
+            "socket_path": connection_kwargs.get("path"),
+        }
+        for worker, db in enumerate(list(worker_dbs)[:worker_count])
+    ]
+
+
+def get_redis_worker_client(slot: RedisWorkerSlot) -> redis.Redis:
+    if slot["socket_path"]:
+        return redis.Redis(unix_socket_path=slot["socket_path"], db=slot["db"],
+                           username=REDIS_SESSIONS_USERNAME, password=REDIS_SESSIONS_PASSWORD,
+                           socket_connect_timeout=REDIS_CONNECT_TIMEOUT)
+    return redis.Redis(host=slot["host"], port=slot["port"], db=slot["db"],
+                       username=REDIS_SESSIONS_USERNAME, password=REDIS_SESSIONS_PASSWORD,
+                       socket_connect_timeout=REDIS_CONNECT_TIMEOUT)
+
+
+def format_processor_command(
+    command_template: str,
+    slot: RedisWorkerSlot,
+    bookmark_obj: MatchedBookmarkObj,
+    run_id: str,
+) -> str:
+    return command_template.format(
+        redis_host=slot["host"],
+        processor_redis_host=get_processor_redis_host(slot["host"]),
+        redis_port=slot["port"],
+        redis_db=slot["db"],
+        worker=slot["worker"],
+        bookmark_path=shlex.quote(bookmark_obj["bookmark_path_colon_rel"]),
+        python=shlex.quote(sys.executable),
+        repo_root=shlex.quote(REPO_ROOT),
+        run_id=run_id,
+        signal=PROCESSOR_COMPLETION_SIGNAL,
+        signal_db=PROCESSOR_SIGNAL_DB,
+        signal_env=get_processor_signal_docker_exec_options(run_id),
+    )
+
+
+def run_bookmark_on_redis_worker(
+    bookmark_obj: MatchedBookmarkObj,
+    slot: RedisWorkerSlot,
+    r: redis.Redis,
+    command_template: str,
+    is_wait_for_async_processes: bool = True,
+) -> RedisWorkerResult:
+    """
+    Regression-run one bookmark on a worker's Redis: load its redis_before, run the processor command against that Redis,
+    and compare the after-state (read straight into memory) with the stored redis_after.json. Nothing is saved.
+    With PROCESSOR_COMPLETION_SIGNAL, the processor's signal (in PROCESSOR_SIGNAL_DB of the worker's Redis) is waited for
+    instead of sleeping ASYNC_WAIT_TIME. With PROCESSOR_TRIGGER="queue" and a live processor worker, the run is queued for
+    it instead of running the command.
+    """
+    bookmark_path_abs = bookmark_obj["bookmark_path_slash_abs"]
+    is_finalizer_failed = wait_for_bookmark_finalizer(bookmark_path_abs) != 0
+    redis_before_path = os.path.join(bookmark_path_abs, "redis_before.json")
+    golden_redis_after_path = os.path.join(bookmark_path_abs, "redis_after.json")
+    start_time = time.perf_counter()
+    async_seconds = None
+
+    def result(status: str, state_diff: dict[str, Any] | None = None, error: str | None = None) -> RedisWorkerResult:
+        return {
+            "bookmark_path_colon_rel": bookmark_obj["bookmark_path_colon_rel"],
+            "worker": slot["worker"],
+            "status": status,
+            "seconds": time.perf_counter() - start_time,
+            "async_seconds": async_seconds,
+            "state_diff": state_diff,
+            "error": error,
+        }
+
+    if is_finalizer_failed:
+        return result("error", error="the previous run's finalizer failed, its redis_after.json may be stale")
+    if not os.path.exists(redis_before_path):
+        return result("error", error="no redis_before.json")
+    if not os.path.exists(golden_redis_after_path):
+        return result("no_golden")
+
+    try:
+        write_encoded_redis_state_to_redis(r, load_encoded_redis_state(redis_before_path))
+    except Exception as e:
+        return result("error", error=f"loading redis_before: {e}")
+
+    run_id = new_processor_run_id()
+    signal_r = get_redis_worker_client({**slot, "db": PROCESSOR_SIGNAL_DB})
+    completion_wait = None
+    if PROCESSOR_COMPLETION_SIGNAL != "none":
+        try:
+            completion_wait = start_processor_completion_wait(signal_r, run_id)
+        except Exception as e:
+            return result("error", error=f"listening for the completion signal: {e}")
+
+    try:
+        if PROCESSOR_TRIGGER == "queue" and is_processor_worker_alive(signal_r):
+            run_request = new_processor_run_request(
+                run_id,
+                PROCESSOR_COMMAND_TIMEOUT,
+                gg_user_id=f"DEV_GG_USER_ID_{slot['worker']}",
+                bookmark_id=bookmark_obj["bookmark_path_colon_rel"],
+                redis_host=get_processor_redis_host(slot["host"]),
+                redis_port=slot["port"],
+                redis_db=slot["db"],
+            )
+            run_result = run_processor_via_queue(signal_r, run_request, PROCESSOR_COMMAND_TIMEOUT)
+            if run_result is None:
+                return result("error", error=f"no reply from the processor worker after {PROCESSOR_COMMAND_TIMEOUT}s")
+            if run_result["returncode"] != 0:
+                return result(
+                    "error", error=f"processor worker returned {run_result['returncode']}: {run_result['error'] or ''}")
+        else:
+            command = format_processor_command(command_template, slot, bookmark_obj, run_id)
+            try:
+                completed_process = subprocess.run(
+                    command, shell=True, check=False, capture_output=True, text=True, timeout=PROCESSOR_COMMAND_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                return result("error", error=f"processor timed out after {PROCESSOR_COMMAND_TIMEOUT}s")
+            if completed_process.returncode != 0:
+                output_lines = (completed_process.stderr or completed_process.stdout).strip().splitlines()
+                return result(
+                    "error", error=f"processor exited with {completed_process.returncode}: {output_lines[-1] if output_lines else ''}")
+
+        if completion_wait:
+            async_seconds = wait_for_processor_completion(completion_wait, PROCESSOR_COMPLETION_TIMEOUT)
+            if async_seconds is None:
+                return result("error", error=f"no completion signal after {PROCESSOR_COMPLETION_TIMEOUT}s")
+        elif is_wait_for_async_processes:
+            time.sleep(ASYNC_WAIT_TIME)
+    finally:
+        if completion_wait:
+            close_processor_completion_wait(completion_wait)
+
+    try:
+        state_diff = diff_redis_state_key_hashes(
+            *get_redis_state_key_hashes(golden_redis_after_path),
+            *get_redis_state_data_key_hashes(read_redis_state_data_from_redis(r)),
+            STATE_DIFF_IGNORED_KEY_PATTERNS,
+        )
+    except Exception as e:
+        return result("error", error=f"comparing with redis_after.json: {e}")
+
+    return result("passed" if is_redis_state_diff_empty(state_diff) else "failed", state_diff)
@@ -1,63 +1,380 @@
 #!/usr/bin/env python3
 """
-Convert flat Redis JSON exports into hierarchical "friendly" JSON structure
+Convert flat Redis JSON exports into hierarchical "friendly" JSON structure (and back, for hand-edited states)
+
+Plain state files are converted by streaming: only the keys (and offsets into a spill file) are held in memory, and the
+nested JSON is written out incrementally, sorted by colon path. If a key is both a value and the prefix of other keys
+(`a` and `a:b`), its value is written under the "" key of that branch: {"a": {"": ..., "b": ...}}.
 """
 import json
+import os
 import sys
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
-from app.consts.bookmarks_consts import IS_DEBUG
+from app.bookmarks.redis_states.redis_state_storage import (
+    get_file_sha256,
+    get_redis_state_file_format,
+    load_redis_state_file,
+    open_redis_state_file,
+    open_redis_state_file_for_writing,
+    read_stored_redis_state,
+    save_redis_state_file,
+)
+from app.consts.bookmarks_consts import (
+    FRIENDLY_REDIS_STATES_CACHE_DIR,
+    FRIENDLY_REDIS_STATES_CACHE_INDEX_PATH,
+    IS_DEBUG,
+)
 from app.utils.decorators import print_def_name
 
 IS_PRINT_DEF_NAME = True
 
+FRIENDLY_LEAF_KEY = ""
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_flat_redis_state_items(text_stream: IO[str]) -> Iterator[tuple[str, Any]]:
+    """
+    Iterate over the (key, value) pairs of a flat Redis JSON object without loading the whole file.
+    Only one value (and the read buffer) is held in memory at a time.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    is_eof = False
+    read_size = STREAM_CHUNK_SIZE
+
+    def read_more() -> None:
+        nonlocal buffer, pos, is_eof, read_size
+        chunk = text_stream.read(read_size)
+        if not chunk:
+            is_eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip_whitespace() -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer):
+                return
+            if is_eof:
+                raise json.JSONDecodeError("Unexpected end of file", buffer, pos)
+            read_more()
+
+    def expect(char: str) -> None:
+        nonlocal pos
+        skip_whitespace()
+        if buffer[pos] != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", buffer, pos)
+        pos += 1
+
+    def decode_next() -> Any:
+        # Values can span reads, and a number at the very end of the buffer may be cut off, so read until it is complete.
+        nonlocal pos, read_size
+        skip_whitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                if end < len(buffer) or is_eof:
+                    pos = end
+                    read_size = STREAM_CHUNK_SIZE
+                    return value
+            except json.JSONDecodeError:
+                if is_eof:
+                    raise
+            read_size *= 2
+            read_more()
+
+    expect("{")
+    is_first = True
+    while True:
+        skip_whitespace()
+        if buffer[pos] == "}":
+            return
+        if not is_first:
+            expect(",")
+        is_first = False
+
+        key = decode_next()
+        expect(":")
+        value = decode_next()
+        yield key, value
+
+
+def write_friendly_redis_state_key_index(
+    key_index: List[Tuple[List[str], Any]],
+    read_value: Callable[[Any], Any],
+    output_stream: IO[str],
+) -> None:
+    """
+    Write nested friendly JSON, sorted by colon path, from (key parts, value reference) pairs. Each value is only read
+    (with read_value) when it is written, so the caller decides where the values are held.
+    This is the one flat -> friendly conversion: files, in-memory states, and resolved manifests/deltas all go through it.
+    """
+    # Children sort right after their parent key, so a key that is also a prefix is followed by its first child.
+    key_index.sort(key=lambda indexed_key: indexed_key[0])
+    for i, (key_parts, value_ref) in enumerate(key_index[:-1]):
+        next_key_parts = key_index[i + 1][0]
+        if len(next_key_parts) > len(key_parts) and next_key_parts[:len(key_parts)] == key_parts:
+            key_index[i] = (key_parts + [FRIENDLY_LEAF_KEY], value_ref)
+
+    if not key_index:
+        output_stream.write("{}")
+        return
+
+    open_key_parts: List[str] = []
+    is_level_empty = [True]
+
+    def write_key(key_part: str) -> None:
+        depth = len(open_key_parts) + 1
+        output_stream.write("\n" if is_level_empty[-1] else ",\n")
+        is_level_empty[-1] = False
+        output_stream.write("  " * depth + json.dumps(key_part) + ": ")
+
+    output_stream.write("{")
+    for key_parts, value_ref in key_index:
+        parent_parts = key_parts[:-1]
+
+        # Close the branches that this key is not in
+        common_depth = 0
+        while (
+            common_depth < len(open_key_parts)
+            and common_depth < len(parent_parts)
+            and open_key_parts[common_depth] == parent_parts[common_depth]
+        ):
+            common_depth += 1
+        while len(open_key_parts) > common_depth:
+            open_key_parts.pop()
+            is_level_empty.pop()
+            output_stream.write("\n" + "  " * (len(open_key_parts) + 1) + "}")
+
+        # Open the branches that it is in
+        for key_part in parent_parts[common_depth:]:
+            write_key(key_part)
+            output_stream.write("{")
+            open_key_parts.append(key_part)
+            is_level_empty.append(True)
+
+        # The value, indented to its depth
+        write_key(key_parts[-1])
+        output_stream.write(
+            json.dumps(read_value(value_ref), indent=2).replace("\n", "\n" + "  " * (len(open_key_parts) + 1)))
+
+    while open_key_parts:
+        open_key_parts.pop()
+        output_stream.write("\n" + "  " * (len(open_key_parts) + 1) + "}")
+    output_stream.write("\n}")
+
+
+def write_friendly_redis_state_stream(
+    input_file_path: str,
+    output_stream: IO[str],
+) -> None:
+    """
+    Stream a plain flat Redis JSON file into nested friendly JSON, sorted by colon path.
+    Values are spilled to a temp file on the way in, so that memory only grows with the number of keys.
+    """
+    with tempfile.TemporaryFile() as spill_file:
+        key_index = []
+        with open_redis_state_file(input_file_path) as f:
+            for redis_key, value in iter_flat_redis_state_items(f):
+                encoded_value = json.dumps(value).encode("utf-8")
+                key_index.append((redis_key.split(':'), (spill_file.tell(), len(encoded_value))))
+                spill_file.write(encoded_value)
+
+        def read_spilled_value(value_ref: Tuple[int, int]) -> Any:
+            offset, length = value_ref
+            spill_file.seek(offset)
+            return json.loads(spill_file.read(length))
+
+        write_friendly_redis_state_key_index(key_index, read_spilled_value, output_stream)
+
+
+def write_friendly_redis_state_data_stream(
+    redis_data: Dict[str, Any],
+    output_stream: IO[str],
+) -> None:
+    """
+    Write a flat redis state that is already in memory as nested friendly JSON, sorted by colon path.
+    """
+    write_friendly_redis_state_key_index(
+        [(redis_key.split(':'), redis_key) for redis_key in redis_data], redis_data.__getitem__, output_stream)
+
+
+def write_friendly_redis_state_atomically(
+    output_file_path: str,
+    write_stream: Callable[[IO[str]], None],
+    compression: Optional[str] = None,
+) -> None:
+    tmp_output_file_path = f"{output_file_path}.{os.getpid()}.tmp"
+    try:
+        with open_redis_state_file_for_writing(tmp_output_file_path, compression) as output_stream:
+            write_stream(output_stream)
+        os.replace(tmp_output_file_path, output_file_path)
+    finally:
+        if os.path.exists(tmp_output_file_path):
+            os.remove(tmp_output_file_path)
+
+
+def write_friendly_redis_state_data(
+    redis_data: Dict[str, Any],
+    output_file_path: str,
+    compression: Optional[str] = None,
+) -> None:
+    """
+    Write the friendly view of a flat redis state that is already in memory (atomically).
+    """
+    write_friendly_redis_state_atomically(
+        output_file_path, lambda output_stream: write_friendly_redis_state_data_stream(redis_data, output_stream),
+        compression)
+
+
+def write_friendly_redis_state_file(
+    input_file_path: str,
+    output_file_path: str,
+    compression: Optional[str] = None,
+) -> None:
+    """
+    Write the friendly view of a stored redis state file (atomically). Plain states are streamed; manifests and deltas
+    have to be resolved in memory first.
+    """
+    if get_redis_state_file_format(input_file_path) != "plain":
+        write_friendly_redis_state_data(load_redis_state_file(input_file_path), output_file_path, compression)
+        return
+
+    write_friendly_redis_state_atomically(
+        output_file_path, lambda output_stream: write_friendly_redis_state_stream(input_file_path, output_stream),
+        compression)
+
 
-def set_nested_value(nested_dict: Dict[str, Any], key_parts: List[str], value: Any) -> None:
+def convert_friendly_to_redis(
+    friendly_data: Dict[str, Any],
+    reference_redis_keys: Optional[Set[str]] = None,
+) -> Dict[str, Any]:
     """
-    Set a value in a nested dictionary using a list of key parts
+    Convert a (possibly hand-edited) hierarchical structure back to flat Redis key-value pairs
 
     Args:
-        nested_dict: The dictionary to modify
-        key_parts: List of key parts (e.g., ['game', 'marvel_rivals', 'folder'])
-        value: The value to set
+        friendly_data: Dictionary with hierarchical structure
+        reference_redis_keys: The keys of the flat state it came from. Branches that are one of these keys are kept as
+            a single (object) value. Without it, everything is flattened down to non-object values.
+
+    Returns:
+        Dictionary with Redis keys as flat strings
     """
-    current = nested_dict
+    redis_data: Dict[str, Any] = {}
+
+    # Keys that other keys are nested under are always branches, even if they also hold a value
+    reference_redis_key_prefixes = set()
+    for reference_redis_key in reference_redis_keys or ():
+        key_parts = reference_redis_key.split(':')
+        for i in range(1, len(key_parts)):
+            reference_redis_key_prefixes.add(':'.join(key_parts[:i]))
 
-    # Navigate/create the nested structure
-    for part in key_parts[:-1]:
-        if part not in current:
-            current[part] = {}
-        current = current[part]
+    def flatten(node: Dict[str, Any], parent_key_parts: List[str]) -> None:
+        for key_part, value in node.items():
+            if key_part == FRIENDLY_LEAF_KEY and parent_key_parts:
+                parent_redis_key = ':'.join(parent_key_parts)
+                # "a:" and "a::b" split the same way as the leaf of "a", so only the reference can tell them apart
+                is_empty_key_part = (
+                    reference_redis_keys is not None
+                    and parent_redis_key not in reference_redis_keys
+                    and (f"{parent_redis_key}:" in reference_redis_keys
+                         or f"{parent_redis_key}:" in reference_redis_key_prefixes)
+                )
+                if not is_empty_key_part:
+                    redis_data[parent_redis_key] = value
+                    continue
 
-    # Set the final value
-    current[key_parts[-1]] = value
+            key_parts = parent_key_parts + [key_part]
+            redis_key = ':'.join(key_parts)
+            if isinstance(value, dict) and value and (
+                reference_redis_keys is None
+                or redis_key not in reference_redis_keys
+                or redis_key in reference_redis_key_prefixes
+            ):
+                flatten(value, key_parts)
+            else:
+                redis_data[redis_key] = value
+
+    flatten(friendly_data, [])
+    return redis_data
 
 
-def convert_redis_to_friendly(redis_data: Dict[str, Any]) -> Dict[str, Any]:
+def get_flat_redis_state_path(input_file_path: str) -> str:
+    """
+    The default flat output path for a friendly JSON file (friendly_redis_before.json -> redis_before.json)
     """
-    Convert flat Redis key-value pairs to hierarchical structure
+    input_path = Path(input_file_path)
+    if input_path.name.startswith('friendly_'):
+        return str(input_path.with_name(input_path.name[len('friendly_'):]))
+    return str(input_path.with_name(f'flat_{input_path.name}'))
+
+
+def get_redis_state_file_keys(redis_state_path: str) -> Set[str]:
+    if get_redis_state_file_format(redis_state_path) != "plain":
+        return set(load_redis_state_file(redis_state_path))
+    with open_redis_state_file(redis_state_path) as f:
+        return {redis_key for redis_key, _ in iter_flat_redis_state_items(f)}
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def convert_friendly_redis_state_file_to_flat_and_save(
+    input_file_path: str,
+    output_file_path: Optional[str] = None,
+    reference_file_path: Optional[str] = None,
+) -> bool:
+    """
+    Convert a (hand-edited) friendly JSON file back to a flat Redis JSON state
 
     Args:
-        redis_data: Dictionary with Redis keys as flat strings
+        input_file_path: Path to the friendly JSON file
+        output_file_path: Path for the flat output file (optional, default: friendly_redis_before.json -> redis_before.json)
+        reference_file_path: Flat state to take the key boundaries from (optional, default: the output file, if it exists)
 
     Returns:
-        Dictionary with hierarchical structure
+        True if successful, False otherwise
     """
-    friendly_data: Dict[str, Any] = {}
+    try:
+        if output_file_path is None:
+            output_file_path = get_flat_redis_state_path(input_file_path)
+        if reference_file_path is None and os.path.exists(output_file_path):
+            reference_file_path = output_file_path
+
+        reference_redis_keys = get_redis_state_file_keys(reference_file_path) if reference_file_path else None
+        redis_data = convert_friendly_to_redis(read_stored_redis_state(input_file_path), reference_redis_keys)
+
+        save_redis_state_file(output_file_path, redis_data)
+
+        if IS_DEBUG:
+            print(f"✅ Converted {input_file_path} → {output_file_path}")
+        return True
 
-    for redis_key, value in redis_data.items():
-        # Split the Redis key by colons
-        key_parts = redis_key.split(':')
+    except FileNotFoundError as e:
+        print(f"❌ File not found: {e.filename}")
+        return False
+    except json.JSONDecodeError as e:
+        print(f"❌ Invalid JSON in {input_file_path}: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Error converting {input_file_path}: {e}")
+        return False
 
-        # Handle single-level keys (no colons)
-        if len(key_parts) == 1:
-            friendly_data[redis_key] = value
-        else:
-            # Create nested structure
-            set_nested_value(friendly_data, key_parts, value)
 
-    return friendly_data
+def get_friendly_redis_state_path(input_file_path: str) -> str:
+    """
+    The default friendly output path for a flat Redis JSON file (redis_before.json -> friendly_redis_before.json)
+    """
+    input_path = Path(input_file_path)
+    if input_path.stem.endswith('_before'):
+        return str(input_path.with_name('friendly_redis_before.json'))
+    if input_path.stem.endswith('_after'):
+        return str(input_path.with_name('friendly_redis_after.json'))
+    return str(input_path.with_name(f'friendly_{input_path.name}'))
 
 
 @print_def_name(IS_PRINT_DEF_NAME)
@@ -73,26 +390,12 @@ def convert_redis_state_file_to_friendly_and_save(input_file_path: str, output_f
         True if successful, False otherwise
     """
     try:
-        # Read the flat Redis JSON
-        with open(input_file_path, 'r') as f:
-            redis_data = json.load(f)
-
-        # Convert to friendly format
-        friendly_data = convert_redis_to_friendly(redis_data)
-
         # Determine output path
         if output_file_path is None:
-            input_path = Path(input_file_path)
-            if input_path.stem.endswith('_before'):
-                output_file_path = str(input_path.with_name('friendly_redis_before.json'))
-            elif input_path.stem.endswith('_after'):
-                output_file_path = str(input_path.with_name('friendly_redis_after.json'))
-            else:
-                output_file_path = str(input_path.with_name(f'friendly_{input_path.name}'))
+            output_file_path = get_friendly_redis_state_path(input_file_path)
 
-        # Write the friendly JSON
-        with open(output_file_path, 'w') as f:
-            json.dump(friendly_data, f, indent=2)
+        # Convert and write the friendly JSON (compressed like the state files, if REDIS_STATE_COMPRESSION is set)
+        write_friendly_redis_state_file(input_file_path, output_file_path)
 
         if IS_DEBUG:
             print(f"✅ Converted {input_file_path} → {output_file_path}")
@@ -109,22 +412,103 @@ def convert_redis_state_file_to_friendly_and_save(input_file_path: str, output_f
         return False
 
 
+def update_friendly_redis_state_cache_index(redis_state_path: str, source_sha256: str) -> None:
+    """
+    Record the source state's current hash in the cache index, and delete the view of its previous hash unless another
+    state still has that hash.
+    """
+    try:
+        with open(FRIENDLY_REDIS_STATES_CACHE_INDEX_PATH) as f:
+            source_sha256s = json.load(f)
+    except (OSError, ValueError):
+        source_sha256s = {}
+
+    source_key = os.path.abspath(redis_state_path)
+    previous_sha256 = source_sha256s.get(source_key)
+    if previous_sha256 == source_sha256:
+        return
+
+    source_sha256s[source_key] = source_sha256
+    if previous_sha256 and previous_sha256 not in source_sha256s.values():
+        try:
+            os.remove(os.path.join(FRIENDLY_REDIS_STATES_CACHE_DIR, f"{previous_sha256}.json"))
+            if IS_DEBUG:
+                print(f"🗑️  Dropped the stale friendly view of {redis_state_path} ({previous_sha256})")
+        except FileNotFoundError:
+            pass
+
+    tmp_index_path = f"{FRIENDLY_REDIS_STATES_CACHE_INDEX_PATH}.{os.getpid()}.tmp"
+    with open(tmp_index_path, "w") as f:
+        json.dump(source_sha256s, f)
+    os.replace(tmp_index_path, FRIENDLY_REDIS_STATES_CACHE_INDEX_PATH)
+
+
+def get_friendly_redis_state_view(redis_state_path: str) -> str:
+    """
+    Get the friendly view of a stored redis state, generating it on demand.
+    Views are cached in FRIENDLY_REDIS_STATES_CACHE_DIR by the source file's hash, so they are only built once per state,
+    and the view of a state's previous hash is dropped when it changes.
+
+    Returns:
+        The path of the (uncompressed) friendly JSON file
+    """
+    source_sha256 = get_file_sha256(redis_state_path)
+    friendly_view_path = os.path.join(FRIENDLY_REDIS_STATES_CACHE_DIR, f"{source_sha256}.json")
+
+    if os.path.exists(friendly_view_path):
+        if IS_DEBUG:
+            print(f"💾 Using cached friendly view: {friendly_view_path}")
+    else:
+        os.makedirs(FRIENDLY_REDIS_STATES_CACHE_DIR, exist_ok=True)
+        write_friendly_redis_state_file(redis_state_path, friendly_view_path, compression="none")
+        if IS_DEBUG:
+            print(f"✅ Converted {redis_state_path} → {friendly_view_path}")
+
+    update_friendly_redis_state_cache_index(redis_state_path, source_sha256)
+    return friendly_view_path
+
+
 def main() -> int:
     """Main function for command line usage"""
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+
+    is_reverse = "--reverse" in args
+    if is_reverse:
+        args.remove("--reverse")
+
+    reference_file = None
+    if "--reference" in args:
+        reference_index = args.index("--reference")
+        if reference_index + 1 >= len(args):
+            print("❌ --reference needs a flat Redis JSON file")
+            return 1
+        reference_file = args[reference_index + 1]
+        del args[reference_index:reference_index + 2]
+
+    if not args:
         print("Usage: python redis_friendly_converter.py <input_file> [output_file]")
-        print("  input_file:  Path to flat Redis JSON export")
-        print("  output_file: Optional path for friendly output (default: auto-generated)")
+        print("       python redis_friendly_converter.py --reverse <friendly_file> [output_file] [--reference <flat_file>]")
+        print("  input_file:     Path to flat Redis JSON export")
+        print("  friendly_file:  Path to a (hand-edited) friendly JSON file to convert back to flat")
+        print("  output_file:    Optional path for the output (default: auto-generated)")
+        print("  --reference:    Flat state to take the key boundaries from (default: the output file, if it exists)")
         print("")
         print("Examples:")
         print("  python redis_friendly_converter.py redis_before.json")
         print("  python redis_friendly_converter.py redis_before.json friendly_before.json")
+        print("  python redis_friendly_converter.py --reverse friendly_redis_before.json")
+        print("  python redis_friendly_converter.py --reverse friendly_before.json edited_before.json --reference redis_before.json")
         return 1
 
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    input_file = args[0]
+    output_file = args[1] if len(args) > 1 else None
+
+    if is_reverse:
+        is_success = convert_friendly_redis_state_file_to_flat_and_save(input_file, output_file, reference_file)
+    else:
+        is_success = convert_redis_state_file_to_friendly_and_save(input_file, output_file)
 
-    if convert_redis_state_file_to_friendly_and_save(input_file, output_file):
+    if is_success:
         return 0
     else:
         return 1
@@ -0,0 +1,226 @@
+"""
+Structural diff between two stored redis states (e.g. a bookmark's redis_before and redis_after)
+
+Changed keys are found by comparing per-key hashes of the values (manifests already store them, so their blobs are only
+read for the keys that changed). Only the values of changed keys are diffed recursively.
+"""
+import hashlib
+import json
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.bookmarks.redis_states.redis_state_storage import (
+    is_redis_state_manifest,
+    load_redis_state_file,
+    read_redis_state_object,
+    read_stored_redis_state,
+)
+from app.utils.printing_utils import print_color
+
+MISSING = object()
+
+
+def get_redis_state_key_hashes(redis_state_path: str) -> Tuple[Dict[str, str], Callable[[str], Any]]:
+    """
+    The sha256 of every key's value (hashed the same way as the stored objects), and a getter for the values.
+    """
+    stored_data = read_stored_redis_state(redis_state_path)
+    if is_redis_state_manifest(stored_data):
+        key_hashes = stored_data["keys"]
+        return key_hashes, lambda key: read_redis_state_object(key_hashes[key])
+
+    return get_redis_state_data_key_hashes(load_redis_state_file(redis_state_path))
+
+
+def get_redis_state_data_key_hashes(data: Dict[str, Any]) -> Tuple[Dict[str, str], Callable[[str], Any]]:
+    """
+    Same as get_redis_state_key_hashes, for a redis state dict that is already in memory.
+    """
+    key_hashes = {
+        key: hashlib.sha256(json.dumps(value).encode("utf-8")).hexdigest()
+        for key, value in data.items()
+    }
+    return key_hashes, data.__getitem__
+
+
+def is_key_ignored(redis_key: str, ignored_key_patterns: List[str]) -> bool:
+    return any(fnmatchcase(redis_key, pattern) for pattern in ignored_key_patterns)
+
+
+def is_change_ignored(redis_key: str, change: Dict[str, Any], ignored_key_patterns: List[str]) -> bool:
+    """
+    Patterns can also name paths inside a value: `<key pattern>.<field>.<field>`, e.g. `session:*.updated_at`.
+    """
+    if not change["path"]:
+        return False
+    change_path = f"{redis_key}.{'.'.join(str(part) for part in change['path'])}"
+    return any(fnmatchcase(change_path, pattern) for pattern in ignored_key_patterns)
+
+
+def diff_json_values(before: Any, after: Any, path: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Recursive diff of two JSON values. Dicts are compared by key and lists by index; anything else is replaced whole.
+    Returns a list of {"path": [...], "op": "added" | "removed" | "changed", "before": ..., "after": ...}
+    """
+    path = path or []
+
+    if isinstance(before, dict) and isinstance(after, dict):
+        changes = []
+        for key in before.keys() | after.keys():
+            changes.extend(diff_json_values(before.get(key, MISSING), after.get(key, MISSING), path + [key]))
+        return sorted(changes, key=lambda change: [str(part) for part in change["path"]])
+
+    if isinstance(before, list) and isinstance(after, list):
+        changes = []
+        for i in range(max(len(before), len(after))):
+            changes.extend(diff_json_values(
+                before[i] if i < len(before) else MISSING,
+                after[i] if i < len(after) else MISSING,
+                path + [i],
+            ))
+        return changes
+
+    if before is MISSING:
+        return [{"path": path, "op": "added", "after": after}]
+    if after is MISSING:
+        return [{"path": path, "op": "removed", "before": before}]
+    if before != after:
+        return [{"path": path, "op": "changed", "before": before, "after": after}]
+    return []
+
+
+def diff_redis_state_files(
+    before_path: str,
+    after_path: str,
+    ignored_key_patterns: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Diff two stored redis state files.
+    Returns {"added": {key: value}, "removed": {key: value}, "changed": {key: [changes]}, "ignored": count}
+    """
+    return diff_redis_state_key_hashes(
+        *get_redis_state_key_hashes(before_path),
+        *get_redis_state_key_hashes(after_path),
+        ignored_key_patterns,
+    )
+
+
+def diff_redis_state_key_hashes(
+    before_hashes: Dict[str, str],
+    get_before_value: Callable[[str], Any],
+    after_hashes: Dict[str, str],
+    get_after_value: Callable[[str], Any],
+    ignored_key_patterns: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Diff two redis states by their per-key hashes (see get_redis_state_key_hashes), only reading the values of changed keys.
+    """
+    ignored_key_patterns = ignored_key_patterns or []
+
+    state_diff: Dict[str, Any] = {"added": {}, "removed": {}, "changed": {}, "ignored": 0}
+    for key in sorted(before_hashes.keys() | after_hashes.keys()):
+        before_hash = before_hashes.get(key)
+        after_hash = after_hashes.get(key)
+        if before_hash == after_hash:
+            continue
+        if is_key_ignored(key, ignored_key_patterns):
+            state_diff["ignored"] += 1
+            continue
+
+        if before_hash is None:
+            state_diff["added"][key] = get_after_value(key)
+        elif after_hash is None:
+            state_diff["removed"][key] = get_before_value(key)
+        else:
+            changes = diff_json_values(get_before_value(key), get_after_value(key))
+            # Same value, only encoded differently (e.g. dict key order)
+            if not changes:
+                continue
+            unignored_changes = [
+                change for change in changes if not is_change_ignored(key, change, ignored_key_patterns)]
+            if not unignored_changes:
+                state_diff["ignored"] += 1
+                continue
+            state_diff["changed"][key] = unignored_changes
+
+    return state_diff
+
+
+def format_diff_value(value: Any) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+def print_redis_state_diff_tree(state_diff: Dict[str, Any]) -> None:
+    """
+    Print the diff as a tree of colon-separated keys: green for added, red for removed, yellow for changed.
+    """
+    entries = []
+    for key, value in state_diff["added"].items():
+        entries.append((key.split(':'), "added", [{"path": [], "op": "added", "after": value}]))
+    for key, value in state_diff["removed"].items():
+        entries.append((key.split(':'), "removed", [{"path": [], "op": "removed", "before": value}]))
+    for key, changes in state_diff["changed"].items():
+        entries.append((key.split(':'), "changed", changes))
+    entries.sort(key=lambda entry: entry[0])
+
+    op_colors = {"added": "green", "removed": "red", "changed": "yellow"}
+    op_symbols = {"added": "+", "removed": "-", "changed": "~"}
+
+    printed_key_parts: List[str] = []
+    for key_parts, key_op, changes in entries:
+        common_depth = 0
+        while (
+            common_depth < len(printed_key_parts)
+            and common_depth < len(key_parts) - 1
+            and printed_key_parts[common_depth] == key_parts[common_depth]
+        ):
+            common_depth += 1
+        for depth in range(common_depth, len(key_parts) - 1):
+            print("   " * depth + f"📁 {key_parts[depth]}")
+        printed_key_parts = key_parts[:-1]
+
+        indent = "   " * (len(key_parts) - 1)
+        print_color(f"{indent}{op_symbols[key_op]} {key_parts[-1]}", op_colors[key_op])
+        for change in changes:
+            change_path = ".".join(str(part) for part in change["path"])
+            change_label = f"{change_path}: " if change_path else ""
+            if change["op"] == "changed":
+                change_text = f"{format_diff_value(change['before'])} → {format_diff_value(change['after'])}"
+            else:
+                change_text = format_diff_value(change.get("after", change.get("before")))
+            print_color(f"{indent}   {op_symbols[change['op']]} {change_label}{change_text}", op_colors[change["op"]])
+
+    print_redis_state_diff_counts(state_diff)
+
+
+def print_redis_state_diff_counts(state_diff: Dict[str, Any]) -> None:
+    print(
+        f"{len(state_diff['added'])} added, {len(state_diff['removed'])} removed, "
+        f"{len(state_diff['changed'])} changed"
+        + (f" ({state_diff['ignored']} ignored)" if state_diff["ignored"] else "")
+    )
+
+
+def is_redis_state_diff_empty(state_diff: Dict[str, Any]) -> bool:
+    return not (state_diff["added"] or state_diff["removed"] or state_diff["changed"])
+
+
+def print_redis_state_diff_summary(state_diff: Dict[str, Any], max_keys: int = 10) -> None:
+    """
+    One line per differing key (up to max_keys), e.g. for --verify runs across a whole folder.
+    """
+    summary_lines = []
+    for key in state_diff["added"]:
+        summary_lines.append(("green", f"  + {key}"))
+    for key in state_diff["removed"]:
+        summary_lines.append(("red", f"  - {key}"))
+    for key, changes in state_diff["changed"].items():
+        change_paths = [".".join(str(part) for part in change["path"]) or "(value)" for change in changes]
+        summary_lines.append(
+            ("yellow", f"  ~ {key}: {', '.join(change_paths[:3])}" + (" ..." if len(change_paths) > 3 else "")))
+
+    for color, summary_line in sorted(summary_lines, key=lambda line: line[1][4:])[:max_keys]:
+        print_color(summary_line, color)
+    if len(summary_lines) > max_keys:
+        print(f"  ... and {len(summary_lines) - max_keys} more")
+    print_redis_state_diff_counts(state_diff)
@@ -1,12 +1,20 @@
 from typing import Literal
 
+from app.bookmarks.redis_states.redis_state_handlers.handle_export_direct_redis_to_dump import (
+    handle_export_direct_redis_to_dump,
+)
 from app.bookmarks.redis_states.redis_state_handlers.handle_export_docker_redis_to_dump import (
     handle_export_docker_redis_to_redis_dump,
 )
-from app.bookmarks.redis_states.redis_state_handlers.handle_export_local_redis_to_dump import (
-    handle_export_local_redis_to_dump,
+from app.bookmarks.redis_states.redis_state_handlers.handle_snapshot_redis_to_snapshot_db import (
+    handle_snapshot_redis_to_snapshot_db,
+)
+from app.consts.bookmarks_consts import (
+    IS_DOCKER_REDIS_DIRECT,
+    IS_LOCAL_REDIS_DEV,
+    IS_REDIS_DIRECTLY_REACHABLE,
+    IS_REDIS_SERVER_SIDE_SNAPSHOTS,
 )
-from app.consts.bookmarks_consts import IS_LOCAL_REDIS_DEV
 from app.utils.decorators import print_def_name
 
 IS_PRINT_DEF_NAME = True
@@ -21,14 +29,26 @@ def handle_export_from_redis(
     It first copies the redis_before.json to the redis dump directory and then loads it into the redis database.
     It then cleans up the temp file.
     """
+    # Checkpoint on the server - only written to the redis dump once a bookmark file needs it.
+    if IS_REDIS_DIRECTLY_REACHABLE and IS_REDIS_SERVER_SIDE_SNAPSHOTS:
+        return handle_snapshot_redis_to_snapshot_db(before_or_after)
+
     # Export from redis to redis dump
     if IS_LOCAL_REDIS_DEV:
-        results =  handle_export_local_redis_to_dump(before_or_after)
-        if results == 1:
-            return 1
-    else:
-        results = handle_export_docker_redis_to_redis_dump(before_or_after)
+        results =  handle_export_direct_redis_to_dump(before_or_after)
         if results == 1:
             return 1
+        return 0
+
+    # Docker, direct connection: same pipelined exporter as local, without the `docker exec` startup.
+    if IS_DOCKER_REDIS_DIRECT:
+        results = handle_export_direct_redis_to_dump(before_or_after)
+        if results == 0:
+            return 0
+        print("⚠️  Direct Docker Redis export failed, falling back to docker exec")
+
+    results = handle_export_docker_redis_to_redis_dump(before_or_after)
+    if results == 1:
+        return 1
 
     return 0
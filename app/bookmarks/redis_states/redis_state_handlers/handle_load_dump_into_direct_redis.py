@@ -0,0 +1,68 @@
+import json
+import os
+from typing import Literal
+
+from app.bookmarks.redis_states.redis_state_utils import (
+    get_redis_client,
+    get_temp_redis_state_name,
+    load_encoded_redis_state,
+    write_encoded_redis_state_to_redis,
+    write_redis_state_data_to_redis,
+)
+from app.consts.bookmarks_consts import REDIS_DUMP_DIR
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_load_dump_into_direct_redis(
+    before_or_after: Literal["before", "after"],
+    origin_bm_redis_state_path: str | None = None,
+) -> int:
+    """
+    This function is used to load the redis state from the redis dump directory into the redis database.
+    If we know the origin state file (the dump is a copy of it), load from its encoded cache instead - no JSON parsing on reruns.
+    Over a direct connection: the local dev Redis, or the Docker one with IS_DOCKER_REDIS_DIRECT.
+    """
+    if origin_bm_redis_state_path and os.path.exists(origin_bm_redis_state_path):
+        try:
+            encoded_items = load_encoded_redis_state(origin_bm_redis_state_path)
+            write_encoded_redis_state_to_redis(get_redis_client(), encoded_items)
+        except Exception as e:
+            print(f"❌ Error loading {origin_bm_redis_state_path} into Redis: {e}")
+            return 1
+
+        print(f"Redis data restored from {origin_bm_redis_state_path} ({len(encoded_items)} keys)!")
+        return 0
+
+    filename = get_temp_redis_state_name(before_or_after)
+
+
+    json_filepath = f"{REDIS_DUMP_DIR}/{filename}.json"
+
+    data = None
+    if os.path.exists(json_filepath):
+        try:
+            with open(json_filepath, "r") as f:
+                data = json.load(f)
+            print(f"Loaded backup from {json_filepath} (JSON)")
+        except Exception as e:
+            print(f"Failed to load JSON: {e}")
+
+    if data is None:
+        print("No backup file found or failed to load.")
+        return 1
+
+    # Wipe the database, then restore the state
+    try:
+        r = get_redis_client()
+        r.flushdb()
+        print("Redis database wiped.")
+        write_redis_state_data_to_redis(r, data, is_flushdb=False)
+    except Exception as e:
+        print(f"❌ Error loading Redis Dump into Redis: {e}")
+        return 1
+
+    print("Redis data restored!")
+    return 0
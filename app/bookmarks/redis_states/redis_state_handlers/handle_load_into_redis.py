@@ -1,12 +1,22 @@
+import os
 from typing import Literal
 
+from app.bookmarks.redis_states.redis_state_handlers.handle_load_dump_into_direct_redis import (
+    handle_load_dump_into_direct_redis,
+)
 from app.bookmarks.redis_states.redis_state_handlers.handle_load_dump_into_docker_redis import (
     handle_load_dump_into_docker_redis,
 )
-from app.bookmarks.redis_states.redis_state_handlers.handle_load_dump_into_local_redis import (
-    handle_load_dump_into_local_redis,
+from app.bookmarks.redis_states.redis_state_handlers.handle_mass_insert_redis_state import (
+    get_redis_state_load_size,
+    handle_mass_insert_redis_state,
+)
+from app.consts.bookmarks_consts import (
+    IS_DOCKER_REDIS_DIRECT,
+    IS_LOCAL_REDIS_DEV,
+    IS_REDIS_DIRECTLY_REACHABLE,
+    REDIS_MASS_INSERT_MIN_BYTES,
 )
-from app.consts.bookmarks_consts import IS_LOCAL_REDIS_DEV
 from app.utils.decorators import print_def_name
 
 IS_PRINT_DEF_NAME = True
@@ -14,23 +24,48 @@ IS_PRINT_DEF_NAME = True
 
 @print_def_name(IS_PRINT_DEF_NAME)
 def handle_load_into_redis(
-    before_or_after: Literal["before", "after"] = "after"
+    before_or_after: Literal["before", "after"] = "after",
+    origin_bm_redis_state_path: str | None = None,
 ) -> int:
     """
     This function is used to load the redis state into the redis database.
     It first copies the redis_before.json to the redis dump directory and then loads it into the redis database.
     It then cleans up the temp file.
+
+    Large origin states (>= REDIS_MASS_INSERT_MIN_BYTES, see get_redis_state_load_size) are streamed from a cached RESP file instead (mass insertion).
     """
 
+    # Mass insertion: stream the origin state's cached RESP file straight into Redis.
+    if (
+        IS_REDIS_DIRECTLY_REACHABLE
+        and origin_bm_redis_state_path
+        and os.path.exists(origin_bm_redis_state_path)
+        and get_redis_state_load_size(origin_bm_redis_state_path) >= REDIS_MASS_INSERT_MIN_BYTES
+    ):
+        results = handle_mass_insert_redis_state(origin_bm_redis_state_path)
+        if results == 0:
+            return 0
+        print("⚠️  Redis mass insertion failed, falling back to loading the redis dump")
+
     # Import from redis dump
 
     if IS_LOCAL_REDIS_DEV:
-        results = handle_load_dump_into_local_redis(before_or_after)
-        if results == 1:
-            return 1
-    else:
-        results = handle_load_dump_into_docker_redis(before_or_after)
+        results = handle_load_dump_into_direct_redis(
+            before_or_after, origin_bm_redis_state_path)
         if results == 1:
             return 1
+        return 0
+
+    # Docker, direct connection: same pipelined loader as local, without the `docker exec` startup.
+    if IS_DOCKER_REDIS_DIRECT:
+        results = handle_load_dump_into_direct_redis(
+            before_or_after, origin_bm_redis_state_path)
+        if results == 0:
+            return 0
+        print("⚠️  Direct Docker Redis load failed, falling back to docker exec")
+
+    results = handle_load_dump_into_docker_redis(before_or_after)
+    if results == 1:
+        return 1
 
     return 0
\ No newline at end of file
@@ -0,0 +1,221 @@
+import os
+import socket
+import threading
+import uuid
+
+from app.bookmarks.redis_states.redis_state_utils import (
+    get_encoded_redis_state_cache_path,
+    get_redis_client,
+    get_redis_state_file_hash,
+    load_encoded_redis_state,
+)
+from app.consts.bookmarks_consts import (
+    IS_DEBUG,
+    LOCAL_REDIS_SESSIONS_DB,
+    REDIS_CONNECT_TIMEOUT,
+    REDIS_MASS_INSERT_TIMEOUT,
+)
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+RESP_CACHE_HEADER_PREFIX = b"# gg-resp sha256="
+
+
+def get_redis_state_resp_cache_path(redis_state_path: str) -> str:
+    """
+    The RESP cache lives next to the state it was rendered from, e.g. redis_before.json -> .redis_before.resp
+    """
+    state_dir, state_filename = os.path.split(redis_state_path)
+    return os.path.join(state_dir, f".{os.path.splitext(state_filename)[0]}.resp")
+
+
+def encode_resp_command(*args: bytes) -> bytes:
+    resp_parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        resp_parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(resp_parts)
+
+
+def read_resp_cache_hash(resp_cache_path: str) -> str | None:
+    try:
+        with open(resp_cache_path, "rb") as f:
+            header = f.readline()
+    except OSError:
+        return None
+
+    if not header.startswith(RESP_CACHE_HEADER_PREFIX):
+        return None
+    return header[len(RESP_CACHE_HEADER_PREFIX):].strip().decode("ascii")
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def render_redis_state_to_resp_cache(
+    redis_state_path: str,
+    resp_cache_path: str,
+    redis_state_hash: str,
+) -> int:
+    """
+    Render a redis state JSON into a file of raw RESP SET commands, headed by the hash of the JSON it came from.
+    The file does not SELECT or FLUSHDB, so that it can be streamed into any DB.
+    Values come from the encoded redis state cache, so re-renders skip the JSON parsing.
+    Returns: 0 if successful, 1 if error.
+    """
+    try:
+        encoded_items = load_encoded_redis_state(redis_state_path, redis_state_hash)
+    except Exception as e:
+        print(f"❌ Error reading redis state {redis_state_path}: {e}")
+        return 1
+
+    tmp_resp_cache_path = f"{resp_cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_resp_cache_path, "wb") as f:
+            f.write(RESP_CACHE_HEADER_PREFIX + redis_state_hash.encode("ascii") + b"\n")
+            for key, value in encoded_items:
+                f.write(encode_resp_command(b"SET", key, value))
+        os.replace(tmp_resp_cache_path, resp_cache_path)
+    except Exception as e:
+        print(f"❌ Error writing RESP cache {resp_cache_path}: {e}")
+        if os.path.exists(tmp_resp_cache_path):
+            os.remove(tmp_resp_cache_path)
+        return 1
+
+    if IS_DEBUG:
+        print(f"💾 Rendered {len(encoded_items)} keys into {resp_cache_path}")
+    return 0
+
+
+def send_redis_socket_command(sock: socket.socket, *args: bytes) -> None:
+    """
+    Send one command on a raw Redis socket and wait for its (single line) reply, raising on an error reply.
+    """
+    sock.sendall(encode_resp_command(*args))
+    reply = b""
+    while not reply.endswith(b"\r\n"):
+        chunk = sock.recv(1024)
+        if not chunk:
+            raise ConnectionError("Redis closed the connection")
+        reply += chunk
+    if reply.startswith(b"-"):
+        raise ConnectionError(f"{args[0].decode('ascii')} failed: {reply[1:].strip().decode('utf-8', 'replace')}")
+
+
+def open_redis_socket(db: int | None = None) -> socket.socket:
+    """
+    Open a raw socket to the same Redis that get_redis_client() talks to, authenticated the same way, with `db` selected
+    (the client's DB if None).
+    """
+    connection_kwargs = get_redis_client().connection_pool.connection_kwargs
+
+    if connection_kwargs.get("path"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(REDIS_CONNECT_TIMEOUT)
+        sock.connect(connection_kwargs["path"])
+    else:
+        sock = socket.create_connection(
+            (connection_kwargs.get("host", "localhost"), connection_kwargs.get("port", 6379)),
+            timeout=REDIS_CONNECT_TIMEOUT,
+        )
+
+    try:
+        if connection_kwargs.get("password"):
+            auth_args = [connection_kwargs["password"].encode("utf-8")]
+            if connection_kwargs.get("username"):
+                auth_args.insert(0, connection_kwargs["username"].encode("utf-8"))
+            send_redis_socket_command(sock, b"AUTH", *auth_args)
+        send_redis_socket_command(
+            sock, b"SELECT", str(connection_kwargs.get("db", 0) if db is None else db).encode("ascii"))
+    except Exception:
+        sock.close()
+        raise
+
+    sock.settimeout(REDIS_MASS_INSERT_TIMEOUT)
+    return sock
+
+
+def get_redis_state_load_size(redis_state_path: str) -> int:
+    """
+    About how many bytes loading a redis state streams into Redis, without decoding it: the size of its RESP (or encoded)
+    cache if it was loaded before, or else of the stored file. A compressed state or a manifest looks smaller than it
+    is until then - its first load goes through the pipelined loader, which writes the encoded cache.
+    """
+    for derived_cache_path in (
+        get_redis_state_resp_cache_path(redis_state_path),
+        get_encoded_redis_state_cache_path(redis_state_path),
+    ):
+        if os.path.exists(derived_cache_path):
+            return os.path.getsize(derived_cache_path)
+
+    return os.path.getsize(redis_state_path)
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_mass_insert_redis_state(
+    redis_state_path: str,
+    db: int = LOCAL_REDIS_SESSIONS_DB,
+) -> int:
+    """
+    Wipe the given Redis DB and load a redis state into it Redis mass-insertion style: the state is rendered once into a
+    RESP file (re-rendered whenever the JSON's hash changes), which is then written to the socket in one sequential stream.
+    Replies are drained on a second thread until our ECHO marker comes back.
+    Returns: 0 if successful, 1 if error.
+    """
+    resp_cache_path = get_redis_state_resp_cache_path(redis_state_path)
+
+    try:
+        redis_state_hash = get_redis_state_file_hash(redis_state_path)
+    except OSError as e:
+        print(f"❌ Error reading redis state {redis_state_path}: {e}")
+        return 1
+
+    if read_resp_cache_hash(resp_cache_path) != redis_state_hash:
+        result = render_redis_state_to_resp_cache(
+            redis_state_path, resp_cache_path, redis_state_hash)
+        if result != 0:
+            return result
+    elif IS_DEBUG:
+        print(f"💾 Using cached RESP file {resp_cache_path}")
+
+    marker = f"gg-mass-insert-{uuid.uuid4().hex}".encode("ascii")
+    marker_reply = marker + b"\r\n"
+    replies = bytearray()
+    reader_errors = []
+
+    def drain_replies(sock: socket.socket):
+        try:
+            while not replies.endswith(marker_reply):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    raise ConnectionError("Redis closed the connection")
+                replies.extend(chunk)
+        except Exception as e:
+            reader_errors.append(e)
+
+    try:
+        with open_redis_socket(db) as sock:
+            reader = threading.Thread(target=drain_replies, args=(sock,), daemon=True)
+            reader.start()
+
+            sock.sendall(encode_resp_command(b"FLUSHDB"))
+            with open(resp_cache_path, "rb") as f:
+                f.readline()  # hash header
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sock.sendall(chunk)
+            sock.sendall(encode_resp_command(b"ECHO", marker))
+
+            reader.join(REDIS_MASS_INSERT_TIMEOUT)
+    except Exception as e:
+        print(f"❌ Error mass-inserting redis state into Redis: {e}")
+        return 1
+
+    if reader_errors or not replies.endswith(marker_reply):
+        print(f"❌ Error mass-inserting redis state into Redis: {reader_errors[0] if reader_errors else 'timed out'}")
+        return 1
+
+    error_replies = [line for line in replies.split(b"\r\n") if line.startswith(b"-")]
+    if error_replies:
+        print(f"❌ Redis mass insertion had {len(error_replies)} errors, e.g. {error_replies[0].decode('utf-8', 'replace')}")
+        return 1
+
+    print(f"Redis data restored (mass insertion from {resp_cache_path})!")
+    return 0
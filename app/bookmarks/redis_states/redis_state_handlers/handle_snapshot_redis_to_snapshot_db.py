@@ -0,0 +1,96 @@
+from typing import Literal
+
+import redis
+
+from app.bookmarks.redis_states.redis_state_utils import (
+    get_redis_client,
+    get_temp_redis_state_name,
+    read_redis_state_data_from_redis,
+    write_redis_state_data_to_dump,
+)
+from app.consts.bookmarks_consts import (
+    IS_DEBUG,
+    LOCAL_REDIS_SNAPSHOT_AFTER_DB,
+    LOCAL_REDIS_SNAPSHOT_BEFORE_DB,
+)
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+# Snapshots that have been taken on the server, but not yet written to the redis dump directory.
+pending_redis_snapshots: set[str] = set()
+
+
+def get_redis_snapshot_db(before_or_after: Literal["before", "after"]) -> int:
+    if before_or_after == "before":
+        return LOCAL_REDIS_SNAPSHOT_BEFORE_DB
+    return LOCAL_REDIS_SNAPSHOT_AFTER_DB
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_snapshot_redis_to_snapshot_db(before_or_after: Literal["before", "after"]) -> int:
+    """
+    Checkpoint the current Redis database into its reserved snapshot DB, entirely on the server.
+    Uses COPY (Redis 6.2+), falling back to DUMP/RESTORE on older servers. Nothing is decoded in Python.
+    Returns: 0 if successful, 1 if error.
+    """
+    snapshot_db = get_redis_snapshot_db(before_or_after)
+
+    try:
+        r = get_redis_client()
+        snapshot_r = get_redis_client(snapshot_db)
+
+        snapshot_r.flushdb()
+        keys = list(r.scan_iter('*', count=1000))
+
+        try:
+            pipe = r.pipeline(transaction=False)
+            for key in keys:
+                pipe.copy(key, key, destination_db=snapshot_db, replace=True)
+            pipe.execute()
+        except redis.ResponseError as e:
+            if IS_DEBUG:
+                print(f"⚠️  COPY is not supported, falling back to DUMP/RESTORE: {e}")
+
+            pipe = r.pipeline(transaction=False)
+            for key in keys:
+                pipe.dump(key)
+            dumped_values = pipe.execute()
+
+            pipe = snapshot_r.pipeline(transaction=False)
+            for key, dumped_value in zip(keys, dumped_values):
+                if dumped_value is not None:
+                    pipe.restore(key, 0, dumped_value, replace=True)
+            pipe.execute()
+    except Exception as e:
+        print(f"❌ Error snapshotting Redis to snapshot DB {snapshot_db}: {e}")
+        return 1
+
+    pending_redis_snapshots.add(before_or_after)
+
+    if IS_DEBUG:
+        print(f"📸 Snapshotted {len(keys)} keys into Redis DB {snapshot_db} ({before_or_after})")
+    return 0
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_materialize_redis_snapshot_to_dump(before_or_after: Literal["before", "after"]) -> int:
+    """
+    Write a pending server-side snapshot to the redis dump directory, for when a bookmark file actually needs writing.
+    Does nothing if there is no pending snapshot (the dump file is already up to date).
+    Returns: 0 if successful, 1 if error.
+    """
+    if before_or_after not in pending_redis_snapshots:
+        return 0
+
+    try:
+        data = read_redis_state_data_from_redis(
+            get_redis_client(get_redis_snapshot_db(before_or_after)))
+    except Exception as e:
+        print(f"❌ Error reading Redis snapshot ({before_or_after}): {e}")
+        return 1
+
+    write_redis_state_data_to_dump(get_temp_redis_state_name(before_or_after), data)
+    pending_redis_snapshots.discard(before_or_after)
+
+    return 0
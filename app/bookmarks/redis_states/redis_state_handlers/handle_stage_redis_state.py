@@ -0,0 +1,203 @@
+import json
+import os
+import subprocess
+import sys
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+from app.bookmarks.bookmark_finalizer import wait_for_bookmark_finalizer
+from app.bookmarks.redis_states.redis_state_utils import (
+    get_redis_client,
+    load_encoded_redis_state,
+    write_encoded_redis_state_to_redis,
+)
+from app.consts.bookmarks_consts import (
+    IS_DEBUG,
+    IS_REDIS_DIRECTLY_REACHABLE,
+    LOCAL_REDIS_SESSIONS_DB,
+    LOCAL_REDIS_STAGING_DB,
+    REDIS_DUMP_DIR,
+    REPO_ROOT,
+)
+from app.utils.decorators import print_def_name
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, no staging (runs load their states normally)
+    fcntl = None
+
+IS_PRINT_DEF_NAME = True
+
+STAGED_REDIS_STATE_FILENAME = "staged_redis_state.json"
+STAGED_REDIS_STATE_LOCK_FILENAME = "staged_redis_state.lock"
+# Set last in the staging DB by the stager, and recorded in the marker: the staging DB holds all of that stage's keys
+# (and only those) when it matches. It is deleted as part of the swap.
+REDIS_STAGING_TOKEN_KEY = "gg:staging_token"
+
+
+def get_staged_redis_state_marker_path() -> str:
+    return os.path.join(REDIS_DUMP_DIR, STAGED_REDIS_STATE_FILENAME)
+
+
+@contextmanager
+def staging_db_lock() -> Iterator[None]:
+    """
+    Exclusive lock on the staging DB and its marker, held for a whole stage (or swap), so that two background stagers
+    (e.g. `-sn` runs in quick succession) can't interleave their writes, or a swap take a half-staged DB.
+    """
+    os.makedirs(REDIS_DUMP_DIR, exist_ok=True)
+    with open(os.path.join(REDIS_DUMP_DIR, STAGED_REDIS_STATE_LOCK_FILENAME), "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            if IS_DEBUG:
+                print("⏳ Waiting for the redis state being staged...")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def get_redis_state_file_fingerprint(redis_state_path: str) -> dict | None:
+    """
+    Cheap fingerprint (path, mtime, size) of a redis state file, used to make sure that the staged DB is still up to date.
+    """
+    try:
+        stat = os.stat(redis_state_path)
+    except OSError:
+        return None
+
+    return {
+        "redis_state_path": os.path.abspath(redis_state_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_stage_redis_state_into_staging_db(redis_state_path: str) -> int:
+    """
+    Load a redis state file into the spare staging DB, so that it can later be swapped into the sessions DB with SWAPDB.
+    The marker file is only written once the staging DB is fully loaded, and the whole stage holds the staging lock.
+    A state inside a bookmark is only read once the bookmark's finalizer is done (with `-p`, the run that started us
+    may still be writing the redis_after.json that we stage).
+    Returns: 0 if successful, 1 if error.
+    """
+    if fcntl is None:
+        return 0
+
+    if wait_for_bookmark_finalizer(os.path.dirname(os.path.abspath(redis_state_path)), is_report_failure=False) != 0:
+        print(f"❌ Not staging {redis_state_path}: the bookmark's finalizer failed")
+        return 1
+
+    marker_path = get_staged_redis_state_marker_path()
+    with staging_db_lock():
+        # Invalidate the previous staging before touching the staging DB.
+        if os.path.exists(marker_path):
+            os.remove(marker_path)
+
+        fingerprint = get_redis_state_file_fingerprint(redis_state_path)
+        if not fingerprint:
+            print(f"❌ Redis state file to stage does not exist: {redis_state_path}")
+            return 1
+
+        staging_token = uuid.uuid4().hex
+        try:
+            write_encoded_redis_state_to_redis(
+                get_redis_client(LOCAL_REDIS_STAGING_DB),
+                [*load_encoded_redis_state(redis_state_path),
+                 (REDIS_STAGING_TOKEN_KEY.encode("ascii"), staging_token.encode("ascii"))])
+        except Exception as e:
+            print(f"❌ Error staging redis state {redis_state_path}: {e}")
+            return 1
+
+        with open(marker_path, "w") as f:
+            json.dump({**fingerprint, "staging_db": LOCAL_REDIS_STAGING_DB, "staging_token": staging_token}, f, indent=2)
+
+    if IS_DEBUG:
+        print(f"🎭 Staged {redis_state_path} into Redis DB {LOCAL_REDIS_STAGING_DB}")
+    return 0
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_stage_redis_state_in_background(redis_state_path: str) -> int:
+    """
+    Stage a redis state file into the staging DB from a detached process, so that the prompt returns right away.
+    """
+    if not IS_REDIS_DIRECTLY_REACHABLE or fcntl is None:
+        if IS_DEBUG:
+            print("🎭 Skipping redis state staging (Redis is not reachable directly, or no flock)")
+        return 0
+
+    try:
+        subprocess.Popen(
+            [sys.executable, "-m", __name__, redis_state_path],
+            cwd=REPO_ROOT,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except Exception as e:
+        print(f"⚠️  Could not start redis state staging: {e}")
+        return 1
+
+    print(f"🎭 Staging next redis state in the background: {redis_state_path}")
+    return 0
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_swap_staged_redis_state_into_sessions_db(redis_state_path: str) -> int:
+    """
+    If the given redis state file has been pre-staged (and has not changed since), atomically swap the staging DB into the sessions DB.
+    Returns: 0 if the staged state was swapped in, 1 if it was not staged (the caller should load it normally).
+    """
+    if not IS_REDIS_DIRECTLY_REACHABLE or fcntl is None:
+        return 1
+
+    marker_path = get_staged_redis_state_marker_path()
+    if not os.path.exists(marker_path):
+        return 1
+
+    with staging_db_lock():
+        try:
+            with open(marker_path, "r") as f:
+                staged_redis_state = json.load(f)
+        except Exception:
+            return 1
+
+        fingerprint = get_redis_state_file_fingerprint(redis_state_path)
+        if not fingerprint or any(
+            staged_redis_state.get(key) != value for key, value in fingerprint.items()
+        ):
+            if IS_DEBUG:
+                print(f"🎭 Staged redis state does not match {redis_state_path}")
+            return 1
+
+        try:
+            staging_token = get_redis_client(staged_redis_state["staging_db"]).get(REDIS_STAGING_TOKEN_KEY)
+            if not staging_token or staging_token.decode("ascii") != staged_redis_state.get("staging_token"):
+                print("⚠️  The staging DB does not hold the staged redis state, loading it normally")
+                os.remove(marker_path)
+                return 1
+
+            # The token comes along into the sessions DB: drop it in the same transaction.
+            pipe = get_redis_client().pipeline(transaction=True)
+            pipe.swapdb(LOCAL_REDIS_SESSIONS_DB, staged_redis_state["staging_db"])
+            pipe.delete(REDIS_STAGING_TOKEN_KEY)
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️  Could not swap the staged redis state into place: {e}")
+            return 1
+
+        # The staging DB now holds the previous sessions state.
+        os.remove(marker_path)
+
+    print(f"🎭 Swapped pre-staged redis state into place: {redis_state_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(handle_stage_redis_state_into_staging_db(sys.argv[1]))
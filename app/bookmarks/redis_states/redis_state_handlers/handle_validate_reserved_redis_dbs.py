@@ -0,0 +1,137 @@
+import json
+import os
+
+import redis
+
+from app.bookmarks.redis_states.redis_state_utils import get_redis_client
+from app.consts.bookmarks_consts import (
+    IS_REDIS_SERVER_SIDE_SNAPSHOTS,
+    LOCAL_REDIS_SESSIONS_DB,
+    LOCAL_REDIS_SNAPSHOT_AFTER_DB,
+    LOCAL_REDIS_SNAPSHOT_BEFORE_DB,
+    LOCAL_REDIS_STAGING_DB,
+    PROCESSOR_COMPLETION_SIGNAL,
+    PROCESSOR_SIGNAL_DB,
+    PROCESSOR_TRIGGER,
+    RESERVED_REDIS_DBS_CLAIMS_PATH,
+)
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+# The setting that moves each reserved DB, for the error messages
+RESERVED_REDIS_DB_SETTINGS = {
+    "staging": "REDIS_STAGING_DB",
+    "snapshot_before": "REDIS_SNAPSHOT_BEFORE_DB",
+    "snapshot_after": "REDIS_SNAPSHOT_AFTER_DB",
+    "processor_signal": "PROCESSOR_SIGNAL_DB",
+    "parallel_worker": "PARALLEL_REDIS_FIRST_WORKER_DB / PARALLEL_REDIS_LAST_WORKER_DB",
+}
+
+
+def get_reserved_redis_dbs(parallel_worker_dbs: list[int] | None = None) -> dict[str, int]:
+    """
+    The reserved DBs (by role) that the current settings use on the sessions Redis.
+    """
+    reserved_dbs = {"staging": LOCAL_REDIS_STAGING_DB}
+    if IS_REDIS_SERVER_SIDE_SNAPSHOTS:
+        reserved_dbs["snapshot_before"] = LOCAL_REDIS_SNAPSHOT_BEFORE_DB
+        reserved_dbs["snapshot_after"] = LOCAL_REDIS_SNAPSHOT_AFTER_DB
+    if PROCESSOR_COMPLETION_SIGNAL != "none" or PROCESSOR_TRIGGER == "queue":
+        reserved_dbs["processor_signal"] = PROCESSOR_SIGNAL_DB
+    for worker, db in enumerate(parallel_worker_dbs or []):
+        reserved_dbs[f"parallel_worker_{worker}"] = db
+    return reserved_dbs
+
+
+def get_reserved_redis_db_setting(role: str) -> str:
+    return RESERVED_REDIS_DB_SETTINGS.get(role, RESERVED_REDIS_DB_SETTINGS["parallel_worker"])
+
+
+def get_redis_server_name(r: redis.Redis) -> str:
+    connection_kwargs = r.connection_pool.connection_kwargs
+    if connection_kwargs.get("path"):
+        return connection_kwargs["path"]
+    return f"{connection_kwargs.get('host', 'localhost')}:{connection_kwargs.get('port', 6379)}"
+
+
+def load_reserved_redis_db_claims() -> dict[str, dict[str, str]]:
+    try:
+        with open(RESERVED_REDIS_DBS_CLAIMS_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_reserved_redis_db_claims(claims: dict[str, dict[str, str]]) -> None:
+    os.makedirs(os.path.dirname(RESERVED_REDIS_DBS_CLAIMS_PATH), exist_ok=True)
+    tmp_claims_path = f"{RESERVED_REDIS_DBS_CLAIMS_PATH}.{os.getpid()}.tmp"
+    with open(tmp_claims_path, "w") as f:
+        json.dump(claims, f, indent=2)
+    os.replace(tmp_claims_path, RESERVED_REDIS_DBS_CLAIMS_PATH)
+
+
+def is_unclaimed_redis_db_ours(r: redis.Redis, role: str) -> bool:
+    """
+    Whether a reserved DB that we have not claimed yet holds nothing but what bm (or the processor, for the signal DB)
+    would have put there.
+    """
+    if role == "processor_signal":
+        return all(key.startswith(b"gg:") for key in r.scan_iter(count=1000))
+    return r.dbsize() == 0
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_validate_reserved_redis_dbs(parallel_worker_dbs: list[int] | None = None) -> int:
+    """
+    Check the reserved DBs before anything is written to them: no two roles (or the sessions DB) share a DB, the server
+    has enough DBs, and a DB that we have not claimed yet is empty - so that bm never flushes data it does not own.
+    Returns: 0 if the reserved DBs can be used, 1 if not.
+    """
+    reserved_dbs = get_reserved_redis_dbs(parallel_worker_dbs)
+
+    roles_by_db: dict[int, str] = {LOCAL_REDIS_SESSIONS_DB: "sessions"}
+    for role, db in reserved_dbs.items():
+        if db < 0:
+            print(f"❌ Reserved Redis DB {db} ({role}) is not a DB number, see {get_reserved_redis_db_setting(role)}")
+            return 1
+        if db in roles_by_db:
+            print(f"❌ Redis DB {db} is reserved for both {roles_by_db[db]} and {role}, "
+                  f"move one with {get_reserved_redis_db_setting(role)}")
+            return 1
+        roles_by_db[db] = role
+
+    try:
+        r = get_redis_client()
+        server_name = get_redis_server_name(r)
+        try:
+            database_count = int(r.config_get("databases").get("databases", 0))
+        except redis.ResponseError:
+            # CONFIG can be disabled (rename-command); then SELECT fails later on a DB that doesn't exist
+            database_count = None
+
+        needed_database_count = max(roles_by_db) + 1
+        if database_count is not None and database_count < needed_database_count:
+            print(f"❌ The sessions Redis has {database_count} DBs, the reserved DBs need {needed_database_count} "
+                  f"(set `databases {needed_database_count}` in redis.conf, or move the reserved DBs down)")
+            return 1
+
+        claims = load_reserved_redis_db_claims()
+        server_claims = claims.setdefault(server_name, {})
+        is_claims_changed = False
+        for role, db in reserved_dbs.items():
+            if server_claims.get(str(db)):
+                continue
+            if not is_unclaimed_redis_db_ours(get_redis_client(db), role):
+                print(f"❌ Redis DB {db} ({role}) on {server_name} holds data that bm did not put there. "
+                      f"Empty it (FLUSHDB) if that data is not needed, or pick another DB with {get_reserved_redis_db_setting(role)}")
+                return 1
+            server_claims[str(db)] = role
+            is_claims_changed = True
+    except Exception as e:
+        print(f"❌ Error checking the reserved Redis DBs: {e}")
+        return 1
+
+    if is_claims_changed:
+        save_reserved_redis_db_claims(claims)
+    return 0
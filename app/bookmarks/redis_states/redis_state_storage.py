@@ -0,0 +1,586 @@
+"""
+Read/write layer for the redis state files stored in bookmarks (redis_before.json, redis_after.json).
+
+A stored state file is one of:
+- plain redis state JSON ("json" mode, and delta keyframes).
+- a manifest ("objects" mode), mapping each key to a content-addressed value blob in REDIS_STATE_OBJECTS_DIR, so that
+  identical values are only stored once across the whole library.
+- a delta ("delta" mode), holding only the keys that changed relative to a base state file in the same folder (the
+  bookmark's own redis_before, its previous sibling, or the alt source bookmark). Every
+  REDIS_STATE_DELTA_KEYFRAME_INTERVAL links, a full keyframe is stored instead, so that chains stay short.
+  A delta also keeps the hashes of the base values it reuses (the values themselves go to REDIS_STATE_OBJECTS_DIR), so
+  it can still be loaded if its base is edited, moved, or removed outside of save_redis_state_file.
+Any of these may be compressed (REDIS_STATE_COMPRESSION: gzip, lzma, or zstd if installed) - the compression is detected
+from the magic bytes when reading, and the file names stay the same.
+Always go through load_redis_state_file / save_redis_state_file - callers get the same JSON either way.
+"""
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import os
+import shutil
+from typing import IO, Any
+
+from app.consts.bookmarks_consts import (
+    IS_DEBUG,
+    REDIS_STATE_COMPRESSION,
+    REDIS_STATE_DELTA_FOLDER_MARKER_FILENAME,
+    REDIS_STATE_DELTA_KEYFRAME_INTERVAL,
+    REDIS_STATE_OBJECTS_DIR,
+    REDIS_STATE_STORAGE_MODE,
+)
+from app.utils.sorting_utils import natural_sort_key
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+REDIS_STATE_FORMAT_KEY = "gg_redis_state_format"
+REDIS_STATE_FORMAT_MANIFEST = "manifest"
+REDIS_STATE_FORMAT_DELTA = "delta"
+REDIS_STATE_FILENAMES = ("redis_before.json", "redis_after.json")
+FRIENDLY_REDIS_STATE_FILENAMES = ("friendly_redis_before.json", "friendly_redis_after.json")
+
+REDIS_STATE_COMPRESSION_MAGIC_BYTES = {
+    "gzip": b"\x1f\x8b",
+    "lzma": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+
+def get_redis_state_file_compression(file_path: str) -> str:
+    """
+    Detect how a stored file is compressed from its magic bytes: "gzip", "lzma", "zstd", or "none".
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(6)
+    for compression, magic_bytes in REDIS_STATE_COMPRESSION_MAGIC_BYTES.items():
+        if head.startswith(magic_bytes):
+            return compression
+    return "none"
+
+
+def resolve_redis_state_compression(compression: str | None = None) -> str:
+    """
+    The compression to write with: the given one, or REDIS_STATE_COMPRESSION. zstd falls back to gzip if it is not installed.
+    """
+    compression = compression or REDIS_STATE_COMPRESSION
+    if compression == "zstd" and zstandard is None:
+        if IS_DEBUG:
+            print("⚠️  zstandard is not installed, compressing redis states with gzip instead")
+        return "gzip"
+    if compression not in REDIS_STATE_COMPRESSION_MAGIC_BYTES:
+        return "none"
+    return compression
+
+
+def open_redis_state_file(file_path: str) -> IO[str]:
+    """
+    Open a stored file for reading as text, stream-decompressing it if needed.
+    """
+    compression = get_redis_state_file_compression(file_path)
+    if compression == "gzip":
+        return gzip.open(file_path, "rt", encoding="utf-8")
+    if compression == "lzma":
+        return lzma.open(file_path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"{file_path} is zstd compressed, but zstandard is not installed")
+        return io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True), encoding="utf-8")
+    return open(file_path, "r")
+
+
+def open_redis_state_file_for_writing(file_path: str, compression: str | None = None) -> IO[str]:
+    """
+    Open a file for writing text, compressed as configured (for writers that stream their output).
+    """
+    compression = resolve_redis_state_compression(compression)
+    if compression == "gzip":
+        return gzip.open(file_path, "wt", encoding="utf-8")
+    if compression == "lzma":
+        return lzma.open(file_path, "wt", encoding="utf-8")
+    if compression == "zstd":
+        return io.TextIOWrapper(
+            zstandard.ZstdCompressor().stream_writer(open(file_path, "wb"), closefd=True), encoding="utf-8")
+    return open(file_path, "w")
+
+
+def write_stored_redis_state(
+    file_path: str,
+    stored_data: Any,
+    compression: str | None = None,
+) -> None:
+    """
+    Write a stored file (state, manifest, delta, or friendly view) atomically, compressed as configured.
+    Uncompressed files stay indented for reading; compressed ones are written compact.
+    """
+    compression = resolve_redis_state_compression(compression)
+    tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+
+    if compression == "none":
+        with open(tmp_file_path, "w") as f:
+            json.dump(stored_data, f, indent=2)
+    else:
+        encoded_data = json.dumps(stored_data, separators=(",", ":")).encode("utf-8")
+        if compression == "gzip":
+            compressed_data = gzip.compress(encoded_data)
+        elif compression == "lzma":
+            compressed_data = lzma.compress(encoded_data)
+        else:
+            compressed_data = zstandard.ZstdCompressor().compress(encoded_data)
+        with open(tmp_file_path, "wb") as f:
+            f.write(compressed_data)
+
+    os.replace(tmp_file_path, file_path)
+
+
+def get_redis_state_object_path(object_hash: str) -> str:
+    return os.path.join(REDIS_STATE_OBJECTS_DIR, object_hash[:2], object_hash[2:])
+
+
+def get_redis_state_object_hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value).encode("utf-8")).hexdigest()
+
+
+def write_redis_state_object(value: Any) -> str:
+    """
+    Store a single redis state value as a blob (its JSON encoding), named by its sha256. Existing blobs are reused.
+    Returns the object hash.
+    """
+    object_bytes = json.dumps(value).encode("utf-8")
+    object_hash = hashlib.sha256(object_bytes).hexdigest()
+    object_path = get_redis_state_object_path(object_hash)
+
+    if os.path.exists(object_path):
+        return object_hash
+
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    tmp_object_path = f"{object_path}.{os.getpid()}.tmp"
+    with open(tmp_object_path, "wb") as f:
+        f.write(object_bytes)
+    os.replace(tmp_object_path, object_path)
+
+    return object_hash
+
+
+def read_redis_state_object(object_hash: str) -> Any:
+    with open(get_redis_state_object_path(object_hash), "rb") as f:
+        return json.loads(f.read())
+
+
+def is_redis_state_manifest(stored_data: Any) -> bool:
+    return isinstance(stored_data, dict) and stored_data.get(REDIS_STATE_FORMAT_KEY) == REDIS_STATE_FORMAT_MANIFEST
+
+
+def is_redis_state_delta(stored_data: Any) -> bool:
+    return isinstance(stored_data, dict) and stored_data.get(REDIS_STATE_FORMAT_KEY) == REDIS_STATE_FORMAT_DELTA
+
+
+def get_file_sha256(file_path: str) -> str:
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def read_stored_redis_state(redis_state_path: str) -> Any:
+    """
+    The parsed contents of a stored state file, as they are on disk (plain, manifest, or delta).
+    """
+    with open_redis_state_file(redis_state_path) as f:
+        return json.load(f)
+
+
+def get_delta_base_abs_path(redis_state_path: str, stored_delta: dict[str, Any]) -> str:
+    return os.path.normpath(os.path.join(os.path.dirname(redis_state_path), stored_delta["base"]))
+
+
+def get_delta_chain_length(stored_data: Any) -> int:
+    if is_redis_state_delta(stored_data):
+        return stored_data["chain_length"]
+    return 0
+
+
+def resolve_stored_redis_state(stored_data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Turn the parsed contents of a (non-delta) stored state file back into the plain redis state dict.
+    """
+    if is_redis_state_manifest(stored_data):
+        return {
+            key: read_redis_state_object(object_hash)
+            for key, object_hash in stored_data["keys"].items()
+        }
+    return stored_data
+
+
+def is_redis_state_delta_base_unchanged(base_path: str, stored_delta: dict[str, Any]) -> bool:
+    try:
+        return get_file_sha256(base_path) == stored_delta["base_sha256"]
+    except OSError:
+        return False
+
+
+def rebuild_redis_state_delta_base(redis_state_path: str, stored_delta: dict[str, Any]) -> dict[str, Any]:
+    """
+    The base values a delta reuses, for a delta whose base file has changed or is gone: each value is taken from the
+    current base if it still hashes the same, otherwise from its blob in REDIS_STATE_OBJECTS_DIR.
+    """
+    base_path = get_delta_base_abs_path(redis_state_path, stored_delta)
+    try:
+        current_base_data = load_redis_state_file(base_path)
+    except (OSError, ValueError):
+        current_base_data = {}
+
+    base_key_hashes = stored_delta.get("base_key_hashes")
+    if base_key_hashes is None:
+        # Written without base key hashes: the current base is all there is
+        print(f"⚠️  Base of redis state delta {redis_state_path} has changed, applying the delta to it as it is now: {base_path}")
+        return current_base_data
+
+    base_data = {}
+    unrestored_keys = []
+    for key, object_hash in base_key_hashes.items():
+        if key in current_base_data and get_redis_state_object_hash(current_base_data[key]) == object_hash:
+            base_data[key] = current_base_data[key]
+            continue
+        try:
+            base_data[key] = read_redis_state_object(object_hash)
+        except OSError:
+            unrestored_keys.append(key)
+            if key in current_base_data:
+                base_data[key] = current_base_data[key]
+
+    print(f"⚠️  Base of redis state delta {redis_state_path} has changed, rebuilt it from the stored base key hashes: {base_path}")
+    if unrestored_keys:
+        print(f"⚠️  {len(unrestored_keys)} base values could not be restored (missing from {REDIS_STATE_OBJECTS_DIR}), "
+              f"using the current base's: {', '.join(unrestored_keys[:10])}")
+    return base_data
+
+
+def load_redis_state_file(redis_state_path: str) -> dict[str, Any]:
+    """
+    Load a stored redis state file (plain JSON, manifest, or delta) as the plain redis state dict.
+    Delta chains are walked back to their keyframe first, then applied in memory, oldest first. If a base in the chain
+    has changed, the chain stops there, and the base values are rebuilt from the delta's base key hashes.
+    """
+    stored_deltas = []
+    stored_data = read_stored_redis_state(redis_state_path)
+    data = None
+
+    while is_redis_state_delta(stored_data):
+        stored_deltas.append(stored_data)
+        base_path = get_delta_base_abs_path(redis_state_path, stored_data)
+        if not is_redis_state_delta_base_unchanged(base_path, stored_data):
+            data = rebuild_redis_state_delta_base(redis_state_path, stored_data)
+            break
+
+        redis_state_path = base_path
+        stored_data = read_stored_redis_state(redis_state_path)
+
+    if data is None:
+        data = dict(resolve_stored_redis_state(stored_data))
+    for stored_delta in reversed(stored_deltas):
+        for key in stored_delta["deleted"]:
+            data.pop(key, None)
+        data.update(stored_delta["set"])
+
+    return data
+
+
+def get_redis_state_file_format(redis_state_path: str) -> str:
+    """
+    "manifest", "delta", or "plain" - from the head of the (decompressed) file, without parsing all of it.
+    """
+    with open_redis_state_file(redis_state_path) as f:
+        head = f.read(256)
+    for stored_format in (REDIS_STATE_FORMAT_MANIFEST, REDIS_STATE_FORMAT_DELTA):
+        if f'"{REDIS_STATE_FORMAT_KEY}": "{stored_format}"' in head or f'"{REDIS_STATE_FORMAT_KEY}":"{stored_format}"' in head:
+            return stored_format
+    return "plain"
+
+
+def is_plain_redis_state_file(redis_state_path: str) -> bool:
+    """
+    Whether the file on disk is already plain, uncompressed redis state JSON (and can be byte-copied to places that need plain JSON).
+    """
+    if get_redis_state_file_compression(redis_state_path) != "none":
+        return False
+    with open(redis_state_path, "r") as f:
+        head = f.read(len(REDIS_STATE_FORMAT_KEY) + 16)
+    return REDIS_STATE_FORMAT_KEY not in head
+
+
+def is_redis_state_file_possibly_delta(redis_state_path: str) -> bool:
+    if get_redis_state_file_compression(redis_state_path) != "none":
+        return True
+    return not is_plain_redis_state_file(redis_state_path)
+
+
+def get_bookmark_redis_state_paths_in_folder(folder_path: str) -> list[str]:
+    """
+    All stored redis state files of the bookmarks directly inside the given folder, in sibling (natural) order.
+    """
+    redis_state_paths = []
+    try:
+        entries = sorted(os.listdir(folder_path), key=natural_sort_key)
+    except OSError:
+        return redis_state_paths
+
+    for entry in entries:
+        for redis_state_filename in REDIS_STATE_FILENAMES:
+            redis_state_path = os.path.join(folder_path, entry, redis_state_filename)
+            if os.path.isfile(redis_state_path):
+                redis_state_paths.append(redis_state_path)
+    return redis_state_paths
+
+
+def determine_redis_state_delta_base_path(
+    redis_state_path: str,
+    preferred_base_path: str | None = None,
+) -> str | None:
+    """
+    Pick the state file that a bookmark's redis state is stored as a delta against (it has to be in the same folder):
+    - The preferred base (e.g. the alt source bookmark's redis_after).
+    - For a redis_after: the bookmark's own redis_before.
+    - Otherwise: the previous sibling's redis_after (or redis_before), in natural order (like navigation).
+    """
+    redis_state_path = os.path.abspath(redis_state_path)
+    bookmark_path = os.path.dirname(redis_state_path)
+    folder_path = os.path.dirname(bookmark_path)
+
+    if preferred_base_path:
+        preferred_base_path = os.path.abspath(preferred_base_path)
+        if (
+            preferred_base_path != redis_state_path
+            and os.path.dirname(os.path.dirname(preferred_base_path)) == folder_path
+            and os.path.isfile(preferred_base_path)
+        ):
+            return preferred_base_path
+
+    if os.path.basename(redis_state_path) == "redis_after.json":
+        own_redis_before_path = os.path.join(bookmark_path, "redis_before.json")
+        if os.path.isfile(own_redis_before_path):
+            return own_redis_before_path
+
+    sibling_bookmark_paths = sorted(
+        (
+            entry_path
+            for entry_path in (os.path.join(folder_path, entry) for entry in os.listdir(folder_path))
+            if os.path.isfile(os.path.join(entry_path, "bookmark_meta.json"))
+        ),
+        key=lambda entry_path: natural_sort_key(os.path.basename(entry_path)),
+    )
+    if bookmark_path not in sibling_bookmark_paths:
+        return None
+
+    index = sibling_bookmark_paths.index(bookmark_path)
+    if index == 0:
+        return None
+
+    for redis_state_filename in ("redis_after.json", "redis_before.json"):
+        previous_redis_state_path = os.path.join(sibling_bookmark_paths[index - 1], redis_state_filename)
+        if os.path.isfile(previous_redis_state_path):
+            return previous_redis_state_path
+
+    return None
+
+
+def get_redis_state_delta_folder_marker_path(folder_path: str) -> str:
+    return os.path.join(folder_path, REDIS_STATE_DELTA_FOLDER_MARKER_FILENAME)
+
+
+def is_redis_state_delta_folder(folder_path: str) -> bool:
+    """
+    Whether deltas may be stored in the folder: it is marked before its first delta is written (and never unmarked).
+    """
+    return os.path.exists(get_redis_state_delta_folder_marker_path(folder_path))
+
+
+def mark_redis_state_delta_folder(folder_path: str) -> None:
+    marker_path = get_redis_state_delta_folder_marker_path(folder_path)
+    if not os.path.exists(marker_path):
+        with open(marker_path, "w"):
+            pass
+
+
+def get_redis_state_delta_dependents(redis_state_path: str) -> list[tuple[str, dict[str, Any]]]:
+    """
+    The deltas (path, stored delta) in the same folder whose base is the given state file.
+    """
+    redis_state_path = os.path.abspath(redis_state_path)
+    folder_path = os.path.dirname(os.path.dirname(redis_state_path))
+
+    dependents = []
+    for candidate_path in get_bookmark_redis_state_paths_in_folder(folder_path):
+        if candidate_path == redis_state_path or not is_redis_state_file_possibly_delta(candidate_path):
+            continue
+
+        stored_data = read_stored_redis_state(candidate_path)
+        if is_redis_state_delta(stored_data) and get_delta_base_abs_path(candidate_path, stored_data) == redis_state_path:
+            dependents.append((candidate_path, stored_data))
+    return dependents
+
+
+def refresh_redis_state_delta_dependents_base_sha(
+    redis_state_path: str,
+    compression: str | None = None,
+) -> None:
+    """
+    After a state file was rewritten without its data changing (e.g. turned into a keyframe), point its dependents at the new bytes.
+    """
+    base_sha256 = get_file_sha256(redis_state_path)
+    for dependent_path, stored_delta in get_redis_state_delta_dependents(redis_state_path):
+        stored_delta["base_sha256"] = base_sha256
+        write_stored_redis_state(dependent_path, stored_delta, compression)
+        refresh_redis_state_delta_dependents_base_sha(dependent_path, compression)
+
+
+def rebase_redis_state_delta_dependents(redis_state_path: str) -> None:
+    """
+    Before a state file is overwritten, re-save the deltas in its folder that are based on it as full keyframes.
+    Folders that never had a delta are not scanned.
+    """
+    if not is_redis_state_delta_folder(os.path.dirname(os.path.dirname(os.path.abspath(redis_state_path)))):
+        return
+    for dependent_path, _ in get_redis_state_delta_dependents(redis_state_path):
+        write_stored_redis_state(dependent_path, load_redis_state_file(dependent_path))
+        refresh_redis_state_delta_dependents_base_sha(dependent_path)
+        if IS_DEBUG:
+            print(f"💾 Rebased redis state delta into a keyframe: {dependent_path}")
+
+
+def build_redis_state_delta(
+    redis_state_path: str,
+    data: dict[str, Any],
+    base_path: str,
+) -> dict[str, Any] | None:
+    """
+    Build the delta of data against base_path, or None if a full keyframe should be stored instead.
+    """
+    stored_base = read_stored_redis_state(base_path)
+    chain_length = get_delta_chain_length(stored_base) + 1
+    if chain_length >= REDIS_STATE_DELTA_KEYFRAME_INTERVAL:
+        return None
+
+    base_data = load_redis_state_file(base_path)
+    changed_data = {
+        key: value for key, value in data.items()
+        if key not in base_data or base_data[key] != value
+    }
+    deleted_keys = [key for key in base_data if key not in data]
+
+    # Not worth it: most of the state changed.
+    if len(changed_data) + len(deleted_keys) > len(data) // 2:
+        return None
+
+    return {
+        REDIS_STATE_FORMAT_KEY: REDIS_STATE_FORMAT_DELTA,
+        "base": os.path.relpath(base_path, os.path.dirname(os.path.abspath(redis_state_path))),
+        "base_sha256": get_file_sha256(base_path),
+        "chain_length": chain_length,
+        "set": changed_data,
+        "deleted": deleted_keys,
+        # The base values this delta reuses, so it can be rebuilt if the base changes (see rebuild_redis_state_delta_base)
+        "base_key_hashes": {
+            key: write_redis_state_object(value)
+            for key, value in base_data.items()
+            if key in data and key not in changed_data
+        },
+    }
+
+
+def save_redis_state_file(
+    redis_state_path: str,
+    data: dict[str, Any],
+    preferred_base_path: str | None = None,
+) -> None:
+    """
+    Save a redis state dict in the configured storage mode.
+    """
+    rebase_redis_state_delta_dependents(redis_state_path)
+
+    if REDIS_STATE_STORAGE_MODE == "delta":
+        base_path = determine_redis_state_delta_base_path(redis_state_path, preferred_base_path)
+        stored_delta = build_redis_state_delta(redis_state_path, data, base_path) if base_path else None
+        if stored_delta:
+            mark_redis_state_delta_folder(os.path.dirname(os.path.dirname(os.path.abspath(redis_state_path))))
+            write_stored_redis_state(redis_state_path, stored_delta)
+            if IS_DEBUG:
+                print(f"💾 Saved {len(stored_delta['set'])} changed keys as a delta against {base_path}")
+            return
+
+    if REDIS_STATE_STORAGE_MODE == "objects":
+        manifest = {
+            REDIS_STATE_FORMAT_KEY: REDIS_STATE_FORMAT_MANIFEST,
+            "keys": {key: write_redis_state_object(value) for key, value in data.items()},
+        }
+        write_stored_redis_state(redis_state_path, manifest)
+        if IS_DEBUG:
+            print(f"💾 Saved {len(data)} keys as a manifest: {redis_state_path}")
+        return
+
+    write_stored_redis_state(redis_state_path, data)
+
+
+def copy_redis_state_file(
+    source_path: str,
+    target_path: str,
+    preferred_base_path: str | None = None,
+) -> None:
+    """
+    Copy a stored redis state into a bookmark, in the configured storage mode.
+    """
+    if (
+        REDIS_STATE_STORAGE_MODE == "json"
+        and resolve_redis_state_compression() == "none"
+        and is_plain_redis_state_file(source_path)
+    ):
+        rebase_redis_state_delta_dependents(target_path)
+        shutil.copy(source_path, target_path)
+        return
+    save_redis_state_file(target_path, load_redis_state_file(source_path), preferred_base_path)
+
+
+def export_redis_state_file_to_plain_json(source_path: str, target_path: str) -> None:
+    """
+    Copy a stored redis state to a place that needs plain redis state JSON (e.g. the redis dump directory).
+    """
+    if is_plain_redis_state_file(source_path):
+        shutil.copy(source_path, target_path)
+        return
+    write_stored_redis_state(target_path, load_redis_state_file(source_path), compression="none")
+
+
+def recompress_redis_state_folder(folder_path: str, compression: str) -> tuple[int, int, int]:
+    """
+    Rewrite the stored redis states (and friendly views) of the bookmarks in a folder with the given compression.
+    The folder is handled as a unit, so that delta base hashes can be refreshed once everything is rewritten.
+    Returns: (files rewritten, bytes before, bytes after).
+    """
+    compression = resolve_redis_state_compression(compression)
+    files_rewritten, bytes_before, bytes_after = 0, 0, 0
+
+    for entry in sorted(os.listdir(folder_path), key=natural_sort_key):
+        for filename in REDIS_STATE_FILENAMES + FRIENDLY_REDIS_STATE_FILENAMES:
+            file_path = os.path.join(folder_path, entry, filename)
+            if not os.path.isfile(file_path):
+                continue
+            if get_redis_state_file_compression(file_path) == compression:
+                continue
+
+            bytes_before += os.path.getsize(file_path)
+            write_stored_redis_state(file_path, read_stored_redis_state(file_path), compression)
+            bytes_after += os.path.getsize(file_path)
+            files_rewritten += 1
+
+    if files_rewritten:
+        for redis_state_path in get_bookmark_redis_state_paths_in_folder(folder_path):
+            if not is_redis_state_delta(read_stored_redis_state(redis_state_path)):
+                refresh_redis_state_delta_dependents_base_sha(redis_state_path, compression)
+
+    return files_rewritten, bytes_before, bytes_after
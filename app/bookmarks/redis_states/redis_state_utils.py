@@ -1,10 +1,313 @@
-from typing import Literal
+import hashlib
+import json
+import os
+import pickle
+import struct
+from typing import Any, Literal
+
+import redis
+
+from app.bookmarks.redis_states.redis_state_storage import load_redis_state_file
+from app.consts.bookmarks_consts import (
+    DOCKER_REDIS_SESSIONS_HOST,
+    DOCKER_REDIS_SESSIONS_PORT,
+    DOCKER_REDIS_SESSIONS_SOCKET,
+    IS_LOCAL_REDIS_DEV,
+    LOCAL_REDIS_SESSIONS_DB,
+    LOCAL_REDIS_SESSIONS_HOST,
+    LOCAL_REDIS_SESSIONS_PORT,
+    REDIS_CONNECT_TIMEOUT,
+    REDIS_DUMP_DIR,
+    REDIS_SESSIONS_PASSWORD,
+    REDIS_SESSIONS_USERNAME,
+)
+from app.utils.decorators import memoize
 
 IS_PRINT_DEF_NAME = True
 
+# Encoded redis state cache: magic, sha256 of the source JSON (raw), then (key length, key, value length, value) records.
+ENCODED_REDIS_STATE_MAGIC = b"GGENC1\n"
+ENCODED_REDIS_STATE_LEN = struct.Struct(">I")
+
+# The redis state dicts that were last written to the redis dump, with the (mtime, size) of the file they were written to.
+exported_redis_state_data: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+
 
 def get_temp_redis_state_name(before_or_after: Literal["before", "after"]) -> Literal["bookmark_temp", "bookmark_temp_after"]:
     # TODO(): I don't like "bookmark_temp" and "bookmark_temp_after" -> "redis_temp_state_before" and "redis_temp_state_after"
     if before_or_after == "before":
         return "bookmark_temp"
     return "bookmark_temp_after"
+
+
+def get_before_or_after_from_temp_redis_state_name(
+    temp_redis_state_name: Literal["bookmark_temp", "bookmark_temp_after"],
+) -> Literal["before", "after"]:
+    if temp_redis_state_name == "bookmark_temp":
+        return "before"
+    return "after"
+
+
+@memoize
+def get_redis_client(db: int = LOCAL_REDIS_SESSIONS_DB) -> redis.Redis:
+    """
+    Get a (cached) client for the sessions Redis, so that all handlers in a run share the same connection pool.
+    - Local dev: the local Redis.
+    - Otherwise: the session_manager's Redis, over its published port or socket (IS_DOCKER_REDIS_DIRECT).
+    """
+    if IS_LOCAL_REDIS_DEV:
+        return redis.Redis(host=LOCAL_REDIS_SESSIONS_HOST,
+                           port=LOCAL_REDIS_SESSIONS_PORT, db=db,
+                           username=REDIS_SESSIONS_USERNAME, password=REDIS_SESSIONS_PASSWORD)
+
+    if DOCKER_REDIS_SESSIONS_SOCKET:
+        return redis.Redis(unix_socket_path=DOCKER_REDIS_SESSIONS_SOCKET, db=db,
+                           username=REDIS_SESSIONS_USERNAME, password=REDIS_SESSIONS_PASSWORD,
+                           socket_connect_timeout=REDIS_CONNECT_TIMEOUT)
+
+    return redis.Redis(host=DOCKER_REDIS_SESSIONS_HOST,
+                       port=DOCKER_REDIS_SESSIONS_PORT, db=db,
+                       username=REDIS_SESSIONS_USERNAME, password=REDIS_SESSIONS_PASSWORD,
+                       socket_connect_timeout=REDIS_CONNECT_TIMEOUT)
+
+
+def get_redis_state_file_hash(redis_state_path: str) -> str:
+    """
+    sha256 of a redis state file's contents, used to invalidate anything derived from it.
+    """
+    sha = hashlib.sha256()
+    with open(redis_state_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def encode_redis_state_value(value: Any) -> bytes:
+    """
+    Encode a value from a redis state JSON into the exact bytes that we SET in Redis.
+    """
+    # If value is a dict or list, encode as JSON string
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    # If value is not bytes, encode as utf-8
+    if not isinstance(value, bytes):
+        value = str(value).encode('utf-8')
+    return value
+
+
+def write_redis_state_data_to_redis(r: redis.Redis, data: dict[str, Any], is_flushdb: bool = True) -> None:
+    """
+    Wipe the given Redis database and restore the redis state data into it (pipelined, in a single round trip).
+    is_flushdb: False if the caller has already wiped it.
+    """
+    write_encoded_redis_state_to_redis(
+        r, [(key.encode("utf-8"), encode_redis_state_value(value)) for key, value in data.items()], is_flushdb)
+
+
+def write_encoded_redis_state_to_redis(
+    r: redis.Redis,
+    encoded_items: list[tuple[bytes, bytes]],
+    is_flushdb: bool = True,
+) -> None:
+    """
+    Same as write_redis_state_data_to_redis, for (key, value) pairs that are already encoded to the exact bytes to SET.
+    """
+    pipe = r.pipeline(transaction=False)
+
+    # Wipe the database before restoring
+    if is_flushdb:
+        pipe.flushdb()
+
+    for key, value in encoded_items:
+        pipe.set(key, value)
+        # TODO(MFB): Loop through all of the user_session keys and publish each...?
+
+    pipe.execute()
+
+
+def get_encoded_redis_state_cache_path(redis_state_path: str) -> str:
+    """
+    The encoded cache lives next to the state it was encoded from, e.g. redis_before.json -> .redis_before.enc
+    """
+    state_dir, state_filename = os.path.split(redis_state_path)
+    return os.path.join(state_dir, f".{os.path.splitext(state_filename)[0]}.enc")
+
+
+def read_encoded_redis_state_cache(
+    encoded_cache_path: str,
+    redis_state_hash: str,
+) -> list[tuple[bytes, bytes]] | None:
+    """
+    Read the encoded (key, value) pairs from the cache, or None if it is missing, corrupt, or was built from a different JSON.
+    """
+    try:
+        with open(encoded_cache_path, "rb") as f:
+            buffer = f.read()
+    except OSError:
+        return None
+
+    header = ENCODED_REDIS_STATE_MAGIC + bytes.fromhex(redis_state_hash)
+    if not buffer.startswith(header):
+        return None
+
+    view = memoryview(buffer)
+    offset = len(header)
+    encoded_items = []
+    try:
+        while offset < len(buffer):
+            (key_len,) = ENCODED_REDIS_STATE_LEN.unpack_from(view, offset)
+            offset += ENCODED_REDIS_STATE_LEN.size
+            key = bytes(view[offset:offset + key_len])
+            offset += key_len
+            (value_len,) = ENCODED_REDIS_STATE_LEN.unpack_from(view, offset)
+            offset += ENCODED_REDIS_STATE_LEN.size
+            value = bytes(view[offset:offset + value_len])
+            offset += value_len
+            encoded_items.append((key, value))
+    except struct.error:
+        return None
+
+    if offset != len(buffer):
+        return None
+    return encoded_items
+
+
+def write_encoded_redis_state_cache(
+    encoded_cache_path: str,
+    redis_state_hash: str,
+    encoded_items: list[tuple[bytes, bytes]],
+) -> None:
+    tmp_encoded_cache_path = f"{encoded_cache_path}.{os.getpid()}.tmp"
+    with open(tmp_encoded_cache_path, "wb") as f:
+        f.write(ENCODED_REDIS_STATE_MAGIC + bytes.fromhex(redis_state_hash))
+        for key, value in encoded_items:
+            f.write(ENCODED_REDIS_STATE_LEN.pack(len(key)))
+            f.write(key)
+            f.write(ENCODED_REDIS_STATE_LEN.pack(len(value)))
+            f.write(value)
+    os.replace(tmp_encoded_cache_path, encoded_cache_path)
+
+
+def load_encoded_redis_state(
+    redis_state_path: str,
+    redis_state_hash: str | None = None,
+) -> list[tuple[bytes, bytes]]:
+    """
+    Get a redis state file as (key, value) pairs encoded to the exact bytes to SET.
+    Served from the encoded cache next to the file when its hash still matches, otherwise parsed, encoded, and re-cached.
+    """
+    if redis_state_hash is None:
+        redis_state_hash = get_redis_state_file_hash(redis_state_path)
+    encoded_cache_path = get_encoded_redis_state_cache_path(redis_state_path)
+
+    encoded_items = read_encoded_redis_state_cache(encoded_cache_path, redis_state_hash)
+    if encoded_items is not None:
+        return encoded_items
+
+    data = load_redis_state_file(redis_state_path)
+    encoded_items = [(key.encode("utf-8"), encode_redis_state_value(value)) for key, value in data.items()]
+
+    try:
+        write_encoded_redis_state_cache(encoded_cache_path, redis_state_hash, encoded_items)
+    except OSError as e:
+        print(f"⚠️  Could not write encoded redis state cache {encoded_cache_path}: {e}")
+
+    return encoded_items
+
+
+def safe_decode(value):
+    if isinstance(value, bytes):
+        try:
+            return value.decode('utf-8')
+        except Exception:
+            return value  # fallback to bytes
+    return value
+
+
+def try_json_load(value):
+    # Try to decode a string as JSON, otherwise return as-is
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except Exception:
+            return value
+    return value
+
+
+def read_redis_state_data_from_redis(r: redis.Redis) -> dict[str, Any]:
+    """
+    Read all string keys of the given Redis database into a redis state dict (pipelined: one round trip for the types, one for the values).
+    """
+    keys = list(r.scan_iter('*', count=1000))
+
+    pipe = r.pipeline(transaction=False)
+    for key in keys:
+        pipe.type(key)
+    key_types = pipe.execute()
+
+    string_keys = []
+    for key, key_type in zip(keys, key_types):
+        if key_type == b'string':
+            string_keys.append(key)
+        else:
+            print(
+                f"Skipping key {key.decode('utf-8')} of type {key_type.decode('utf-8')}")
+
+    pipe = r.pipeline(transaction=False)
+    for key in string_keys:
+        pipe.get(key)
+    values = pipe.execute()
+
+    data = {}
+    for key, value in zip(string_keys, values):
+        if value is not None:
+            data[key.decode("utf-8")] = try_json_load(safe_decode(value))
+
+    return data
+
+
+def write_redis_state_data_to_dump(
+    temp_redis_state_name: Literal["bookmark_temp", "bookmark_temp_after"],
+    data: dict[str, Any],
+) -> None:
+    """
+    Save a redis state dict to the redis dump directory as JSON (falling back to pickle if it is not JSON serializable).
+    """
+    json_filepath = f"{REDIS_DUMP_DIR}/{temp_redis_state_name}.json"
+    pkl_filepath = f"{REDIS_DUMP_DIR}/{temp_redis_state_name}.pkl"
+
+    os.makedirs(REDIS_DUMP_DIR, exist_ok=True)
+
+    # Try to save as JSON, fallback to pickle if it fails
+    try:
+        with open(json_filepath, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"Backup saved as {json_filepath} (JSON)")
+
+        # Keep it in memory, so that saving it to a bookmark does not need to re-read it.
+        json_stat = os.stat(json_filepath)
+        exported_redis_state_data[temp_redis_state_name] = (
+            (json_stat.st_mtime_ns, json_stat.st_size), data)
+    except Exception as e:
+        with open(pkl_filepath, "wb") as f:
+            pickle.dump(data, f)
+        print(f"Backup saved as {pkl_filepath} (Pickle, reason: {e})")
+
+
+def get_redis_dump_state_data(
+    temp_redis_state_name: Literal["bookmark_temp", "bookmark_temp_after"],
+) -> dict[str, Any]:
+    """
+    The redis state dict in the redis dump: from memory if we exported it in this run (and the file has not changed since),
+    otherwise parsed from the file.
+    """
+    json_filepath = f"{REDIS_DUMP_DIR}/{temp_redis_state_name}.json"
+
+    if temp_redis_state_name in exported_redis_state_data:
+        json_stat = os.stat(json_filepath)
+        fingerprint, data = exported_redis_state_data[temp_redis_state_name]
+        if fingerprint == (json_stat.st_mtime_ns, json_stat.st_size):
+            return data
+
+    with open(json_filepath, "r") as f:
+        return json.load(f)
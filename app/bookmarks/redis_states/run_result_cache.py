@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import subprocess
+import time
+from typing import Any
+
+from app.bookmarks.bookmarks_meta import read_bookmark_meta_file
+from app.bookmarks.redis_states.file_copy_handlers.handle_copy_source_bm_redis_state_to_redis_dump import (
+    handle_copy_source_bm_redis_state_to_redis_dump,
+)
+from app.bookmarks.redis_states.handle_bookmark_pre_run_redis_states import (
+    determine_origin_bm_redis_state_path_from_context,
+)
+from app.bookmarks.redis_states.handle_verify_bookmark_redis_after import (
+    read_current_redis_after_state,
+)
+from app.bookmarks.redis_states.redis_state_handlers.handle_load_into_redis import (
+    handle_load_into_redis,
+)
+from app.bookmarks.redis_states.redis_state_storage import write_stored_redis_state
+from app.bookmarks.redis_states.redis_state_utils import get_redis_state_file_hash
+from app.consts.bookmarks_consts import (
+    IS_DEBUG,
+    IS_LOCAL_REDIS_DEV,
+    PROCESSOR_VERSION,
+    PROCESSOR_VERSION_COMMAND,
+    RUN_CACHE_DIR,
+    RUN_CACHE_KEY_SETTINGS,
+)
+from app.types.bookmark_types import CurrentRunSettings, MatchedBookmarkObj
+from app.utils.decorators import memoize, print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+
+@memoize
+def get_processor_version() -> str | None:
+    """
+    The processor build that results come from: PROCESSOR_VERSION, or the output of PROCESSOR_VERSION_COMMAND
+    (the processor container's git commit by default). None if it can't be determined - then nothing is cached.
+    """
+    if PROCESSOR_VERSION:
+        return PROCESSOR_VERSION
+    try:
+        completed_process = subprocess.run(
+            PROCESSOR_VERSION_COMMAND, shell=True, check=False, capture_output=True, text=True, timeout=10)
+    except subprocess.TimeoutExpired:
+        return None
+    if completed_process.returncode != 0 or not completed_process.stdout.strip():
+        return None
+    return completed_process.stdout.strip()
+
+
+def get_run_cache_entry_path(run_cache_key: str) -> str:
+    return os.path.join(RUN_CACHE_DIR, f"{run_cache_key}.json")
+
+
+def get_run_cache_meta_path(run_cache_key: str) -> str:
+    return os.path.join(RUN_CACHE_DIR, f"{run_cache_key}.meta.json")
+
+
+def get_bookmark_obs_media_identity(matched_bookmark_obj: MatchedBookmarkObj) -> dict[str, Any]:
+    """
+    The OBS frame a run processes: the bookmark's video and timestamp, read from its bookmark_meta.json (the OBS
+    pre-run may have just saved them). Falls back to the bookmark path when the media info isn't saved yet.
+    """
+    bookmark_info = matched_bookmark_obj.get("bookmark_info") or {}
+    meta_file = os.path.join(matched_bookmark_obj["bookmark_path_slash_abs"], "bookmark_meta.json")
+    if os.path.exists(meta_file):
+        try:
+            bookmark_info = read_bookmark_meta_file(meta_file)
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    if bookmark_info.get("video_filename"):
+        return {
+            "video_filename": bookmark_info["video_filename"],
+            "timestamp": bookmark_info.get("timestamp"),
+        }
+    return {"bookmark_path_colon_rel": matched_bookmark_obj["bookmark_path_colon_rel"]}
+
+
+def get_run_cache_key(current_run_settings_obj: CurrentRunSettings) -> str | None:
+    """
+    sha256 of (the before-state this run loads, the OBS media of the bookmark unless `--no-obs`, the processor
+    version, RUN_CACHE_KEY_SETTINGS).
+    None when the run can't be cached: the before-state comes straight from Redis (a new bookmark), or the processor
+    version is unknown.
+    """
+    matched_bookmark_obj = current_run_settings_obj.get("current_bookmark_obj")
+    if not matched_bookmark_obj:
+        return None
+
+    origin_bm_redis_state_path = determine_origin_bm_redis_state_path_from_context(
+        matched_bookmark_obj, current_run_settings_obj)
+    if origin_bm_redis_state_path == 'redis' or not os.path.exists(origin_bm_redis_state_path):
+        if IS_DEBUG:
+            print("🔍 Run cache: the before-state comes from Redis, not caching")
+        return None
+
+    processor_version = get_processor_version()
+    if not processor_version:
+        print("⚠️  Run cache: could not determine the processor version (PROCESSOR_VERSION), not caching")
+        return None
+
+    run_cache_key_data = {
+        "redis_before_sha256": get_redis_state_file_hash(origin_bm_redis_state_path),
+        "obs_media": (
+            None if current_run_settings_obj.get("is_no_obs")
+            else get_bookmark_obs_media_identity(matched_bookmark_obj)
+        ),
+        "processor_version": processor_version,
+        "settings": {setting: current_run_settings_obj.get(setting) for setting in RUN_CACHE_KEY_SETTINGS},
+    }
+    return hashlib.sha256(json.dumps(run_cache_key_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_restore_run_cache_entry(run_cache_key: str) -> int:
+    """
+    On a hit, load the cached redis_after into Redis, as if the processor had just produced it.
+    Returns: 0 if restored, 1 on a miss or error.
+    """
+    run_cache_entry_path = get_run_cache_entry_path(run_cache_key)
+    if not os.path.exists(run_cache_entry_path):
+        return 1
+
+    # The docker exec loader reads the redis dump, the direct ones load the entry itself.
+    if not IS_LOCAL_REDIS_DEV:
+        if handle_copy_source_bm_redis_state_to_redis_dump(run_cache_entry_path, "bookmark_temp_after") != 0:
+            return 1
+    if handle_load_into_redis(before_or_after="after", origin_bm_redis_state_path=run_cache_entry_path) != 0:
+        print(f"⚠️  Could not restore the cached run result {run_cache_entry_path}")
+        return 1
+    return 0
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_save_run_cache_entry(run_cache_key: str, current_run_settings_obj: CurrentRunSettings) -> int:
+    """
+    Cache the redis state the processor just produced under the run's key.
+    """
+    redis_after_data = read_current_redis_after_state()
+    if redis_after_data is None:
+        print("⚠️  Run cache: could not read the processed redis state, not caching")
+        return 1
+
+    matched_bookmark_obj = current_run_settings_obj.get("current_bookmark_obj")
+    os.makedirs(RUN_CACHE_DIR, exist_ok=True)
+    write_stored_redis_state(get_run_cache_entry_path(run_cache_key), redis_after_data)
+    with open(get_run_cache_meta_path(run_cache_key), "w") as f:
+        json.dump({
+            "bookmark_path_colon_rel": matched_bookmark_obj["bookmark_path_colon_rel"] if matched_bookmark_obj else None,
+            "processor_version": get_processor_version(),
+            "settings": {setting: current_run_settings_obj.get(setting) for setting in RUN_CACHE_KEY_SETTINGS},
+            "created_at": time.time(),
+        }, f, indent=2)
+
+    if IS_DEBUG:
+        print(f"💾 Cached the run result as {get_run_cache_entry_path(run_cache_key)}")
+    return 0
+
+
+def read_run_cache_metas() -> dict[str, dict[str, Any]]:
+    """
+    Every cache entry's meta, by key.
+    """
+    if not os.path.isdir(RUN_CACHE_DIR):
+        return {}
+
+    run_cache_metas = {}
+    for filename in os.listdir(RUN_CACHE_DIR):
+        if not filename.endswith(".meta.json"):
+            continue
+        try:
+            with open(os.path.join(RUN_CACHE_DIR, filename), "r") as f:
+                run_cache_metas[filename[:-len(".meta.json")]] = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            run_cache_metas[filename[:-len(".meta.json")]] = {}
+    return run_cache_metas
+
+
+def clear_run_cache(bookmark_path_colon_rel_prefix: str | None = None) -> int:
+    """
+    Remove the cached results of every bookmark (or of the bookmarks under a colon path prefix).
+    Returns: the number of entries removed.
+    """
+    removed_count = 0
+    for run_cache_key, run_cache_meta in read_run_cache_metas().items():
+        bookmark_path_colon_rel = run_cache_meta.get("bookmark_path_colon_rel") or ""
+        if bookmark_path_colon_rel_prefix and not (
+            bookmark_path_colon_rel == bookmark_path_colon_rel_prefix
+            or bookmark_path_colon_rel.startswith(f"{bookmark_path_colon_rel_prefix}:")
+        ):
+            continue
+
+        run_cache_entry_path = get_run_cache_entry_path(run_cache_key)
+        for path in (
+            run_cache_entry_path,
+            os.path.join(RUN_CACHE_DIR, f".{run_cache_key}.enc"),
+            get_run_cache_meta_path(run_cache_key),
+        ):
+            if os.path.exists(path):
+                os.remove(path)
+        removed_count += 1
+    return removed_count
@@ -0,0 +1,44 @@
+from app.types.bookmark_types import TreePrintOptions
+
+IS_PRINT_DEF_NAME = True
+
+# --near: the current bookmark's folder and its siblings, with their bookmarks
+NEAR_DEFAULT_DEPTH = 1
+NO_TREE_FLAGS = ["--no-tree", "--json", "--resolve-batch"]
+
+
+def get_tree_print_options_from_args(args) -> TreePrintOptions:
+    """
+    Parse the bookmark tree printout options: --depth N, --under <folder>, --near, --no-tree.
+    Output meant for tools (--json, --resolve-batch) also leaves the tree out.
+    """
+    depth = None
+    if "--depth" in args:
+        flag_index = args.index("--depth")
+        if flag_index + 1 < len(args) and args[flag_index + 1].isdigit():
+            depth = int(args[flag_index + 1])
+        else:
+            print("⚠️  --depth expects a number of folder levels, printing the whole tree")
+
+    under_path_colon_rel = None
+    if "--under" in args:
+        flag_index = args.index("--under")
+        if flag_index + 1 < len(args) and not args[flag_index + 1].startswith("-"):
+            under_path_colon_rel = args[flag_index + 1].replace("/", ":").strip(":") or None
+        else:
+            print("⚠️  --under expects a folder, e.g. --under videos:0001_green_dog")
+
+    return {
+        "depth": depth,
+        "under_path_colon_rel": under_path_colon_rel,
+        "is_near": "--near" in args,
+        "is_no_tree": any(flag in args for flag in NO_TREE_FLAGS),
+    }
+
+
+def is_tree_print_scoped(tree_print_options: TreePrintOptions | None) -> bool:
+    return bool(tree_print_options) and (
+        tree_print_options["depth"] is not None
+        or tree_print_options["under_path_colon_rel"] is not None
+        or tree_print_options["is_near"]
+    )
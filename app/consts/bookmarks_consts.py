@@ -25,9 +25,9 @@ HIDDEN_COLOR = "\033[38;2;13;42;52m"
 RESET_COLOR = "\033[0m"
 SCREENSHOT_SAVE_SCALE = 0.5
 
-EXCLUDED_DIRS = {"archive", "archive_temp", "temp"}
+EXCLUDED_DIRS = {"archive", "archive_temp", "temp", ".objects", ".friendly", ".run_cache"}
 
-NON_NAME_BOOKMARK_KEYS = ["tags", "description", "video_filename", "timestamp", "type"]
+NON_NAME_BOOKMARK_KEYS = ["tags", "description", "video_filename", "timestamp", "type", "is_collapsed"]
 # TODO(KERCH): On creation, we should not allow these to be used as directory names. If they exist, we should raise an error.
 # TODO(KERCH): Create this list from the NAVIGATION_COMMANDS and NON_NAME_DIR_KEYS, instead of hardcoding it.
 RESERVED_BOOKMARK_NAMES = [
@@ -52,6 +52,65 @@ REPO_ROOT = str(Path(__file__).resolve().parents[2])
 
 ABS_OBS_BOOKMARKS_DIR = os.path.join(REPO_ROOT, "obs_bookmark_saves")
 
+# How bookmark redis states are stored: "json" (plain files), "objects" (manifests of deduplicated value blobs), or
+# "delta" (the keys that changed against a sibling bookmark's state, with a full keyframe every N links).
+REDIS_STATE_STORAGE_MODE = os.environ.get("REDIS_STATE_STORAGE_MODE", "json")
+REDIS_STATE_OBJECTS_DIR = os.path.join(ABS_OBS_BOOKMARKS_DIR, ".objects")
+REDIS_STATE_DELTA_KEYFRAME_INTERVAL = 8
+# Marks a folder that has (or had) delta-stored redis states, so saves elsewhere skip looking for dependent deltas.
+REDIS_STATE_DELTA_FOLDER_MARKER_FILENAME = ".redis_state_deltas"
+# Compress stored redis states (and their friendly views): "none", "gzip", "lzma", or "zstd" (if zstandard is installed).
+REDIS_STATE_COMPRESSION = os.environ.get("REDIS_STATE_COMPRESSION", "none")
+REDIS_STATE_COMPRESSION_WORKERS = 8
+# Write a bookmark's flat redis state and its friendly view on two threads.
+IS_SAVE_REDIS_STATE_FILES_IN_PARALLEL = True
+# Hand the slow redis_after writes (storage format/compression, friendly view) to a detached (forked) finalizer, so the
+# prompt returns before they finish. It holds a per-bookmark lock that the next run on the same bookmark waits on, and
+# writes a completion marker (and its output to a log) in the bookmark. Not used in "delta" storage mode, or in folders
+# that have deltas, where other bookmarks' states may be built on top of this one.
+IS_DETACHED_FINALIZER = (
+    os.environ.get("IS_DETACHED_FINALIZER", False) == "True"
+    or os.environ.get("IS_DETACHED_FINALIZER", False) == "true"
+)
+BOOKMARK_FINALIZER_LOCK_FILENAME = ".finalize.lock"
+BOOKMARK_FINALIZER_MARKER_FILENAME = ".finalized.json"
+BOOKMARK_FINALIZER_LOG_FILENAME = ".finalize.log"
+# Run the Redis pre-run (export/load) and the OBS pre-run (video load, seek, screenshot) on two threads.
+IS_PRE_RUN_STAGES_IN_PARALLEL = True
+
+# Friendly redis views are generated on demand (`bm <bookmark> --friendly`) and cached here by the source state's hash.
+# The index maps each source state to its current hash, so a view is dropped once its state has changed.
+# Set IS_SAVE_FRIENDLY_REDIS_STATES to also write friendly_redis_*.json next to the states on every save.
+FRIENDLY_REDIS_STATES_CACHE_DIR = os.path.join(ABS_OBS_BOOKMARKS_DIR, ".friendly")
+FRIENDLY_REDIS_STATES_CACHE_INDEX_PATH = os.path.join(FRIENDLY_REDIS_STATES_CACHE_DIR, "sources.json")
+IS_SAVE_FRIENDLY_REDIS_STATES = (
+    os.environ.get("IS_SAVE_FRIENDLY_REDIS_STATES", False) == "True"
+    or os.environ.get("IS_SAVE_FRIENDLY_REDIS_STATES", False) == "true"
+)
+
+# Bumped on every bookmark/folder meta write; the rendered bookmark tree is cached per generation.
+LIBRARY_GENERATION_PATH = os.path.join(ABS_OBS_BOOKMARKS_DIR, ".library_generation")
+BOOKMARK_TREE_CACHE_PATH = os.path.join(ABS_OBS_BOOKMARKS_DIR, ".bookmark_tree_cache.json")
+
+# Run-result cache (opt-in with IS_RUN_CACHE or `--use-cache`, `--no-cache` to bypass, `bm --clear-cache` to invalidate):
+# the redis_after of a run, keyed by the hash of the loaded before-state, the bookmark's OBS media (unless `--no-obs`),
+# the processor version, and RUN_CACHE_KEY_SETTINGS.
+# A hit restores the cached after-state and skips the main process.
+RUN_CACHE_DIR = os.path.join(ABS_OBS_BOOKMARKS_DIR, ".run_cache")
+IS_RUN_CACHE = (
+    os.environ.get("IS_RUN_CACHE", False) == "True"
+    or os.environ.get("IS_RUN_CACHE", False) == "true"
+)
+RUN_CACHE_KEY_SETTINGS = ["is_blank_slate", "is_use_alt_source_bookmark", "is_no_obs"]
+# The processor build that a cached result came from: PROCESSOR_VERSION, or the output of PROCESSOR_VERSION_COMMAND.
+PROCESSOR_VERSION = os.environ.get("PROCESSOR_VERSION", "")
+PROCESSOR_VERSION_COMMAND = os.environ.get(
+    "PROCESSOR_VERSION_COMMAND", "docker exec game_processor_backend git rev-parse HEAD")
+
+# Volatile keys that `--state-diff` (unless `--all-keys` is given) and `--verify` leave out. fnmatch patterns against the
+# full redis key, or against `<redis key>.<path inside the value>` for volatile fields, e.g. "session:*.updated_at".
+STATE_DIFF_IGNORED_KEY_PATTERNS = ["*gateway_listener_test*"]
+
 # REDIS #
 INITIAL_REDIS_STATE_DIR = os.path.join(REPO_ROOT, "app", "bookmarks", "redis_states")
 
@@ -63,6 +122,94 @@ LOCAL_REDIS_SESSIONS_HOST = "localhost"
 LOCAL_REDIS_SESSIONS_PORT = 6379
 LOCAL_REDIS_SESSIONS_DB = 0
 
+# When not local, talk to the session_manager's Redis directly over its published port (or socket) instead of `docker exec`.
+IS_DOCKER_REDIS_DIRECT = (
+    os.environ.get("IS_DOCKER_REDIS_DIRECT", False) == "True"
+    or os.environ.get("IS_DOCKER_REDIS_DIRECT", False) == "true"
+)
+DOCKER_REDIS_SESSIONS_HOST = os.environ.get("DOCKER_REDIS_SESSIONS_HOST", "localhost")
+DOCKER_REDIS_SESSIONS_PORT = int(os.environ.get("DOCKER_REDIS_SESSIONS_PORT", "6379"))
+DOCKER_REDIS_SESSIONS_SOCKET = os.environ.get("DOCKER_REDIS_SESSIONS_SOCKET", None)
+# For a sessions Redis with requirepass (or an ACL user), local or Docker.
+REDIS_SESSIONS_USERNAME = os.environ.get("REDIS_SESSIONS_USERNAME", None)
+REDIS_SESSIONS_PASSWORD = os.environ.get("REDIS_SESSIONS_PASSWORD", None)
+REDIS_CONNECT_TIMEOUT = 2
+
+# Whether we can use a redis client against the sessions Redis (rather than going through `docker exec`).
+IS_REDIS_DIRECTLY_REACHABLE = IS_LOCAL_REDIS_DEV or IS_DOCKER_REDIS_DIRECT
+
+# Reserved DBs on the sessions Redis (staging, snapshots, the processor signal DB, and the --parallel worker DBs) are
+# configurable, and checked before use: they must not overlap, the server must have enough DBs (`CONFIG GET databases`),
+# and a DB is only used once it was empty (or only held gg:* keys, for the signal DB) - then it is claimed in
+# RESERVED_REDIS_DBS_CLAIMS_PATH, and bm may flush it from then on.
+# Spare DB that the next bookmark's redis state is pre-staged into, to be SWAPDB'd into LOCAL_REDIS_SESSIONS_DB.
+LOCAL_REDIS_STAGING_DB = int(os.environ.get("REDIS_STAGING_DB", "1"))
+# Reserved DBs for server-side before/after checkpoints (Redis 6.2+ COPY), only serialized to disk when a bookmark file needs writing.
+LOCAL_REDIS_SNAPSHOT_BEFORE_DB = int(os.environ.get("REDIS_SNAPSHOT_BEFORE_DB", "2"))
+LOCAL_REDIS_SNAPSHOT_AFTER_DB = int(os.environ.get("REDIS_SNAPSHOT_AFTER_DB", "3"))
+IS_REDIS_SERVER_SIDE_SNAPSHOTS = (
+    os.environ.get("IS_REDIS_SERVER_SIDE_SNAPSHOTS", False) == "True"
+    or os.environ.get("IS_REDIS_SERVER_SIDE_SNAPSHOTS", False) == "true"
+)
+
+# Redis states at least this big are loaded by streaming a pre-rendered RESP file (mass insertion) instead of pipelined
+# SETs. Sized by the state's RESP or encoded cache once it has been loaded, by the stored file before that.
+REDIS_MASS_INSERT_MIN_BYTES = 5 * 1024 * 1024
+REDIS_MASS_INSERT_TIMEOUT = 60
+
+# How we know the processor's async work has drained after `--run-once` returns:
+# - "none": sleep ASYNC_WAIT_TIME
+# - "key": the processor SETs gg:processor:done:<GG_RUN_ID> in PROCESSOR_SIGNAL_DB
+# - "pubsub": the processor PUBLISHes <GG_RUN_ID> on gg:processor:done
+# - "stream": the processor XADDs {"run_id": <GG_RUN_ID>} to gg:processor:done
+# The run id (and the signal DB/mode) are passed to the processor as GG_RUN_ID, GG_SIGNAL_DB, and GG_COMPLETION_SIGNAL.
+PROCESSOR_COMPLETION_SIGNAL = os.environ.get("PROCESSOR_COMPLETION_SIGNAL", "none")
+PROCESSOR_COMPLETION_TIMEOUT = float(os.environ.get("PROCESSOR_COMPLETION_TIMEOUT", "30"))
+PROCESSOR_SIGNAL_DB = int(os.environ.get("PROCESSOR_SIGNAL_DB", "15"))
+PROCESSOR_DONE_KEY_PREFIX = "gg:processor:done:"
+PROCESSOR_DONE_CHANNEL = "gg:processor:done"
+PROCESSOR_DONE_STREAM = "gg:processor:done"
+
+# How the processor is triggered:
+# - "docker_exec": a fresh `docker exec ... --run-once` per run
+# - "queue": a run request is LPUSHed onto gg:processor:requests (in PROCESSOR_SIGNAL_DB) for a long-running processor
+#   worker, which BRPOPs it, runs one pass, and LPUSHes its result onto gg:processor:result:<run_id>.
+#   Each worker keeps its own gg:processor:worker:heartbeat:<worker id> alive while it runs; without any we fall back to
+#   `docker exec`. Several workers can BRPOP the same queue, one per run that should go at once (e.g. one per --parallel worker).
+PROCESSOR_TRIGGER = os.environ.get("PROCESSOR_TRIGGER", "docker_exec")
+PROCESSOR_REQUEST_QUEUE = "gg:processor:requests"
+PROCESSOR_RESULT_KEY_PREFIX = "gg:processor:result:"
+PROCESSOR_WORKER_HEARTBEAT_KEY_PREFIX = "gg:processor:worker:heartbeat:"
+PROCESSOR_WORKER_HEARTBEAT_TTL = 10
+# The sessions Redis as the processor reaches it from inside its container, in place of a loopback host (localhost,
+# 127.0.0.1) that we reach it on - for the queue's run requests and {processor_redis_host} in PROCESSOR_COMMAND_TEMPLATE.
+# Empty: pass our own host through.
+PROCESSOR_REDIS_HOST = os.environ.get("PROCESSOR_REDIS_HOST", "host.docker.internal")
+
+# --parallel: each worker gets its own Redis DB (PARALLEL_REDIS_FIRST_WORKER_DB, +1, ...) on the sessions Redis, or, if
+# PARALLEL_REDIS_WORKER_PORTS is set (e.g. "6380,6381,6382"), its own local redis-server instance.
+PARALLEL_WORKERS = int(os.environ.get("PARALLEL_WORKERS", "4"))
+PARALLEL_REDIS_FIRST_WORKER_DB = int(os.environ.get("PARALLEL_REDIS_FIRST_WORKER_DB", "4"))
+PARALLEL_REDIS_LAST_WORKER_DB = int(os.environ.get("PARALLEL_REDIS_LAST_WORKER_DB", "14"))
+PARALLEL_REDIS_WORKER_PORTS = [
+    int(port) for port in os.environ.get("PARALLEL_REDIS_WORKER_PORTS", "").split(",") if port.strip()
+]
+# How a worker triggers the processor against its Redis. Fields: {redis_host}, {processor_redis_host} (see
+# PROCESSOR_REDIS_HOST), {redis_port}, {redis_db}, {worker},
+# {bookmark_path}, {python}, {repo_root}, and for the completion signal {run_id}, {signal}, {signal_db}, and {signal_env}
+# (the same as `-e GG_RUN_ID=... -e GG_SIGNAL_DB=... -e GG_COMPLETION_SIGNAL=...`).
+PROCESSOR_COMMAND_TEMPLATE = os.environ.get(
+    "PROCESSOR_COMMAND_TEMPLATE",
+    'docker exec -e REDIS_HOST={processor_redis_host} -e REDIS_PORT={redis_port} -e REDIS_DB={redis_db} {signal_env} '
+    'game_processor_backend python ./main.py --run-once --gg_user_id="DEV_GG_USER_ID_{worker}"',
+)
+# Local stand-in for the processor (`--stub-processor`), for exercising the runners without the game processor.
+STUB_PROCESSOR_COMMAND_TEMPLATE = (
+    "{python} {repo_root}/standalone_utils/stub_game_processor.py "
+    "--host {redis_host} --port {redis_port} --db {redis_db} --run-id {run_id} --signal {signal} --signal-db {signal_db}"
+)
+PROCESSOR_COMMAND_TIMEOUT = 600
+
 GAME_GENIUS_PARENT_DIR = str(Path(REPO_ROOT).resolve().parents[0])
 REDIS_DUMP_DIR = (
     os.path.join(REPO_ROOT, "standalone_utils", "redis", "redis_dump")
@@ -72,3 +219,5 @@ REDIS_DUMP_DIR = (
         "game-genius/services/session_manager/utils/standalone/redis_dump",
     )
 )
+# The reserved DBs that bm has claimed, per Redis server (see LOCAL_REDIS_STAGING_DB).
+RESERVED_REDIS_DBS_CLAIMS_PATH = os.path.join(REDIS_DUMP_DIR, "reserved_redis_dbs.json")
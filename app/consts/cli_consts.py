@@ -6,7 +6,6 @@ Navigation commands:
   next, previous, first, last, last_used/current/again    Navigate to adjacent bookmarks in the same directory
 """
 
-# TODO(MFB): Add an option to show redis before and after diffs.
 OPTIONS_HELP = (
     USAGE_HELP
     + """
@@ -23,6 +22,27 @@ Options:
   --save-last-redis                          Save current Redis state as redis_after.json
   -v <video_path>, --open-video <video_path> Open video file in OBS (paused) without saving or running anything
   -t, --tags <tag1> <tag2> ...              Add tags to bookmark metadata
+  -sn, --stage-next                          Pre-stage the next bookmark's redis state into a spare Redis DB (swapped in on the next run)
+  --verify                                   Compare the processed redis state with the stored redis_after.json (saves nothing, not even the last used bookmark)
+  --use-cache, --no-cache                    Reuse the cached result of an identical run (same before-state and processor version)
+                                             and skip the main process, or bypass the cache (also when IS_RUN_CACHE is set)
+  --clear-cache [<folder:bookmark>]          Remove cached run results (all, or those of the bookmarks under a folder)
+  --compress-states [gzip|lzma|zstd|none]    Compress all stored redis states in the library (runs nothing else)
+  <bookmark> --friendly [before|after]       Build (or reuse) the friendly view of a bookmark's redis state and print its path
+  --batch <folder|query|file> [run flags]    Run many bookmarks in one process and print a summary with timings
+    [--stop-on-error]                        (file: one folder or query per line)
+  --parallel <folder|query|file>             Regression-run bookmarks in parallel, one Redis DB (or instance) per worker,
+    [--workers N] [--stub-processor]         comparing each result with its redis_after.json
+  <bookmark> --state-diff [--json]           Show what changed between a bookmark's redis_before and redis_after
+    [--all-keys] [--ignore <pattern> ...]    (volatile keys like gateway_listener_test are left out unless --all-keys)
+  --depth N                                  Print the bookmark tree N folder levels deep (deeper folders are collapsed)
+  --under <folder>                           Print only this folder's part of the bookmark tree
+  --near                                     Print only the current bookmark's folder and its sibling folders
+  --no-tree                                  Don't print the bookmark tree at the end (also left out with --json)
+  -ls --json [--under <folder>]              Stream every bookmark as one JSON object per line (NDJSON)
+  <bookmark> -w --json                       Print the matches of a bookmark string as JSON lines
+  --resolve-batch [--json] < queries.txt     Resolve one bookmark string per stdin line: query, matching stage,
+                                             candidate count, and the bookmark when it is unambiguous
 
 Navigation:
   next, previous, first, last                Navigate to adjacent bookmarks in the same directory
@@ -34,11 +54,24 @@ Examples:
   main.py my-bookmark folder:other-bookmark
   main.py my-bookmark --blank-slate
   main.py next -p -s
+  main.py next --stage-next
+  main.py my-bookmark --verify
+  main.py my-bookmark --use-cache
+  main.py --clear-cache videos:0001_green_dog
   main.py previous
   main.py first
   main.py last
   main.py -v /path/to/video.mp4
   main.py --open-video /path/to/video.mp4
+  main.py --compress-states lzma
+  main.py my-bookmark --friendly before
+  main.py --batch videos:0001_green_dog --verify
+  main.py --parallel videos:0001_green_dog --workers 8
+  main.py my-bookmark --state-diff --ignore '*timestamp*'
+  main.py -ls --under videos:0001_green_dog --depth 1
+  main.py next --near
+  main.py -ls --json | fzf
+  main.py --resolve-batch < shorthands.txt
   main.py --tags tag1 tag2
   main.py my-bookmark -sd
   main.py my-bookmark --no-obs -t important highlight
@@ -0,0 +1,145 @@
+import os
+import time
+import traceback
+
+from app.bookmarks.bookmarks import get_all_live_bookmark_path_slash_rels
+from app.bookmarks.matching.bookmark_matching import find_best_bookmark_match_or_create
+from app.consts.bookmarks_consts import ABS_OBS_BOOKMARKS_DIR
+from app.run_bookmark_pipeline import run_bookmark_pipeline
+from app.types.bookmark_types import CurrentRunSettings, MatchedBookmarkObj
+from app.utils.bookmark_utils import convert_exact_bookmark_path_to_bm_obj
+from app.utils.decorators import print_def_name
+from app.utils.printing_utils import print_color
+from app.utils.sorting_utils import natural_sort_key
+
+IS_PRINT_DEF_NAME = True
+
+
+def resolve_batch_query(query: str) -> list[MatchedBookmarkObj] | None:
+    """
+    A folder (colon or slash separated) resolves to every bookmark under it, anything else goes through the matcher
+    (without prompting) and resolves to all of its matches.
+    """
+    query_slash = query.replace(":", "/").strip("/")
+    query_abs = os.path.join(ABS_OBS_BOOKMARKS_DIR, query_slash)
+    if os.path.isdir(query_abs) and not os.path.exists(os.path.join(query_abs, "bookmark_meta.json")):
+        return [
+            convert_exact_bookmark_path_to_bm_obj(bookmark_path_slash_rel)
+            for bookmark_path_slash_rel in sorted(get_all_live_bookmark_path_slash_rels(), key=natural_sort_key)
+            if bookmark_path_slash_rel.startswith(f"{query_slash}/")
+        ]
+
+    bookmark_obj_match = find_best_bookmark_match_or_create(
+        query, is_prompt_user_for_selection=False, is_prompt_user_for_create_bm_option=False)
+    if isinstance(bookmark_obj_match, list):
+        return bookmark_obj_match
+    if not bookmark_obj_match or isinstance(bookmark_obj_match, int):
+        return None
+    return [bookmark_obj_match]
+
+
+def resolve_batch_bookmarks(batch_target: str) -> list[MatchedBookmarkObj] | None:
+    """
+    The bookmarks to run: from a playlist file (one folder or query per line, # for comments), or a single folder/query.
+    """
+    if not os.path.isfile(batch_target):
+        return resolve_batch_query(batch_target)
+
+    with open(batch_target, "r") as f:
+        queries = [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+    batch_bookmark_objs = []
+    seen_bookmark_paths = set()
+    for query in queries:
+        query_bookmark_objs = resolve_batch_query(query)
+        if not query_bookmark_objs:
+            print_color(f"❌ No bookmarks matched '{query}'", "red")
+            return None
+        for bookmark_obj in query_bookmark_objs:
+            if bookmark_obj["bookmark_path_slash_abs"] not in seen_bookmark_paths:
+                seen_bookmark_paths.add(bookmark_obj["bookmark_path_slash_abs"])
+                batch_bookmark_objs.append(bookmark_obj)
+    return batch_bookmark_objs
+
+
+def print_batch_summary(batch_results: list[tuple[str, int | None, float]], total_seconds: float) -> None:
+    """
+    One row per bookmark: status, seconds, bookmark path. Bookmarks that were not run (--stop-on-error) show as skipped.
+    """
+    print()
+    print("📋 Batch summary:")
+    print(f"  {'#':>3}  {'status':<8}  {'seconds':>8}  bookmark")
+    for i, (bookmark_path_colon_rel, result, seconds) in enumerate(batch_results, start=1):
+        if result is None:
+            print_color(f"  {i:>3}  {'skipped':<8}  {'':>8}  {bookmark_path_colon_rel}", "yellow")
+        elif result == 0:
+            print_color(f"  {i:>3}  {'ok':<8}  {seconds:>8.2f}  {bookmark_path_colon_rel}", "green")
+        else:
+            print_color(f"  {i:>3}  {'failed':<8}  {seconds:>8.2f}  {bookmark_path_colon_rel}", "red")
+
+    ok_count = sum(1 for _, result, _ in batch_results if result == 0)
+    failed_count = sum(1 for _, result, _ in batch_results if result not in (0, None))
+    print(f"✅ {ok_count} ok, ❌ {failed_count} failed, {len(batch_results)} total in {total_seconds:.2f}s")
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_batch(args) -> int:
+    """
+    Run many bookmarks in one process, sharing the bookmark scan and the Redis/OBS connections.
+    Usage: bm --batch <folder | query | playlist_file> [--stop-on-error] [run flags, e.g. --verify, -s, --no-obs]
+    """
+    # Imported here, as process_flags routes to this handler.
+    from app.flag_handlers.process_flags import process_flags
+
+    args_copy = args.copy()
+    batch_index = args_copy.index('--batch')
+    args_copy.pop(batch_index)
+    if batch_index >= len(args_copy) or args_copy[batch_index].startswith('-'):
+        print("❌ --batch needs a folder, a bookmark query, or a playlist file")
+        print("Usage: bm --batch <folder | query | playlist_file> [--stop-on-error] [run flags]")
+        return 1
+    batch_target = args_copy.pop(batch_index)
+
+    is_stop_on_error = '--stop-on-error' in args_copy
+    if is_stop_on_error:
+        args_copy.remove('--stop-on-error')
+
+    batch_bookmark_objs = resolve_batch_bookmarks(batch_target)
+    if not batch_bookmark_objs:
+        print_color(f"❌ No bookmarks to run for '{batch_target}'", "red")
+        return 1
+
+    batch_run_settings_obj = process_flags(args_copy)
+    if isinstance(batch_run_settings_obj, int):
+        return batch_run_settings_obj
+
+    print(f"📚 Running {len(batch_bookmark_objs)} bookmarks:")
+    for bookmark_obj in batch_bookmark_objs:
+        print(f"  • {bookmark_obj['bookmark_path_colon_rel']}")
+
+    batch_results: list[tuple[str, int | None, float]] = []
+    batch_start_time = time.perf_counter()
+    for i, bookmark_obj in enumerate(batch_bookmark_objs, start=1):
+        bookmark_path_colon_rel = bookmark_obj["bookmark_path_colon_rel"]
+        print()
+        print_color(f"==== [{i}/{len(batch_bookmark_objs)}] {bookmark_path_colon_rel} ====", "cyan")
+
+        # Each run gets its own settings, as pre-processing fills in the alt source bookmark.
+        current_run_settings_obj: CurrentRunSettings = {**batch_run_settings_obj}
+        start_time = time.perf_counter()
+        try:
+            result = run_bookmark_pipeline(bookmark_obj, current_run_settings_obj)
+        except Exception:
+            traceback.print_exc()
+            result = 1
+        batch_results.append((bookmark_path_colon_rel, result, time.perf_counter() - start_time))
+
+        if result != 0 and is_stop_on_error:
+            batch_results.extend(
+                (skipped_bookmark_obj["bookmark_path_colon_rel"], None, 0.0)
+                for skipped_bookmark_obj in batch_bookmark_objs[i:]
+            )
+            break
+
+    print_batch_summary(batch_results, time.perf_counter() - batch_start_time)
+    return 0 if all(result == 0 for _, result, _ in batch_results) else 1
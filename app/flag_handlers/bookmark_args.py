@@ -0,0 +1,33 @@
+from app.bookmarks.last_used import get_last_used_bookmark
+from app.bookmarks.matching.bookmark_matching import find_best_bookmark_match_or_create
+from app.types.bookmark_types import MatchedBookmarkObj
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def get_bookmark_obj_from_args_or_last_used(args_copy, usage: str) -> MatchedBookmarkObj | None:
+    """
+    The bookmark a flag handler acts on: the one its first (non-flag) arg matches, without prompting, or the last used
+    bookmark when there is no arg. Prints why there is none (several matches, or no match and the usage).
+    """
+    if args_copy:
+        cli_bookmark_string = args_copy[0]
+        bookmark_obj_match = find_best_bookmark_match_or_create(
+            cli_bookmark_string, is_prompt_user_for_selection=False)
+        if isinstance(bookmark_obj_match, list):
+            if len(bookmark_obj_match) != 1:
+                print(f"⚠️  Multiple bookmarks matched for '{cli_bookmark_string}':")
+                for bookmark_obj in bookmark_obj_match:
+                    print(f"  • {bookmark_obj['bookmark_path_colon_rel']}")
+                return None
+            bookmark_obj_match = bookmark_obj_match[0]
+    else:
+        bookmark_obj_match = get_last_used_bookmark()
+
+    if not bookmark_obj_match or isinstance(bookmark_obj_match, int):
+        print("❌ No bookmark matched")
+        print(f"Usage: {usage}")
+        return None
+    return bookmark_obj_match
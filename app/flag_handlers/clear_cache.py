@@ -0,0 +1,24 @@
+from app.bookmarks.redis_states.run_result_cache import clear_run_cache
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_clear_cache(args) -> int:
+    """
+    Invalidate cached run results (--use-cache): all of them, or those of one bookmark / the bookmarks under a folder.
+    Usage: bm --clear-cache [<folder:bookmark>]
+    """
+    flag_index = args.index('--clear-cache')
+
+    bookmark_path_colon_rel_prefix = None
+    if flag_index + 1 < len(args) and not args[flag_index + 1].startswith("-"):
+        bookmark_path_colon_rel_prefix = args[flag_index + 1].replace("/", ":").strip(":")
+
+    removed_count = clear_run_cache(bookmark_path_colon_rel_prefix)
+    if bookmark_path_colon_rel_prefix:
+        print(f"🧹 Removed {removed_count} cached run results under {bookmark_path_colon_rel_prefix}")
+    else:
+        print(f"🧹 Removed {removed_count} cached run results")
+    return 0
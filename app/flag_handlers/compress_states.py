@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.bookmarks.redis_states.redis_state_storage import (
+    REDIS_STATE_COMPRESSION_MAGIC_BYTES,
+    recompress_redis_state_folder,
+    resolve_redis_state_compression,
+)
+from app.consts.bookmarks_consts import (
+    ABS_OBS_BOOKMARKS_DIR,
+    REDIS_STATE_COMPRESSION,
+    REDIS_STATE_COMPRESSION_WORKERS,
+)
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+VALID_COMPRESSIONS = [*REDIS_STATE_COMPRESSION_MAGIC_BYTES, "none"]
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_compress_states(args) -> int:
+    """
+    Migration: (re)compress every stored redis state and friendly view in the library, one folder per worker.
+    Usage: bm --compress-states [gzip|lzma|zstd|none]  (defaults to REDIS_STATE_COMPRESSION, or gzip)
+    """
+    compress_flag = '--compress-states'
+    flag_index = args.index(compress_flag)
+
+    compression = REDIS_STATE_COMPRESSION if REDIS_STATE_COMPRESSION != "none" else "gzip"
+    if flag_index + 1 < len(args) and not args[flag_index + 1].startswith("-"):
+        compression = args[flag_index + 1]
+    if compression not in VALID_COMPRESSIONS:
+        print(f"❌ Unknown compression '{compression}', expected one of: {', '.join(VALID_COMPRESSIONS)}")
+        return 1
+    compression = resolve_redis_state_compression(compression)
+
+    folder_paths = []
+    for dir_path, dir_names, _ in os.walk(ABS_OBS_BOOKMARKS_DIR):
+        dir_names[:] = [dir_name for dir_name in dir_names if not dir_name.startswith(".")]
+        folder_paths.append(dir_path)
+
+    print(f"🗜️  Compressing redis states with {compression} ({len(folder_paths)} folders)...")
+
+    def compress_folder(folder_path: str):
+        try:
+            return folder_path, recompress_redis_state_folder(folder_path, compression), None
+        except Exception as e:
+            return folder_path, None, e
+
+    total_files, total_bytes_before, total_bytes_after = 0, 0, 0
+    errors = []
+    with ThreadPoolExecutor(max_workers=REDIS_STATE_COMPRESSION_WORKERS) as executor:
+        for folder_path, results, error in executor.map(compress_folder, folder_paths):
+            if error:
+                errors.append((folder_path, error))
+                continue
+            files_rewritten, bytes_before, bytes_after = results
+            total_files += files_rewritten
+            total_bytes_before += bytes_before
+            total_bytes_after += bytes_after
+
+    for folder_path, error in errors:
+        print(f"❌ Error compressing {folder_path}: {error}")
+
+    print(
+        f"✅ Rewrote {total_files} files: "
+        f"{total_bytes_before / 1_000_000:.1f} MB → {total_bytes_after / 1_000_000:.1f} MB")
+
+    return 1 if errors else 0
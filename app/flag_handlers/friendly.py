@@ -0,0 +1,53 @@
+import os
+
+from app.bookmarks.bookmark_finalizer import wait_for_bookmark_finalizer
+from app.bookmarks.redis_states.redis_friendly_converter import (
+    get_friendly_redis_state_view,
+)
+from app.flag_handlers.bookmark_args import get_bookmark_obj_from_args_or_last_used
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_friendly(args) -> int:
+    """
+    Print the path of a bookmark's friendly redis view, generating it on demand.
+    Usage: bm [<bookmark_path>] --friendly [before|after]  (defaults to the last used bookmark, and redis_after if it exists)
+    """
+    friendly_flag = '--friendly'
+    args_copy = args.copy()
+    flag_index = args_copy.index(friendly_flag)
+
+    before_or_after = None
+    if flag_index + 1 < len(args_copy) and args_copy[flag_index + 1] in ("before", "after"):
+        before_or_after = args_copy.pop(flag_index + 1)
+    args_copy.remove(friendly_flag)
+
+    bookmark_obj_match = get_bookmark_obj_from_args_or_last_used(
+        args_copy, "bm <bookmark_path> --friendly [before|after]")
+    if not bookmark_obj_match:
+        return 1
+
+    bookmark_path_abs = bookmark_obj_match["bookmark_path_slash_abs"]
+    if wait_for_bookmark_finalizer(bookmark_path_abs) != 0:
+        return 1
+    if before_or_after is None:
+        before_or_after = "after" if os.path.exists(
+            os.path.join(bookmark_path_abs, "redis_after.json")) else "before"
+
+    redis_state_path = os.path.join(bookmark_path_abs, f"redis_{before_or_after}.json")
+    if not os.path.exists(redis_state_path):
+        print(f"❌ {bookmark_obj_match['bookmark_path_colon_rel']} has no redis_{before_or_after}.json")
+        return 1
+
+    try:
+        friendly_view_path = get_friendly_redis_state_view(redis_state_path)
+    except Exception as e:
+        print(f"❌ Error building the friendly view of {redis_state_path}: {e}")
+        return 1
+
+    print(f"✅ Friendly redis_{before_or_after} of {bookmark_obj_match['bookmark_path_colon_rel']}:")
+    print(f"  {friendly_view_path}")
+    return 0
@@ -1,19 +1,34 @@
 # import os
-# import json
 # from app.consts.bookmarks_consts import IS_PRINT_JUST_CURRENT_DIRECTORY_BOOKMARKS_ON_LS
 # from app.bookmark_dir_processes import find_bookmark_dir_by_name
 # from app.bookmarks.bookmarks_print import print_all_live_directories_and_bookmarks
 # from app.bookmarks.matching.matching_utils import token_match_bookmarks
+import json
+
+from app.bookmarks.bookmarks import iter_live_bookmark_list_entries
+from app.bookmarks.tree_print_options import get_tree_print_options_from_args
 from app.utils.decorators import print_def_name
 
 IS_PRINT_DEF_NAME = True
 
 # TODO(MFB): We may want to consider that the print_all_live_directories_and_bookmarks only prints the current directory bookmarks when we hit the end of the file. We should make sure that if we LS, that it prints all of the applicable bookmarks (all).
 @print_def_name(IS_PRINT_DEF_NAME)
-def handle_ls(_args):
+def handle_ls(args):
+    """
+    The tree itself is printed at the end of every run (main.py), scoped by --depth/--under/--near.
+    With --json: stream one JSON object per bookmark (NDJSON) instead, for scripts/fzf/dashboards.
+    Usage: bm -ls --json [--under <folder>]
+    """
+    if '--json' not in args:
+        return 0
+
+    under_path_colon_rel = get_tree_print_options_from_args(args)["under_path_colon_rel"]
+    for bookmark_list_entry in iter_live_bookmark_list_entries(under_path_colon_rel):
+        print(json.dumps(bookmark_list_entry), flush=True)
+    return 0
+
     # Remove -ls so we can check what came before it
     # TODO(MFB): Redo this.
-    return 0
     # args_copy = args.copy()
     # args_copy.remove('-ls') if '-ls' in args_copy else args_copy.remove('--ls')
 
@@ -0,0 +1,170 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.bookmarks.redis_states.parallel_redis_workers import (
+    RedisWorkerResult,
+    RedisWorkerSlot,
+    get_parallel_redis_worker_slots,
+    get_redis_worker_client,
+    run_bookmark_on_redis_worker,
+)
+from app.bookmarks.redis_states.redis_state_diff import print_redis_state_diff_summary
+from app.bookmarks.redis_states.redis_state_handlers.handle_validate_reserved_redis_dbs import (
+    handle_validate_reserved_redis_dbs,
+)
+from app.consts.bookmarks_consts import (
+    IS_REDIS_DIRECTLY_REACHABLE,
+    PARALLEL_REDIS_WORKER_PORTS,
+    PARALLEL_WORKERS,
+    PROCESSOR_COMMAND_TEMPLATE,
+    PROCESSOR_SIGNAL_DB,
+    PROCESSOR_TRIGGER,
+    STUB_PROCESSOR_COMMAND_TEMPLATE,
+)
+from app.flag_handlers.batch import resolve_batch_bookmarks
+from app.processor.processor_queue import count_processor_workers
+from app.utils.decorators import print_def_name
+from app.utils.printing_utils import print_color
+
+IS_PRINT_DEF_NAME = True
+
+STATUS_COLORS = {"passed": "green", "failed": "red", "error": "red", "no_golden": "yellow"}
+
+
+def print_parallel_summary(worker_results: list[RedisWorkerResult], total_seconds: float) -> None:
+    print()
+    print("📋 Parallel regression summary:")
+    print(f"  {'#':>3}  {'status':<9}  {'worker':>6}  {'seconds':>8}  bookmark")
+    for i, worker_result in enumerate(worker_results, start=1):
+        print_color(
+            f"  {i:>3}  {worker_result['status']:<9}  {worker_result['worker']:>6}  {worker_result['seconds']:>8.2f}  "
+            f"{worker_result['bookmark_path_colon_rel']}"
+            + (f"  ({worker_result['error']})" if worker_result["error"] else ""),
+            STATUS_COLORS[worker_result["status"]],
+        )
+
+    for worker_result in worker_results:
+        if worker_result["status"] == "failed" and worker_result["state_diff"]:
+            print()
+            print_color(f"❌ {worker_result['bookmark_path_colon_rel']} (stored redis_after → this run)", "red")
+            print_redis_state_diff_summary(worker_result["state_diff"], max_keys=5)
+
+    status_counts = {status: 0 for status in STATUS_COLORS}
+    for worker_result in worker_results:
+        status_counts[worker_result["status"]] += 1
+    bookmarks_per_minute = len(worker_results) / total_seconds * 60 if total_seconds else 0.0
+    async_seconds = [worker_result["async_seconds"] for worker_result in worker_results
+                     if worker_result["async_seconds"] is not None]
+    print()
+    print(
+        f"✅ {status_counts['passed']} passed, ❌ {status_counts['failed']} failed, "
+        f"⚠️  {status_counts['error']} errors, {status_counts['no_golden']} without redis_after.json"
+    )
+    print(f"⏱️  {len(worker_results)} bookmarks in {total_seconds:.2f}s ({bookmarks_per_minute:.1f} bookmarks/min)")
+    if async_seconds:
+        print(f"⏳ Completion signal latency: avg {sum(async_seconds) / len(async_seconds):.2f}s, max {max(async_seconds):.2f}s")
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_parallel(args) -> int:
+    """
+    Regression-run many bookmarks in parallel, each worker on its own Redis DB (or redis-server instance): load the
+    bookmark's redis_before, trigger the processor against that Redis, and compare the result with the stored redis_after.json.
+    Usage: bm --parallel <folder | query | playlist_file> [--workers N] [--stub-processor]
+    """
+    args_copy = args.copy()
+    parallel_index = args_copy.index('--parallel')
+    args_copy.pop(parallel_index)
+    if parallel_index >= len(args_copy) or args_copy[parallel_index].startswith('-'):
+        print("❌ --parallel needs a folder, a bookmark query, or a playlist file")
+        print("Usage: bm --parallel <folder | query | playlist_file> [--workers N] [--stub-processor]")
+        return 1
+    parallel_target = args_copy.pop(parallel_index)
+
+    worker_count = PARALLEL_WORKERS
+    if '--workers' in args_copy:
+        workers_index = args_copy.index('--workers')
+        try:
+            worker_count = int(args_copy[workers_index + 1])
+        except (IndexError, ValueError):
+            print("❌ --workers needs a number")
+            return 1
+
+    command_template = PROCESSOR_COMMAND_TEMPLATE
+    is_stub_processor = '--stub-processor' in args_copy
+    if is_stub_processor:
+        command_template = STUB_PROCESSOR_COMMAND_TEMPLATE
+
+    if not IS_REDIS_DIRECTLY_REACHABLE and not PARALLEL_REDIS_WORKER_PORTS:
+        print("❌ --parallel needs direct Redis access (IS_LOCAL_REDIS_DEV or IS_DOCKER_REDIS_DIRECT), "
+              "or PARALLEL_REDIS_WORKER_PORTS")
+        return 1
+
+    bookmark_objs = resolve_batch_bookmarks(parallel_target)
+    if not bookmark_objs:
+        print_color(f"❌ No bookmarks to run for '{parallel_target}'", "red")
+        return 1
+
+    slots = get_parallel_redis_worker_slots(min(worker_count, len(bookmark_objs)))
+    if not slots:
+        print("❌ No Redis workers available")
+        return 1
+    if not PARALLEL_REDIS_WORKER_PORTS and handle_validate_reserved_redis_dbs([slot["db"] for slot in slots]) != 0:
+        return 1
+
+    # Connect every worker up front, so that a bad port/DB fails before anything runs.
+    worker_clients = {}
+    for slot in slots:
+        try:
+            worker_clients[slot["worker"]] = get_redis_worker_client(slot)
+            worker_clients[slot["worker"]].ping()
+        except Exception as e:
+            print(f"❌ Could not connect to worker {slot['worker']}'s Redis ({slot['host']}:{slot['port']} db {slot['db']}): {e}")
+            return 1
+
+    if PROCESSOR_TRIGGER == "queue":
+        # Queued runs go at most one per live processor worker, however many Redis workers there are.
+        processor_worker_count = count_processor_workers(get_redis_worker_client({**slots[0], "db": PROCESSOR_SIGNAL_DB}))
+        if 0 < processor_worker_count < len(slots):
+            print(f"⚠️  Only {processor_worker_count} processor workers for {len(slots)} Redis workers, runs will wait "
+                  f"for a free one (start more, e.g. `stub_game_processor.py --serve --consumers {len(slots)}`)")
+
+    free_slots: queue.Queue[RedisWorkerSlot] = queue.Queue()
+    for slot in slots:
+        free_slots.put(slot)
+
+    def run_on_free_worker(bookmark_obj) -> RedisWorkerResult:
+        slot = free_slots.get()
+        try:
+            return run_bookmark_on_redis_worker(
+                bookmark_obj,
+                slot,
+                worker_clients[slot["worker"]],
+                command_template,
+                is_wait_for_async_processes=not is_stub_processor,
+            )
+        finally:
+            free_slots.put(slot)
+
+    worker_redis_names = ", ".join(f"{slot['port']}/{slot['db']}" for slot in slots)
+    print(f"🚀 Running {len(bookmark_objs)} bookmarks on {len(slots)} Redis workers (port/db: {worker_redis_names})...")
+
+    worker_results: list[RedisWorkerResult | None] = [None] * len(bookmark_objs)
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(slots)) as executor:
+        futures = {
+            executor.submit(run_on_free_worker, bookmark_obj): i
+            for i, bookmark_obj in enumerate(bookmark_objs)
+        }
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            worker_result = future.result()
+            worker_results[futures[future]] = worker_result
+            print_color(
+                f"  [{done_count}/{len(bookmark_objs)}] {worker_result['status']:<9} {worker_result['bookmark_path_colon_rel']}",
+                STATUS_COLORS[worker_result["status"]],
+            )
+
+    completed_results = [worker_result for worker_result in worker_results if worker_result is not None]
+    print_parallel_summary(completed_results, time.perf_counter() - start_time)
+    return 0 if all(worker_result["status"] == "passed" for worker_result in completed_results) else 1
@@ -3,11 +3,18 @@ from typing import Callable, cast
 from app.bookmarks.navigation.get_alt_source_cli_nav_string_from_args import (
     get_alt_source_cli_nav_string_from_args,
 )
-from app.consts.bookmarks_consts import IS_DEBUG
+from app.consts.bookmarks_consts import IS_DEBUG, IS_RUN_CACHE
 from app.consts.cli_consts import OPTIONS_HELP
+from app.flag_handlers.batch import handle_batch
+from app.flag_handlers.clear_cache import handle_clear_cache
+from app.flag_handlers.compress_states import handle_compress_states
+from app.flag_handlers.friendly import handle_friendly
 from app.flag_handlers.help import handle_help
 from app.flag_handlers.ls import handle_ls
 from app.flag_handlers.open_video import open_video
+from app.flag_handlers.parallel import handle_parallel
+from app.flag_handlers.resolve_batch import handle_resolve_batch
+from app.flag_handlers.state_diff import handle_state_diff
 from app.flag_handlers.which import handle_which
 from app.tags.find_cli_tags import find_cli_tags
 from app.types.bookmark_types import (
@@ -29,6 +36,13 @@ flag_route_handler_map: dict[ValidRoutedFlags, Callable] = {
     "-w": handle_which,
     "--open-video": open_video,
     "-v": open_video,
+    "--compress-states": handle_compress_states,
+    "--friendly": handle_friendly,
+    "--state-diff": handle_state_diff,
+    "--batch": handle_batch,
+    "--parallel": handle_parallel,
+    "--clear-cache": handle_clear_cache,
+    "--resolve-batch": handle_resolve_batch,
 }
 
 
@@ -43,8 +57,8 @@ def process_flags(args) -> CurrentRunSettings | int:
     # for flag, handler in flag_route_handler_map.items():
     for flag, handler in flag_route_handler_map.items():
         if flag in args:
-            handler(args)
-            return 0
+            result = handler(args)
+            return result if isinstance(result, int) else 0
 
     # Check for unsupported flags
     unsupported_flags = [arg for arg in args if arg.startswith(
@@ -108,6 +122,18 @@ def process_flags(args) -> CurrentRunSettings | int:
     is_show_image = is_flag_in_args([
         "--show-image"
     ])
+    is_stage_next_redis_state = is_flag_in_args([
+        "--stage-next",
+        "-sn"
+    ])
+    is_verify_redis_after = is_flag_in_args([
+        "--verify"
+    ])
+    is_use_run_cache = (IS_RUN_CACHE or is_flag_in_args([
+        "--use-cache"
+    ])) and not is_flag_in_args([
+        "--no-cache"
+    ])
     is_add_bookmark = "--add" in args or "-a" in args
 
     if is_no_docker_no_redis:
@@ -120,6 +146,13 @@ def process_flags(args) -> CurrentRunSettings | int:
         print(f"🔍 Debug - is_no_docker: {is_no_docker}")
         # TODO(MFB): Print what this does (different f)
 
+    if is_verify_redis_after:
+        print("🔍 VERIFY: Will compare the processed redis state with the stored redis_after.json, without saving.")
+        is_save_updates = False
+        is_overwrite_bm_redis_before = False
+        is_overwrite_bm_redis_after = False
+        is_use_run_cache = False
+
     # Parse the alt source bookmark cli string for --use-preceding-bookmark if specified
     if is_use_alt_source_bookmark:
         alt_source_cli_nav_string = get_alt_source_cli_nav_string_from_args(args)
@@ -157,6 +190,9 @@ def process_flags(args) -> CurrentRunSettings | int:
         "is_overwrite_bm_redis_before": is_overwrite_bm_redis_before,
         "is_save_updates": is_save_updates,
         "is_show_image": is_show_image,
+        "is_stage_next_redis_state": is_stage_next_redis_state,
         "is_use_alt_source_bookmark": is_use_alt_source_bookmark,
+        "is_use_run_cache": is_use_run_cache,
+        "is_verify_redis_after": is_verify_redis_after,
         "tags": tags,
     })
@@ -0,0 +1,74 @@
+import contextlib
+import io
+import json
+import sys
+import time
+
+from app.bookmarks.bookmarks import get_all_live_bookmark_path_slash_rels
+from app.bookmarks.matching.bookmark_matching import find_bookmark_match_candidates
+from app.bookmarks.matching.matching_utils import build_bookmark_match_index
+from app.bookmarks.navigation.process_navigation import process_main_cli_arg_navigation
+from app.consts.bookmarks_consts import IS_DEBUG
+from app.types.bookmark_types import NAVIGATION_COMMANDS
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_resolve_batch(args) -> int:
+    """
+    Resolve many bookmark strings in one process: one query per line on stdin, one result line per query on stdout.
+    The library is scanned once and every query is matched against it, without prompting.
+    Each line is `<query>\t<stage>\t<candidate count>\t<bookmark path>` (the path only when there is exactly one
+    candidate, the stage "none" when nothing matched), or with --json one JSON object per query (NDJSON) with all
+    candidates.
+    Diagnostics printed while scanning and matching (e.g. a bookmark without its video) go to stderr, so stdout is only
+    the result lines.
+    Usage: bm --resolve-batch [--json] < queries.txt
+    """
+    is_json = "--json" in args
+    start_time = time.perf_counter()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        bookmark_match_index = build_bookmark_match_index(get_all_live_bookmark_path_slash_rels())
+
+    unresolved_count = 0
+    query_count = 0
+    for line in sys.stdin:
+        query = line.strip()
+        if not query or query.startswith("#"):
+            continue
+        query_count += 1
+
+        if query in NAVIGATION_COMMANDS:
+            # Relative to the last used bookmark, not a library lookup (and it reports as it goes)
+            with contextlib.redirect_stdout(io.StringIO()):
+                navigation_result = process_main_cli_arg_navigation(query)
+            match_stage = "navigation"
+            candidates = [] if not navigation_result or isinstance(navigation_result, int) else [
+                navigation_result["bookmark_path_slash_rel"]]
+        else:
+            with contextlib.redirect_stdout(sys.stderr):
+                match_stage, candidates = find_bookmark_match_candidates(query, bookmark_match_index)
+
+        candidates = [candidate.replace("/", ":") for candidate in candidates]
+        if not candidates:
+            unresolved_count += 1
+
+        if is_json:
+            print(json.dumps({
+                "query": query,
+                "stage": match_stage if candidates else None,
+                "candidate_count": len(candidates),
+                "bookmark_path_colon_rel": candidates[0] if len(candidates) == 1 else None,
+                "candidates": candidates,
+            }), flush=True)
+        else:
+            print(f"{query}\t{match_stage if candidates else 'none'}\t{len(candidates)}\t"
+                  f"{candidates[0] if len(candidates) == 1 else ''}", flush=True)
+
+    if IS_DEBUG:
+        print(f"🔍 Resolved {query_count} queries in {time.perf_counter() - start_time:.3f}s "
+              f"({unresolved_count} unresolved)", file=sys.stderr)
+    return 1 if unresolved_count else 0
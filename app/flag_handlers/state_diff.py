@@ -0,0 +1,69 @@
+import json
+import os
+
+from app.bookmarks.bookmark_finalizer import wait_for_bookmark_finalizer
+from app.bookmarks.redis_states.redis_state_diff import (
+    diff_redis_state_files,
+    print_redis_state_diff_tree,
+)
+from app.consts.bookmarks_consts import STATE_DIFF_IGNORED_KEY_PATTERNS
+from app.flag_handlers.bookmark_args import get_bookmark_obj_from_args_or_last_used
+from app.utils.decorators import print_def_name
+
+IS_PRINT_DEF_NAME = True
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_state_diff(args) -> int:
+    """
+    Show what the processor changed at a bookmark: the diff between its redis_before and redis_after.
+    Usage: bm [<bookmark_path>] --state-diff [--json] [--all-keys] [--ignore <pattern> ...]  (defaults to the last used bookmark)
+    """
+    args_copy = args.copy()
+    args_copy.remove('--state-diff')
+
+    is_json = '--json' in args_copy
+    if is_json:
+        args_copy.remove('--json')
+
+    ignored_key_patterns = list(STATE_DIFF_IGNORED_KEY_PATTERNS)
+    if '--all-keys' in args_copy:
+        args_copy.remove('--all-keys')
+        ignored_key_patterns = []
+
+    while '--ignore' in args_copy:
+        ignore_index = args_copy.index('--ignore')
+        args_copy.pop(ignore_index)
+        if ignore_index >= len(args_copy) or args_copy[ignore_index].startswith('-'):
+            print("❌ --ignore needs a key pattern, e.g. --ignore '*gateway_listener_test*'")
+            return 1
+        ignored_key_patterns.append(args_copy.pop(ignore_index))
+
+    bookmark_obj_match = get_bookmark_obj_from_args_or_last_used(
+        args_copy, "bm <bookmark_path> --state-diff [--json] [--all-keys] [--ignore <pattern> ...]")
+    if not bookmark_obj_match:
+        return 1
+
+    bookmark_path_abs = bookmark_obj_match["bookmark_path_slash_abs"]
+    if wait_for_bookmark_finalizer(bookmark_path_abs) != 0:
+        return 1
+    redis_before_path = os.path.join(bookmark_path_abs, "redis_before.json")
+    redis_after_path = os.path.join(bookmark_path_abs, "redis_after.json")
+    for redis_state_path in (redis_before_path, redis_after_path):
+        if not os.path.exists(redis_state_path):
+            print(f"❌ {bookmark_obj_match['bookmark_path_colon_rel']} has no {os.path.basename(redis_state_path)}")
+            return 1
+
+    try:
+        state_diff = diff_redis_state_files(redis_before_path, redis_after_path, ignored_key_patterns)
+    except Exception as e:
+        print(f"❌ Error diffing the redis states of {bookmark_obj_match['bookmark_path_colon_rel']}: {e}")
+        return 1
+
+    if is_json:
+        print(json.dumps(state_diff, indent=2))
+        return 0
+
+    print(f"🔍 redis_before → redis_after of {bookmark_obj_match['bookmark_path_colon_rel']}:")
+    print_redis_state_diff_tree(state_diff)
+    return 0
@@ -1,11 +1,18 @@
+import contextlib
+import json
+import sys
+
 from app.bookmarks.matching.bookmark_matching import find_best_bookmark_match_or_create
 from app.utils.decorators import print_def_name
-from app.utils.printing_utils import pprint
 
 IS_PRINT_DEF_NAME = True
 
 @print_def_name(IS_PRINT_DEF_NAME)
 def handle_which(args):
+    """
+    Show what a bookmark string resolves to. With --json, each match is printed as one JSON line (NDJSON), and nothing
+    else, so tools can parse the output (diagnostics printed while matching go to stderr).
+    """
     which_flag = '--which' if '--which' in args else '-w'
     args_copy = args.copy()
 
@@ -29,31 +36,36 @@ def handle_which(args):
         print("Usage: bm <bookmark_path> --which")
         return 1
 
-    bookmark_obj_matches = find_best_bookmark_match_or_create(
-        cli_bookmark_string, is_prompt_user_for_selection=False)
+    with contextlib.redirect_stdout(sys.stderr) if is_json else contextlib.nullcontext():
+        bookmark_obj_matches = find_best_bookmark_match_or_create(
+            cli_bookmark_string, is_prompt_user_for_selection=False)
 
     if not bookmark_obj_matches or isinstance(bookmark_obj_matches, int):
-        print(f"❌ No bookmarks matched for '{cli_bookmark_string}'")
+        print(f"❌ No bookmarks matched for '{cli_bookmark_string}'", file=sys.stderr if is_json else sys.stdout)
         return 1
 
     if isinstance(bookmark_obj_matches, list):
         if len(bookmark_obj_matches) == 1:
             bookmark_obj_match = bookmark_obj_matches[0]
-            print(f"✅ Match found for: '{cli_bookmark_string}':")
             if is_json:
-                pprint(bookmark_obj_match)
+                print(json.dumps(bookmark_obj_match, default=str), flush=True)
             else:
+                print(f"✅ Match found for: '{cli_bookmark_string}':")
                 print(f"  • {bookmark_obj_match['bookmark_path_colon_rel']}")
             return bookmark_obj_match
 
-        print(f"⚠️  Multiple bookmarks matched for '{cli_bookmark_string}':")
+        if not is_json:
+            print(f"⚠️  Multiple bookmarks matched for '{cli_bookmark_string}':")
         for bookmark_obj_match in bookmark_obj_matches:
-            print(f"  • {bookmark_obj_match['bookmark_path_colon_rel']}")
+            if is_json:
+                print(json.dumps(bookmark_obj_match, default=str), flush=True)
+            else:
+                print(f"  • {bookmark_obj_match['bookmark_path_colon_rel']}")
         return 1
 
-    print(f"✅ Match found for: '{cli_bookmark_string}':")
     if is_json:
-        pprint(bookmark_obj_matches)
+        print(json.dumps(bookmark_obj_matches, default=str), flush=True)
     else:
+        print(f"✅ Match found for: '{cli_bookmark_string}':")
         print(f"  • {bookmark_obj_matches['bookmark_path_colon_rel']}")
     return 1
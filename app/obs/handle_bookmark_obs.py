@@ -1,4 +1,5 @@
 import os
+import threading
 
 from app.obs.obs_utils import (
     load_bookmark_into_obs,
@@ -12,11 +13,14 @@ from app.utils.printing_utils import print_color
 def handle_bookmark_obs_pre_run(
     matched_bookmark_obj: MatchedBookmarkObj,
     current_run_settings_obj: CurrentRunSettings,
+    cancel_event: threading.Event | None = None,
 ) -> int:
     """
     This function is used to handle the pre-run of a bookmark.
 
     If the bookmark meta does not have all of the video meta information, or the --save-obs flag is set, we will update the metadata. If not, we will pull the metadata and load the state into OBS.
+    When run next to the Redis pre-run, `cancel_event` is set if that fails: we stop before writing the screenshot or
+    the bookmark meta.
     """
 
     if current_run_settings_obj["is_no_obs"]:
@@ -36,5 +40,11 @@ def handle_bookmark_obs_pre_run(
         return load_bookmark_into_obs(matched_bookmark_obj)
 
     # The bookmark that we are using does not have the media info, so we need to save it to the bookmark meta.
+    if cancel_event and cancel_event.is_set():
+        print("🛑 OBS pre-run cancelled, not saving the screenshot and media info")
+        return 1
     save_obs_screenshot_to_bookmark_path(matched_bookmark_obj, current_run_settings_obj)
+    if cancel_event and cancel_event.is_set():
+        print("🛑 OBS pre-run cancelled, not saving the media info")
+        return 1
     return save_obs_media_info_to_bookmark_meta(matched_bookmark_obj, current_run_settings_obj)
@@ -5,6 +5,7 @@ import time
 
 import obsws_python as obs
 from PIL import Image
+from websocket import WebSocketConnectionClosedException
 
 from app.bookmarks.bookmarks_meta import (
     patch_bookmark_meta,
@@ -13,14 +14,38 @@ from app.bookmarks.bookmarks_meta import (
 from app.consts.bookmarks_consts import IS_DEBUG, SCREENSHOT_SAVE_SCALE
 from app.obs.videos import construct_full_video_file_path
 from app.types.bookmark_types import CurrentRunSettings, MatchedBookmarkObj
-from app.utils.decorators import print_def_name
+from app.utils.decorators import memoize, print_def_name
 from app.utils.printing_utils import print_color
 
 IS_PRINT_DEF_NAME = True
 
-def pause_obs(cl: obs.ReqClient, source_name: str = "Media Source"):
+# What a cached client whose connection died raises on its next request
+OBS_CONNECTION_ERRORS = (ConnectionError, WebSocketConnectionClosedException)
+
+
+@memoize
+def get_obs_client() -> obs.ReqClient:
+    """
+    Get a (cached) OBS websocket client, so that a run (or a --batch of runs) connects to OBS once.
+    """
+    return obs.ReqClient(host="localhost", port=4455, password="", timeout=3)
+
+
+def send_obs_request(request_type: str, request_data: dict | None = None):
+    """
+    Send a request on the cached OBS client. If its connection was lost (e.g. OBS restarted during a --batch), connect
+    once more - replacing the cached client - and retry.
+    """
+    try:
+        return get_obs_client().send(request_type, request_data)
+    except OBS_CONNECTION_ERRORS as e:
+        print(f"⚠️  Lost the OBS connection ({type(e).__name__}), reconnecting")
+        return get_obs_client(_is_override_run_once=True).send(request_type, request_data)
+
+
+def pause_obs(source_name: str = "Media Source"):
     """Pause the media source"""
-    cl.send("TriggerMediaInputAction", {
+    send_obs_request("TriggerMediaInputAction", {
         "inputName": source_name,
         "mediaAction": "OBS_WEBSOCKET_MEDIA_INPUT_ACTION_PAUSE"
     })
@@ -39,12 +64,10 @@ def open_video_in_obs(video_path: str, source_name: str = "Media Source"):
         # Convert to absolute path
         video_path = os.path.abspath(video_path)
 
-        cl = obs.ReqClient(host="localhost", port=4455, password="", timeout=3)
-
-        pause_obs(cl)
+        pause_obs()
 
         # Set the media source to the video file
-        cl.send("SetInputSettings", {
+        send_obs_request("SetInputSettings", {
             "inputName": source_name,
             "inputSettings": {
                 "local_file": video_path
@@ -52,7 +75,7 @@ def open_video_in_obs(video_path: str, source_name: str = "Media Source"):
         })
 
         # Pause the media
-        pause_obs(cl)
+        pause_obs()
 
         print(f"✅ Opened video in OBS: {video_path}")
         print(f"📺 Source: {source_name}")
@@ -68,10 +91,8 @@ def open_video_in_obs(video_path: str, source_name: str = "Media Source"):
 def get_media_source_info():
     """Get media source information from OBS."""
     try:
-        cl = obs.ReqClient(host="localhost", port=4455, password="", timeout=3)
-
         # Get current media source settings
-        settings = cl.send("GetInputSettings", {"inputName": "Media Source"})
+        settings = send_obs_request("GetInputSettings", {"inputName": "Media Source"})
         file_path = settings.input_settings.get(  # type: ignore
             "local_file", "")
 
@@ -83,7 +104,7 @@ def get_media_source_info():
         if file_path and os.path.exists(file_path):
             try:
                 # Get media status which includes cursor position
-                media_status = cl.send("GetMediaInputStatus", {"inputName": "Media Source"})
+                media_status = send_obs_request("GetMediaInputStatus", {"inputName": "Media Source"})
 
                 # Get cursor position from media_status
                 if hasattr(media_status, 'media_cursor'):
@@ -158,8 +179,6 @@ def load_bookmark_into_obs(matched_bookmark_obj: MatchedBookmarkObj) -> int:
                 f"❌ No file path found in {bookmark_path_slash_rel} metadata")
             return 1
 
-        cl = obs.ReqClient(host="localhost", port=4455, password="", timeout=3)
-
         # Load the media file if different
         # current_settings = cl.send(
             # "GetInputSettings", {"inputName": "Media Source"})
@@ -181,7 +200,7 @@ def load_bookmark_into_obs(matched_bookmark_obj: MatchedBookmarkObj) -> int:
         # if current_file != video_file_path:
         if True:
             print(f"\U0001F4C1 Loading video file: {video_file_path}")
-            cl.send("SetInputSettings", {
+            send_obs_request("SetInputSettings", {
                 "inputName": "Media Source",
                 "inputSettings": {
                     "local_file": video_file_path
@@ -202,7 +221,7 @@ def load_bookmark_into_obs(matched_bookmark_obj: MatchedBookmarkObj) -> int:
         media_state = None
         while waited < max_wait:
             try:
-                status = cl.send("GetMediaInputStatus", {"inputName": "Media Source"})
+                status = send_obs_request("GetMediaInputStatus", {"inputName": "Media Source"})
                 media_state = getattr(status, 'media_state', None)
                 if IS_DEBUG:
                     print(f"\U0001F50D Media state: {media_state}")
@@ -241,16 +260,16 @@ def load_bookmark_into_obs(matched_bookmark_obj: MatchedBookmarkObj) -> int:
         time.sleep(1)
 
         # Pause the media
-        pause_obs(cl)
+        pause_obs()
 
         # Set the timestamp
-        cl.send("SetMediaInputCursor", {
+        send_obs_request("SetMediaInputCursor", {
             "inputName": "Media Source",
             "mediaCursor": media_cursor
         })
 
         # Pause the media
-        pause_obs(cl)
+        pause_obs()
 
         print(
             f"✅ Loaded OBS to timestamp from bookmark: {bookmark_info['timestamp_formatted']}")
@@ -280,10 +299,7 @@ def save_obs_screenshot_to_bookmark_path(
             f"📸 Using existing screenshot: {matched_bookmark_path_rel}/screenshot.jpg")
     else:
         try:
-            cl = obs.ReqClient(
-                host="localhost", port=4455, password="", timeout=3)
-
-            response = cl.send("GetSourceScreenshot", {
+            response = send_obs_request("GetSourceScreenshot", {
                 "sourceName": "Media Source",
                 "imageFormat": "png"
             })
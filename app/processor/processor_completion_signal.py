@@ -0,0 +1,125 @@
+import time
+import uuid
+from typing import Any, TypedDict
+
+import redis
+
+from app.consts.bookmarks_consts import (
+    PROCESSOR_COMPLETION_SIGNAL,
+    PROCESSOR_DONE_CHANNEL,
+    PROCESSOR_DONE_KEY_PREFIX,
+    PROCESSOR_DONE_STREAM,
+    PROCESSOR_SIGNAL_DB,
+)
+
+PROCESSOR_COMPLETION_POLL_INTERVAL = 0.02
+
+
+class ProcessorCompletionWait(TypedDict):
+    signal: str
+    run_id: str
+    r: redis.Redis
+    pubsub: Any
+    stream_last_id: bytes | str
+
+
+def new_processor_run_id() -> str:
+    return uuid.uuid4().hex
+
+
+def get_processor_signal_env(run_id: str, signal: str = PROCESSOR_COMPLETION_SIGNAL) -> dict[str, str]:
+    """
+    What the processor needs to signal us: passed as environment variables (e.g. `docker exec -e`).
+    """
+    return {
+        "GG_RUN_ID": run_id,
+        "GG_SIGNAL_DB": str(PROCESSOR_SIGNAL_DB),
+        "GG_COMPLETION_SIGNAL": signal,
+    }
+
+
+def get_processor_signal_docker_exec_options(run_id: str, signal: str = PROCESSOR_COMPLETION_SIGNAL) -> str:
+    return " ".join(f"-e {name}={value}" for name, value in get_processor_signal_env(run_id, signal).items())
+
+
+def start_processor_completion_wait(
+    r: redis.Redis,
+    run_id: str,
+    signal: str = PROCESSOR_COMPLETION_SIGNAL,
+) -> ProcessorCompletionWait:
+    """
+    Get ready for the processor's completion signal. Must be called *before* triggering the processor, so that a fast
+    processor cannot signal before we listen (we subscribe / note the stream position / clear a stale key here).
+    `r` is a client for PROCESSOR_SIGNAL_DB on the Redis that the processor signals.
+    """
+    completion_wait: ProcessorCompletionWait = {
+        "signal": signal,
+        "run_id": run_id,
+        "r": r,
+        "pubsub": None,
+        "stream_last_id": "0-0",
+    }
+
+    if signal == "key":
+        r.delete(f"{PROCESSOR_DONE_KEY_PREFIX}{run_id}")
+    elif signal == "pubsub":
+        completion_wait["pubsub"] = r.pubsub(ignore_subscribe_messages=True)
+        completion_wait["pubsub"].subscribe(PROCESSOR_DONE_CHANNEL)
+    elif signal == "stream":
+        last_entries = r.xrevrange(PROCESSOR_DONE_STREAM, count=1)
+        if last_entries:
+            completion_wait["stream_last_id"] = last_entries[0][0]
+
+    return completion_wait
+
+
+def wait_for_processor_completion(completion_wait: ProcessorCompletionWait, timeout: float) -> float | None:
+    """
+    Block until the processor signals that this run's async work has drained.
+    Returns: the seconds waited, or None if it timed out.
+    """
+    r = completion_wait["r"]
+    run_id = completion_wait["run_id"]
+    start_time = time.perf_counter()
+    deadline = start_time + timeout
+
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+
+            if completion_wait["signal"] == "key":
+                done_key = f"{PROCESSOR_DONE_KEY_PREFIX}{run_id}"
+                if r.exists(done_key):
+                    r.delete(done_key)
+                    return time.perf_counter() - start_time
+                time.sleep(min(PROCESSOR_COMPLETION_POLL_INTERVAL, remaining))
+
+            elif completion_wait["signal"] == "pubsub":
+                message = completion_wait["pubsub"].get_message(timeout=remaining)
+                if message and message["type"] == "message" and message["data"] in (run_id, run_id.encode()):
+                    return time.perf_counter() - start_time
+
+            elif completion_wait["signal"] == "stream":
+                stream_entries = r.xread(
+                    {PROCESSOR_DONE_STREAM: completion_wait["stream_last_id"]},
+                    block=max(1, int(remaining * 1000)),
+                )
+                for _, entries in stream_entries or []:
+                    for entry_id, fields in entries:
+                        completion_wait["stream_last_id"] = entry_id
+                        if fields.get(b"run_id", fields.get("run_id")) in (run_id, run_id.encode()):
+                            return time.perf_counter() - start_time
+
+            else:
+                raise ValueError(f"Unknown processor completion signal '{completion_wait['signal']}'")
+    finally:
+        close_processor_completion_wait(completion_wait)
+
+
+def close_processor_completion_wait(completion_wait: ProcessorCompletionWait) -> None:
+    if completion_wait["pubsub"] is not None:
+        completion_wait["pubsub"].close()
+        completion_wait["pubsub"] = None
+
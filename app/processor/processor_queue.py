@@ -0,0 +1,105 @@
+import json
+import time
+from typing import Any, TypedDict
+
+import redis
+
+from app.consts.bookmarks_consts import (
+    PROCESSOR_COMPLETION_SIGNAL,
+    PROCESSOR_REDIS_HOST,
+    PROCESSOR_REQUEST_QUEUE,
+    PROCESSOR_RESULT_KEY_PREFIX,
+    PROCESSOR_SIGNAL_DB,
+    PROCESSOR_WORKER_HEARTBEAT_KEY_PREFIX,
+)
+
+LOOPBACK_REDIS_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+
+class ProcessorRunRequest(TypedDict):
+    run_id: str
+    gg_user_id: str
+    bookmark_id: str | None  # the bookmark's colon path, for the worker's logs
+    redis_host: str | None  # the Redis to run against, as the worker reaches it (None: the worker's own)
+    redis_port: int | None
+    redis_db: int | None
+    signal: str  # PROCESSOR_COMPLETION_SIGNAL, to signal on when the async work has drained
+    signal_db: int
+    reply_to: str  # the list to LPUSH the ProcessorRunResult onto
+    expires_at: float  # unix time after which the worker should drop the request (we stopped waiting)
+    options: dict[str, Any]
+
+
+class ProcessorRunResult(TypedDict):
+    run_id: str
+    returncode: int
+    error: str | None
+    run_seconds: float | None
+
+
+def count_processor_workers(r: redis.Redis) -> int:
+    """
+    The number of live processor workers (each keeps its own heartbeat key), i.e. how many queued runs go at once.
+    `r` is a client for PROCESSOR_SIGNAL_DB on the Redis that the workers listen on.
+    """
+    return sum(1 for _ in r.scan_iter(match=f"{PROCESSOR_WORKER_HEARTBEAT_KEY_PREFIX}*", count=100))
+
+
+def is_processor_worker_alive(r: redis.Redis) -> bool:
+    return count_processor_workers(r) > 0
+
+
+def get_processor_redis_host(redis_host: str) -> str:
+    """
+    The host the processor, inside its container, reaches the Redis that we reach on `redis_host` at: a loopback host is
+    the processor's own container there, so it becomes PROCESSOR_REDIS_HOST.
+    """
+    return PROCESSOR_REDIS_HOST if PROCESSOR_REDIS_HOST and redis_host in LOOPBACK_REDIS_HOSTS else redis_host
+
+
+def new_processor_run_request(
+    run_id: str,
+    timeout: float,
+    gg_user_id: str = "DEV_GG_USER_ID",
+    bookmark_id: str | None = None,
+    redis_host: str | None = None,
+    redis_port: int | None = None,
+    redis_db: int | None = None,
+    signal: str = PROCESSOR_COMPLETION_SIGNAL,
+    options: dict[str, Any] | None = None,
+) -> ProcessorRunRequest:
+    return {
+        "run_id": run_id,
+        "gg_user_id": gg_user_id,
+        "bookmark_id": bookmark_id,
+        "redis_host": redis_host,
+        "redis_port": redis_port,
+        "redis_db": redis_db,
+        "signal": signal,
+        "signal_db": PROCESSOR_SIGNAL_DB,
+        "reply_to": f"{PROCESSOR_RESULT_KEY_PREFIX}{run_id}",
+        "expires_at": time.time() + timeout,
+        "options": options or {},
+    }
+
+
+def run_processor_via_queue(
+    r: redis.Redis,
+    run_request: ProcessorRunRequest,
+    timeout: float,
+) -> ProcessorRunResult | None:
+    """
+    Hand one run to the long-running processor worker and block until it replies.
+    Returns: the worker's result, or None if there was no reply within `timeout`.
+    """
+    r.delete(run_request["reply_to"])
+    r.lpush(PROCESSOR_REQUEST_QUEUE, json.dumps(run_request))
+
+    reply = r.blpop([run_request["reply_to"]], timeout=max(1, int(timeout)))
+    if reply is None:
+        # Don't leave the request for a worker that shows up later.
+        r.lrem(PROCESSOR_REQUEST_QUEUE, 1, json.dumps(run_request))
+        return None
+
+    r.delete(run_request["reply_to"])
+    return json.loads(reply[1])
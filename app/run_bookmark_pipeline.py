@@ -0,0 +1,54 @@
+from app.bookmarks.matching.handle_matched_bookmark_post_processing import (
+    handle_matched_bookmark_post_processing,
+)
+from app.bookmarks.matching.handle_matched_bookmark_pre_processing import (
+    handle_matched_bookmark_pre_processing,
+)
+from app.run_main_process import handle_main_process
+from app.types.bookmark_types import CurrentRunSettings, MatchedBookmarkObj
+from app.utils.decorators import print_def_name
+from app.utils.printing_utils import print_color
+
+IS_PRINT_DEF_NAME = True
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def run_bookmark_pipeline(
+    matched_bookmark_obj: MatchedBookmarkObj,
+    current_run_settings_obj: CurrentRunSettings,
+) -> int:
+    """
+    Run one matched bookmark through the whole cycle: pre-processing (redis/OBS) -> main process -> post-processing.
+    Shared by the single bookmark run (main.py) and --batch.
+    Returns: 0 if successful, otherwise the failing step's result.
+    """
+    current_run_settings_obj["current_bookmark_obj"] = matched_bookmark_obj
+
+    # HANDLE MATCHED BOOKMARK PRE-PROCESSING
+
+    results = handle_matched_bookmark_pre_processing(
+        matched_bookmark_obj, current_run_settings_obj
+    )
+    if results != 0:
+        print_color("❌ Error in handle_matched_bookmark_pre_processing", "red")
+        return results
+
+    # MAIN PROCESS
+
+    results = handle_main_process(current_run_settings=current_run_settings_obj)
+    if results == 1:
+        print_color("❌ Main process failed", "red")
+        return results
+
+    # HANDLE BOOKMARK POST-PROCESSING
+
+    results = handle_matched_bookmark_post_processing(
+        matched_bookmark_obj, current_run_settings_obj
+    )
+    if results == 1:
+        # A --verify mismatch is already reported as VERIFY FAILED, with its diff
+        if not current_run_settings_obj["is_verify_redis_after"]:
+            print_color("❌ Error in handle_matched_bookmark_post_processing", "red")
+        return results
+
+    return 0
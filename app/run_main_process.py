@@ -1,12 +1,69 @@
 import subprocess
 import time
 
-from app.consts.bookmarks_consts import ASYNC_WAIT_TIME, IS_DEBUG
+from app.bookmarks.redis_states.redis_state_utils import get_redis_client
+from app.bookmarks.redis_states.run_result_cache import (
+    get_run_cache_key,
+    handle_restore_run_cache_entry,
+    handle_save_run_cache_entry,
+)
+from app.consts.bookmarks_consts import (
+    ASYNC_WAIT_TIME,
+    IS_DEBUG,
+    IS_REDIS_DIRECTLY_REACHABLE,
+    PROCESSOR_COMMAND_TIMEOUT,
+    PROCESSOR_COMPLETION_SIGNAL,
+    PROCESSOR_COMPLETION_TIMEOUT,
+    PROCESSOR_SIGNAL_DB,
+    PROCESSOR_TRIGGER,
+)
+from app.processor.processor_completion_signal import (
+    close_processor_completion_wait,
+    get_processor_signal_docker_exec_options,
+    new_processor_run_id,
+    start_processor_completion_wait,
+    wait_for_processor_completion,
+)
+from app.processor.processor_queue import (
+    is_processor_worker_alive,
+    new_processor_run_request,
+    run_processor_via_queue,
+)
 from app.utils.decorators import print_def_name
 
 IS_PRINT_DEF_NAME = True
 
 
+def run_main_process_via_queue(run_id: str, signal: str, current_run_settings) -> int | None:
+    """
+    Trigger the run on the long-running processor worker (PROCESSOR_TRIGGER="queue") instead of `docker exec`.
+    Returns: the worker's return code, or None if there is no live worker (the caller falls back to `docker exec`).
+    """
+    if not IS_REDIS_DIRECTLY_REACHABLE:
+        print("⚠️  PROCESSOR_TRIGGER=queue needs direct Redis access, using docker exec")
+        return None
+
+    r = get_redis_client(PROCESSOR_SIGNAL_DB)
+    if not is_processor_worker_alive(r):
+        print("⚠️  No processor worker heartbeat, using docker exec")
+        return None
+
+    current_bookmark_obj = current_run_settings.get("current_bookmark_obj") if current_run_settings else None
+    run_request = new_processor_run_request(
+        run_id,
+        PROCESSOR_COMMAND_TIMEOUT,
+        bookmark_id=current_bookmark_obj["bookmark_path_colon_rel"] if current_bookmark_obj else None,
+        signal=signal,
+    )
+    run_result = run_processor_via_queue(r, run_request, PROCESSOR_COMMAND_TIMEOUT)
+    if run_result is None:
+        print(f"❌ No reply from the processor worker after {PROCESSOR_COMMAND_TIMEOUT}s (run {run_id})")
+        return 1
+    if run_result["error"]:
+        print(f"❌ Processor worker: {run_result['error']}")
+    return run_result["returncode"]
+
+
 @print_def_name(IS_PRINT_DEF_NAME)
 def handle_main_process(current_run_settings=None) -> int: # TODO(?): Why would there be no current_run_settings?
     """
@@ -33,21 +90,75 @@ def handle_main_process(current_run_settings=None) -> int: # TODO(?): Why would
         print("💧 Skipping main process (dry mode)")
         return 0
 
+    # Run-result cache: the same before-state on the same processor build gives the same after-state.
+    run_cache_key = None
+    if current_run_settings and current_run_settings.get("is_use_run_cache"):
+        run_cache_key = get_run_cache_key(current_run_settings)
+        if run_cache_key and handle_restore_run_cache_entry(run_cache_key) == 0:
+            print("♻️  Run cache hit: restored the cached redis_after, skipping the main process")
+            return 0
+
+    result = handle_run_processor(current_run_settings)
+    if result == 0 and run_cache_key:
+        handle_save_run_cache_entry(run_cache_key, current_run_settings)
+    return result
+
+
+@print_def_name(IS_PRINT_DEF_NAME)
+def handle_run_processor(current_run_settings=None) -> int:
+    """
+    Run the processor once (queue or `docker exec`), and wait for its async work to drain.
+    """
     print('')
     print("🚀 Running main process...")
 
+    # Completion signal: listen before triggering, so that a fast processor cannot signal before we are ready.
+    run_id = new_processor_run_id()
+    completion_wait = None
+    if PROCESSOR_COMPLETION_SIGNAL != "none":
+        if IS_REDIS_DIRECTLY_REACHABLE:
+            try:
+                completion_wait = start_processor_completion_wait(get_redis_client(PROCESSOR_SIGNAL_DB), run_id)
+            except Exception as e:
+                print(f"⚠️  Could not listen for the processor's completion signal, sleeping instead: {e}")
+        else:
+            print("⚠️  PROCESSOR_COMPLETION_SIGNAL needs direct Redis access, sleeping instead")
+
     try:
-        cmd = 'docker exec -it game_processor_backend python ./main.py --run-once --gg_user_id="DEV_GG_USER_ID"'
-        result = subprocess.run(cmd, shell=True, check=False)
-        if result.returncode != 0:
+        start_time = time.perf_counter()
+        returncode = None
+        if PROCESSOR_TRIGGER == "queue":
+            returncode = run_main_process_via_queue(
+                run_id, completion_wait["signal"] if completion_wait else "none", current_run_settings)
+        if returncode is None:
+            if completion_wait:
+                signal_options = get_processor_signal_docker_exec_options(run_id)
+                cmd = f'docker exec -it {signal_options} game_processor_backend python ./main.py --run-once --gg_user_id="DEV_GG_USER_ID"'
+            else:
+                cmd = 'docker exec -it game_processor_backend python ./main.py --run-once --gg_user_id="DEV_GG_USER_ID"'
+            returncode = subprocess.run(cmd, shell=True, check=False).returncode
+        run_seconds = time.perf_counter() - start_time
+        if returncode != 0:
             print("❌ Main process failed")
             return 1
 
-        if IS_DEBUG:
-            print("⏳ Waiting for async processes to complete...")
-        time.sleep(ASYNC_WAIT_TIME)
+        if not completion_wait:
+            if IS_DEBUG:
+                print("⏳ Waiting for async processes to complete...")
+            time.sleep(ASYNC_WAIT_TIME)
+            return 0
+
+        print(f"⏳ Waiting for the processor's completion signal ({PROCESSOR_COMPLETION_SIGNAL})...")
+        wait_seconds = wait_for_processor_completion(completion_wait, PROCESSOR_COMPLETION_TIMEOUT)
+        if wait_seconds is None:
+            print(f"❌ No completion signal from the processor after {PROCESSOR_COMPLETION_TIMEOUT}s (run {completion_wait['run_id']})")
+            return 1
+        print(f"✅ Processor finished: run {run_seconds:.2f}s + async work {wait_seconds:.2f}s")
 
         return 0
     except Exception as e:
         print(f"❌ Error running main process: {e}")
         return 1
+    finally:
+        if completion_wait:
+            close_processor_completion_wait(completion_wait)
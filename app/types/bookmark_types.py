@@ -50,14 +50,49 @@ class CurrentRunSettings(TypedDict):
     is_save_obs: bool
     is_save_updates: bool
     is_show_image: bool
+    is_stage_next_redis_state: bool
     is_use_alt_source_bookmark: bool
+    is_use_run_cache: bool
+    is_verify_redis_after: bool
     tags: list[str] | None
 
 
+class TreePrintOptions(TypedDict):
+    depth: int | None  # folder levels shown below the top of the printout, deeper folders are collapsed (None: all)
+    under_path_colon_rel: str | None  # only print this folder's subtree
+    is_near: bool  # only print the current bookmark's folder and its sibling folders
+    is_no_tree: bool  # don't print the tree at all (--no-tree, or machine-readable --json output)
+
+
+class FolderNavigationIndex(TypedDict):
+    sibling_paths: list[str]  # the folder's bookmarks (absolute paths), in natural order
+    positions: dict[str, int]  # bookmark path -> its index in sibling_paths
+
+
+class BookmarkMatchIndex(TypedDict):
+    live_bm_path_slash_rels: set[str]
+    live_bm_path_parts: list[tuple[str, list[str]]]  # (bookmark path, its parts), in library order
+    live_bm_paths_by_trailing_parts: dict[tuple[str, ...], list[str]]  # each run of trailing parts -> the paths ending in it
+
+
+class BookmarkListEntry(TypedDict):
+    bookmark_path_colon_rel: str
+    tags: list[str]
+    inherited_tags: list[str]  # the tags of the folders it is in
+    description: str
+    timestamp: float | None
+    timestamp_formatted: str | None
+    video_filename: str | None
+    has_redis_before: bool
+    has_redis_after: bool
+    has_screenshot: bool
+
+
 # CLI FLAGS #
 
 ValidRoutedFlags = Literal[
-    "--help", "-h", "--ls", "-ls", "--which", "-w", "--open-video", "-v"
+    "--help", "-h", "--ls", "-ls", "--which", "-w", "--open-video", "-v", "--compress-states",
+    "--friendly", "--state-diff", "--batch", "--parallel", "--clear-cache", "--resolve-batch",
 ]
 
 VALID_FLAGS = [
@@ -101,6 +136,19 @@ VALID_FLAGS = [
     "-t",
     # Show the image of the bookmark
     "--show-image",
+    # Pre-stage the next bookmark's redis state into a spare Redis DB
+    "--stage-next",
+    "-sn",
+    # Compare the processed redis state with the stored redis_after.json instead of saving it
+    "--verify",
+    # Reuse (or skip) a cached run result for the same before-state and processor version
+    "--use-cache",
+    "--no-cache",
+    # Scope the bookmark tree printout
+    "--depth",
+    "--under",
+    "--near",
+    "--no-tree",
 ]
 
 default_processed_flags: CurrentRunSettings = {
@@ -118,7 +166,10 @@ default_processed_flags: CurrentRunSettings = {
     "is_save_obs": False,
     "is_save_updates": False,
     "is_show_image": False,
+    "is_stage_next_redis_state": False,
     "is_use_alt_source_bookmark": False,
+    "is_use_run_cache": False,
+    "is_verify_redis_after": False,
     "tags": None,
 }
 
@@ -134,3 +185,8 @@ NAVIGATION_COMMANDS = [
 NavigationCommand = Literal[
     "next", "previous", "first", "last", "last_used", "current", "again"
 ]
+
+# The matching stage that found a bookmark string's candidates (see find_bookmark_match_candidates)
+BookmarkMatchStage = Literal[
+    "navigation", "exact", "exact_trailing", "substring", "substring_trailing", "tokens", "tokens_partial"
+]
@@ -126,20 +126,19 @@ def memoize(func):
     """
     Decorator to cache function results in memory for the duration of the process,
     keyed by the function's arguments and keyword arguments.
-    Allows bypassing cache with `_is_override_run_once=True`.
+    Allows bypassing cache with `_is_override_run_once=True` (the fresh result then replaces the cached one).
     """
     cache = {}
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        if kwargs.pop("_is_override_run_once", False):
-            return func(*args, **kwargs)
+        is_override_run_once = kwargs.pop("_is_override_run_once", False)
 
         hashable_args = make_hashable(args)
         hashable_kwargs = make_hashable(kwargs)
         key = (hashable_args, hashable_kwargs)
 
-        if key in cache:
+        if key in cache and not is_override_run_once:
             return cache[key]
 
         result = func(*args, **kwargs)
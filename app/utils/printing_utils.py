@@ -22,9 +22,9 @@ ColorTypes = Literal['black', 'red', 'green',
                      'yellow', 'blue', 'magenta', 'cyan', 'white']
 
 
-def print_color(text: str, color: ColorTypes | None = None):
+def get_color_text(text: str, color: ColorTypes | None = None) -> str:
     if not color:
-        return print(text)
+        return text
 
     color_codes = {
         'black': 30,
@@ -37,7 +37,11 @@ def print_color(text: str, color: ColorTypes | None = None):
         'white': 37
     }
 
-    print(f"\033[{color_codes[color]}m{text}\033[0m")
+    return f"\033[{color_codes[color]}m{text}\033[0m"
+
+
+def print_color(text: str, color: ColorTypes | None = None):
+    print(get_color_text(text, color))
 
 def print_dev(
     text: str,
@@ -0,0 +1,15 @@
+import re
+
+NATURAL_SORT_SPLIT_PATTERN = re.compile(r"(\d+)")
+
+
+def natural_sort_key(name: str) -> tuple[list, str]:
+    """
+    Digit runs compare as numbers, so `9` comes before `10` (and `m2` before `m10`).
+    re.split puts the digit runs at the odd indexes, so only those are turned into numbers (str.isdigit would also
+    accept e.g. `²`, which int() rejects). The name itself breaks ties, e.g. between `01` and `1`.
+    """
+    return [
+        int(part) if index % 2 else part
+        for index, part in enumerate(NATURAL_SORT_SPLIT_PATTERN.split(name))
+    ], name
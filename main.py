@@ -3,14 +3,9 @@ import traceback
 
 from app.bookmarks.bookmarks_print import print_all_live_directories_and_bookmarks
 from app.bookmarks.matching.bookmark_matching import find_best_bookmark_match_or_create
-from app.bookmarks.matching.handle_matched_bookmark_post_processing import (
-    handle_matched_bookmark_post_processing,
-)
-from app.bookmarks.matching.handle_matched_bookmark_pre_processing import (
-    handle_matched_bookmark_pre_processing,
-)
+from app.bookmarks.tree_print_options import get_tree_print_options_from_args
 from app.flag_handlers.process_flags import process_flags
-from app.run_main_process import handle_main_process
+from app.run_bookmark_pipeline import run_bookmark_pipeline
 from app.types.bookmark_types import CurrentRunSettings
 from app.utils.printing_utils import print_color
 
@@ -53,31 +48,10 @@ def main() -> tuple[int, CurrentRunSettings | None]:
     else:
         matched_bookmark_obj = find_best_results
 
-    current_run_settings_obj["current_bookmark_obj"] = matched_bookmark_obj
+    # PRE-PROCESSING -> MAIN PROCESS -> POST-PROCESSING
 
-    # HANDLE MATCHED BOOKMARK PRE-PROCESSING
-
-    results = handle_matched_bookmark_pre_processing(
-        matched_bookmark_obj, current_run_settings_obj
-    )
+    results = run_bookmark_pipeline(matched_bookmark_obj, current_run_settings_obj)
     if results != 0:
-        print_color("❌ Error in handle_matched_bookmark_pre_processing", "red")
-        return results, current_run_settings_obj
-
-    # MAIN PROCESS
-
-    results = handle_main_process(current_run_settings=current_run_settings_obj)
-    if results == 1:
-        print_color("❌ Main process failed", "red")
-        return results, current_run_settings_obj
-
-    # HANDLE BOOKMARK POST-PROCESSING
-
-    results = handle_matched_bookmark_post_processing(
-        matched_bookmark_obj, current_run_settings_obj
-    )
-    if results == 1:
-        print_color("❌ Error in handle_matched_bookmark_post_processing", "red")
         return results, current_run_settings_obj
 
     # SUCCESS!
@@ -112,6 +86,7 @@ if __name__ == "__main__":
         print_all_live_directories_and_bookmarks(
             is_print_just_current_directory_bookmarks=is_print_just_current_directory_bookmarks,
             current_run_settings_obj=current_run_settings_obj,
+            tree_print_options=get_tree_print_options_from_args(sys.argv[1:]),
         )
 
     sys.exit(exit_code if isinstance(exit_code, (int, type(None))) else 1)  # type: ignore
@@ -0,0 +1,190 @@
+"""
+Stand-in for the game processor's `--run-once`, for exercising the bookmark runners (e.g. `bm --parallel ... --stub-processor`)
+without Docker. It makes a small, deterministic change to the given Redis DB, so the same before-state always gives the
+same after-state.
+
+It also speaks the completion signal protocol (PROCESSOR_COMPLETION_SIGNAL): with --async-delay, the change is made by a
+detached child process after the delay (like the processor's async work draining after `--run-once` returns), which then
+signals the run as done.
+
+With --serve, it is instead long-running processor workers for PROCESSOR_TRIGGER="queue": --consumers of them (one per
+run that should go at once), each keeping its own heartbeat alive, taking run requests off gg:processor:requests (in the
+signal DB), and replying on each request's reply_to list. It stops on Ctrl+C, or after --max-runs runs.
+It runs outside the processor's container, so it runs against the request's Redis port and DB on its own --host.
+
+Usage: python stub_game_processor.py [--host localhost] [--port 6379] [--db 0] [--socket /path/to/redis.sock]
+                                     [--run-id <id>] [--signal none|key|pubsub|stream] [--signal-db 15] [--async-delay 0]
+                                     [--serve [--consumers 1] [--max-runs N]]
+The run id, signal, and signal DB default to the GG_RUN_ID, GG_COMPLETION_SIGNAL, and GG_SIGNAL_DB environment variables.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import redis
+
+STUB_KEY_PREFIX = "stub_processor"
+PROCESSOR_DONE_KEY_PREFIX = "gg:processor:done:"
+PROCESSOR_DONE_CHANNEL = "gg:processor:done"
+PROCESSOR_DONE_STREAM = "gg:processor:done"
+PROCESSOR_REQUEST_QUEUE = "gg:processor:requests"
+PROCESSOR_WORKER_HEARTBEAT_KEY_PREFIX = "gg:processor:worker:heartbeat:"
+PROCESSOR_WORKER_HEARTBEAT_TTL = 10
+
+
+def get_redis(args, db: int) -> redis.Redis:
+    if args.socket:
+        return redis.Redis(unix_socket_path=args.socket, db=db)
+    return redis.Redis(host=args.host, port=args.port, db=db)
+
+
+def signal_done(args) -> None:
+    if not args.run_id or args.signal == "none":
+        return
+
+    r = get_redis(args, args.signal_db)
+    if args.signal == "key":
+        r.set(f"{PROCESSOR_DONE_KEY_PREFIX}{args.run_id}", "done", ex=3600)
+    elif args.signal == "pubsub":
+        r.publish(PROCESSOR_DONE_CHANNEL, args.run_id)
+    elif args.signal == "stream":
+        r.xadd(PROCESSOR_DONE_STREAM, {"run_id": args.run_id}, maxlen=1000, approximate=True)
+
+
+def process(args) -> int:
+    r = get_redis(args, args.db)
+    key_count = sum(1 for key in r.scan_iter("*", count=1000) if not key.startswith(STUB_KEY_PREFIX.encode()))
+    r.incr(f"{STUB_KEY_PREFIX}:run_count")
+    r.set(f"{STUB_KEY_PREFIX}:last_run", json.dumps({"key_count": key_count}))
+    return key_count
+
+
+def run_async_part(run_args) -> None:
+    time.sleep(run_args.async_delay)
+    process(run_args)
+    signal_done(run_args)
+
+
+def serve_requests(args, consumer: int, stop_event: threading.Event, run_counter: dict) -> None:
+    r = get_redis(args, args.signal_db)
+    heartbeat_key = f"{PROCESSOR_WORKER_HEARTBEAT_KEY_PREFIX}{os.getpid()}:{consumer}"
+    try:
+        while not stop_event.is_set():
+            r.set(heartbeat_key, os.getpid(), ex=PROCESSOR_WORKER_HEARTBEAT_TTL)
+            popped = r.brpop([PROCESSOR_REQUEST_QUEUE], timeout=1)
+            if popped is None:
+                continue
+
+            run_request = json.loads(popped[1])
+            if run_request["expires_at"] < time.time():
+                continue
+
+            run_args = argparse.Namespace(**{
+                **vars(args),
+                "port": run_request["redis_port"] or args.port,
+                "db": args.db if run_request["redis_db"] is None else run_request["redis_db"],
+                "run_id": run_request["run_id"],
+                "signal": run_request["signal"],
+                "signal_db": run_request["signal_db"],
+            })
+            start_time = time.perf_counter()
+            run_result = {"run_id": run_request["run_id"], "returncode": 0, "error": None, "run_seconds": None}
+            try:
+                if args.async_delay:
+                    threading.Thread(target=run_async_part, args=(run_args,), daemon=True).start()
+                else:
+                    process(run_args)
+                    signal_done(run_args)
+            except Exception as e:
+                run_result.update(returncode=1, error=str(e))
+            run_result["run_seconds"] = time.perf_counter() - start_time
+            r.lpush(run_request["reply_to"], json.dumps(run_result))
+            r.expire(run_request["reply_to"], 3600)
+            print(f"{'✅' if run_result['returncode'] == 0 else '❌'} {run_request['bookmark_id']} "
+                  f"(run {run_request['run_id']}, consumer {consumer})")
+
+            with run_counter["lock"]:
+                run_counter["count"] += 1
+                if args.max_runs and run_counter["count"] >= args.max_runs:
+                    stop_event.set()
+    finally:
+        r.delete(heartbeat_key)
+
+
+def serve(args) -> int:
+    stop_event = threading.Event()
+    run_counter = {"count": 0, "lock": threading.Lock()}
+    consumer_threads = [
+        threading.Thread(target=serve_requests, args=(args, consumer, stop_event, run_counter), daemon=True)
+        for consumer in range(max(1, args.consumers))
+    ]
+    for consumer_thread in consumer_threads:
+        consumer_thread.start()
+    print(f"✅ Stub processor: {len(consumer_threads)} workers listening on {PROCESSOR_REQUEST_QUEUE} (db {args.signal_db})")
+
+    try:
+        while any(consumer_thread.is_alive() for consumer_thread in consumer_threads):
+            for consumer_thread in consumer_threads:
+                consumer_thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        print("🛑 Stopping the stub processor workers")
+        stop_event.set()
+        for consumer_thread in consumer_threads:
+            consumer_thread.join(timeout=2)
+
+    print(f"✅ Stub processor served {run_counter['count']} runs")
+    # Workers that ended without being stopped died on an error (e.g. Redis went away)
+    return 0 if stop_event.is_set() else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stand-in for the game processor")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--db", type=int, default=0)
+    parser.add_argument("--socket", default=None)
+    parser.add_argument("--run-id", default=os.environ.get("GG_RUN_ID"))
+    parser.add_argument("--signal", default=os.environ.get("GG_COMPLETION_SIGNAL", "none"),
+                        choices=["none", "key", "pubsub", "stream"])
+    parser.add_argument("--signal-db", type=int, default=int(os.environ.get("GG_SIGNAL_DB", "15")))
+    parser.add_argument("--async-delay", type=float, default=0.0)
+    parser.add_argument("--async-part", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--consumers", type=int, default=1)
+    parser.add_argument("--max-runs", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args)
+
+    try:
+        if args.async_delay and not args.async_part:
+            # Return right away, and let a detached child do the "async" work.
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--async-part"],
+                start_new_session=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            print(f"✅ Stub processor started async work against db {args.db}")
+            return 0
+
+        if args.async_part:
+            time.sleep(args.async_delay)
+
+        key_count = process(args)
+        signal_done(args)
+    except Exception as e:
+        print(f"❌ Stub processor error: {e}")
+        return 1
+
+    print(f"✅ Stub processor ran against db {args.db} ({key_count} keys)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+import fnmatch
+import queue
+import threading
+import time
+
+
+def to_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+def parse_stream_id(stream_id):
+    milliseconds, sequence = to_bytes(stream_id).split(b"-")
+    return int(milliseconds), int(sequence)
+
+
+class FakeRedisServer:
+    """
+    In-memory stand-in for a Redis server, shared by the FakeRedis clients (one per DB) of every thread: strings,
+    lists (with blocking pops), pub/sub, and streams - just what the processor signal and queue code uses.
+    """
+
+    def __init__(self):
+        self.data_by_db = {}
+        self.pubsubs = []
+        self.condition = threading.Condition()
+
+    def client(self, db=0):
+        return FakeRedis(self, db)
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.channels = set()
+        self.messages = queue.Queue()
+        self.is_closed = False
+
+    def subscribe(self, channel):
+        with self.server.condition:
+            self.channels.add(to_bytes(channel))
+            self.server.pubsubs.append(self)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            return None
+
+    def close(self):
+        with self.server.condition:
+            if self in self.server.pubsubs:
+                self.server.pubsubs.remove(self)
+        self.is_closed = True
+
+
+class FakeRedis:
+    def __init__(self, server, db=0):
+        self.server = server
+        self.db = db
+
+    @property
+    def data(self):
+        return self.server.data_by_db.setdefault(self.db, {})
+
+    # Strings and keys
+
+    def set(self, key, value, ex=None):
+        with self.server.condition:
+            self.data[to_bytes(key)] = to_bytes(value)
+        return True
+
+    def get(self, key):
+        with self.server.condition:
+            return self.data.get(to_bytes(key))
+
+    def incr(self, key):
+        with self.server.condition:
+            value = int(self.data.get(to_bytes(key), b"0")) + 1
+            self.data[to_bytes(key)] = to_bytes(value)
+            return value
+
+    def exists(self, *keys):
+        with self.server.condition:
+            return sum(1 for key in keys if to_bytes(key) in self.data)
+
+    def delete(self, *keys):
+        with self.server.condition:
+            return sum(1 for key in keys if self.data.pop(to_bytes(key), None) is not None)
+
+    def expire(self, key, seconds):
+        return self.exists(key) == 1
+
+    def scan_iter(self, match=None, count=None):
+        with self.server.condition:
+            keys = list(self.data)
+        return iter([key for key in keys if match is None or fnmatch.fnmatchcase(key.decode(), match)])
+
+    # Lists
+
+    def lpush(self, key, *values):
+        with self.server.condition:
+            values_list = self.data.setdefault(to_bytes(key), [])
+            for value in values:
+                values_list.insert(0, to_bytes(value))
+            self.server.condition.notify_all()
+            return len(values_list)
+
+    def lrange(self, key, start, end):
+        with self.server.condition:
+            values_list = self.data.get(to_bytes(key), [])
+            return list(values_list[start:None if end == -1 else end + 1])
+
+    def lrem(self, key, count, value):
+        with self.server.condition:
+            values_list = self.data.get(to_bytes(key), [])
+            removed_count = 0
+            while to_bytes(value) in values_list and (count == 0 or removed_count < count):
+                values_list.remove(to_bytes(value))
+                removed_count += 1
+            if not values_list:
+                self.data.pop(to_bytes(key), None)
+            return removed_count
+
+    def blocking_pop(self, keys, timeout, index):
+        deadline = None if not timeout else time.monotonic() + timeout
+        with self.server.condition:
+            while True:
+                for key in keys:
+                    values_list = self.data.get(to_bytes(key))
+                    if values_list:
+                        value = values_list.pop(index)
+                        if not values_list:
+                            self.data.pop(to_bytes(key))
+                        return to_bytes(key), value
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.server.condition.wait(remaining)
+
+    def blpop(self, keys, timeout=0):
+        return self.blocking_pop(keys, timeout, 0)
+
+    def brpop(self, keys, timeout=0):
+        return self.blocking_pop(keys, timeout, -1)
+
+    # Pub/sub
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self.server)
+
+    def publish(self, channel, message):
+        with self.server.condition:
+            subscribers = [pubsub for pubsub in self.server.pubsubs if to_bytes(channel) in pubsub.channels]
+        for pubsub in subscribers:
+            pubsub.messages.put({"type": "message", "channel": to_bytes(channel), "data": to_bytes(message)})
+        return len(subscribers)
+
+    # Streams
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        with self.server.condition:
+            entries = self.data.setdefault(to_bytes(name), [])
+            milliseconds = int(time.time() * 1000)
+            if entries and parse_stream_id(entries[-1][0])[0] >= milliseconds:
+                milliseconds, sequence = parse_stream_id(entries[-1][0])
+                sequence += 1
+            else:
+                sequence = 0
+            entry_id = f"{milliseconds}-{sequence}".encode()
+            entries.append((entry_id, {to_bytes(field): to_bytes(value) for field, value in fields.items()}))
+            if maxlen:
+                del entries[:-maxlen]
+            self.server.condition.notify_all()
+            return entry_id
+
+    def xrevrange(self, name, max="+", min="-", count=None):
+        with self.server.condition:
+            entries = list(reversed(self.data.get(to_bytes(name), [])))
+        return entries[:count] if count else entries
+
+    def xread(self, streams, count=None, block=None):
+        deadline = None if block is None else time.monotonic() + block / 1000
+        with self.server.condition:
+            while True:
+                stream_entries = []
+                for name, last_id in streams.items():
+                    entries = [
+                        entry for entry in self.data.get(to_bytes(name), [])
+                        if parse_stream_id(entry[0]) > parse_stream_id(last_id)
+                    ]
+                    if entries:
+                        stream_entries.append([to_bytes(name), entries[:count] if count else entries])
+                if stream_entries or deadline is None:
+                    return stream_entries
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self.server.condition.wait(remaining)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.bookmarks.matching.bookmark_matching import find_bookmark_match_candidates
+from app.bookmarks.matching.matching_utils import (
+    build_bookmark_match_index,
+    find_bookmarks_by_exact_trailing_live_bm_path_parts,
+)
+
+LIVE_BOOKMARK_PATHS = [
+    "GRANDPARENT/PARENT/BOOKMARK",
+    "OTHER/PARENT/BOOKMARK",
+    "PARENT/BOOKMARK",
+    "GRANDPARENT/BOOKMARK",
+    "videos/0001_green_dog/01_intro",
+]
+
+
+def test_exact_path_matches_only_itself():
+    bookmark_match_index = build_bookmark_match_index(LIVE_BOOKMARK_PATHS)
+    assert find_bookmark_match_candidates("GRANDPARENT:PARENT:BOOKMARK", bookmark_match_index) == (
+        "exact", ["GRANDPARENT/PARENT/BOOKMARK"])
+    print("✅ test_exact_path_matches_only_itself passed.")
+
+
+def test_trailing_parts_match_in_library_order():
+    bookmark_match_index = build_bookmark_match_index(LIVE_BOOKMARK_PATHS)
+    assert find_bookmarks_by_exact_trailing_live_bm_path_parts("PARENT:BOOKMARK", bookmark_match_index) == [
+        "GRANDPARENT/PARENT/BOOKMARK", "OTHER/PARENT/BOOKMARK", "PARENT/BOOKMARK"]
+    assert find_bookmark_match_candidates("0001_green_dog:01_intro", bookmark_match_index) == (
+        "exact_trailing", ["videos/0001_green_dog/01_intro"])
+    print("✅ test_trailing_parts_match_in_library_order passed.")
+
+
+def test_substring_stages_after_exact_ones():
+    bookmark_match_index = build_bookmark_match_index(LIVE_BOOKMARK_PATHS)
+    assert find_bookmark_match_candidates("videos:green:intro", bookmark_match_index) == (
+        "substring", ["videos/0001_green_dog/01_intro"])
+    assert find_bookmark_match_candidates("green_dog:intro", bookmark_match_index) == (
+        "substring_trailing", ["videos/0001_green_dog/01_intro"])
+    print("✅ test_substring_stages_after_exact_ones passed.")
+
+
+def test_index_results_are_copies():
+    bookmark_match_index = build_bookmark_match_index(LIVE_BOOKMARK_PATHS)
+    find_bookmarks_by_exact_trailing_live_bm_path_parts("BOOKMARK", bookmark_match_index).clear()
+    assert len(find_bookmarks_by_exact_trailing_live_bm_path_parts("BOOKMARK", bookmark_match_index)) == 4
+    print("✅ test_index_results_are_copies passed.")
+
+
+if __name__ == "__main__":
+    test_exact_path_matches_only_itself()
+    test_trailing_parts_match_in_library_order()
+    test_substring_stages_after_exact_ones()
+    test_index_results_are_copies()
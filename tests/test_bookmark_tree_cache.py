@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.bookmarks.bookmarks_print import add_folder_stats_to_digest
+
+
+def get_folder_stats_digest(folder_path):
+    folder_stats_digest = hashlib.sha256()
+    add_folder_stats_to_digest(folder_path, folder_stats_digest)
+    return folder_stats_digest.hexdigest()
+
+
+def make_library(library_dir):
+    for bookmark_path in ["g1/m1/01", "g1/m1/02", "g1/m2/01"]:
+        os.makedirs(os.path.join(library_dir, bookmark_path))
+        with open(os.path.join(library_dir, bookmark_path, "bookmark_meta.json"), "w") as f:
+            json.dump({"description": ""}, f)
+
+
+def test_fingerprint_is_stable_without_changes():
+    with tempfile.TemporaryDirectory() as library_dir:
+        make_library(library_dir)
+        assert get_folder_stats_digest(library_dir) == get_folder_stats_digest(library_dir)
+    print("✅ test_fingerprint_is_stable_without_changes passed.")
+
+
+def test_fingerprint_sees_nested_bookmark_removed_by_hand():
+    with tempfile.TemporaryDirectory() as library_dir:
+        make_library(library_dir)
+        before = get_folder_stats_digest(library_dir)
+        shutil.rmtree(os.path.join(library_dir, "g1", "m2", "01"))
+        assert get_folder_stats_digest(library_dir) != before
+    print("✅ test_fingerprint_sees_nested_bookmark_removed_by_hand passed.")
+
+
+def test_fingerprint_sees_nested_bookmark_renamed_by_hand():
+    with tempfile.TemporaryDirectory() as library_dir:
+        make_library(library_dir)
+        before = get_folder_stats_digest(library_dir)
+        os.rename(os.path.join(library_dir, "g1", "m1", "02"), os.path.join(library_dir, "g1", "m1", "03"))
+        assert get_folder_stats_digest(library_dir) != before
+    print("✅ test_fingerprint_sees_nested_bookmark_renamed_by_hand passed.")
+
+
+def test_fingerprint_sees_meta_edited_in_place():
+    with tempfile.TemporaryDirectory() as library_dir:
+        make_library(library_dir)
+        before = get_folder_stats_digest(library_dir)
+        with open(os.path.join(library_dir, "g1", "m1", "01", "bookmark_meta.json"), "w") as f:
+            json.dump({"description": "edited by hand"}, f)
+        assert get_folder_stats_digest(library_dir) != before
+    print("✅ test_fingerprint_sees_meta_edited_in_place passed.")
+
+
+if __name__ == "__main__":
+    test_fingerprint_is_stable_without_changes()
+    test_fingerprint_sees_nested_bookmark_removed_by_hand()
+    test_fingerprint_sees_nested_bookmark_renamed_by_hand()
+    test_fingerprint_sees_meta_edited_in_place()
@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.utils.sorting_utils import natural_sort_key
+
+
+def test_digit_runs_compare_as_numbers():
+    names = ["m10", "m2", "10", "9", "clip_10", "clip_9"]
+    assert sorted(names, key=natural_sort_key) == ["9", "10", "clip_9", "clip_10", "m2", "m10"]
+    print("✅ test_digit_runs_compare_as_numbers passed.")
+
+
+def test_zero_padded_names_keep_a_stable_order():
+    assert sorted(["1", "01", "001"], key=natural_sort_key) == ["001", "01", "1"]
+    print("✅ test_zero_padded_names_keep_a_stable_order passed.")
+
+
+def test_non_decimal_digits_stay_text():
+    # "²".isdigit() is True, but int("²") raises
+    names = ["clip_1²", "clip_1", "clip_2"]
+    assert sorted(names, key=natural_sort_key) == ["clip_1", "clip_1²", "clip_2"]
+    print("✅ test_non_decimal_digits_stay_text passed.")
+
+
+if __name__ == "__main__":
+    test_digit_runs_compare_as_numbers()
+    test_zero_padded_names_keep_a_stable_order()
+    test_non_decimal_digits_stay_text()
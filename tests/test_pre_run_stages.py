@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.bookmarks.matching.handle_matched_bookmark_pre_processing import (
+    run_pre_run_stages_in_parallel,
+)
+
+
+def make_waiting_stage(seen, result=0):
+    """A stage that runs until it is cancelled (or gives up), and records whether it saw the cancel."""
+    seen["started"] = threading.Event()
+
+    def stage(cancel_event):
+        print("waiting stage started")
+        seen["started"].set()
+        seen["is_cancelled"] = cancel_event.wait(timeout=5)
+        return result
+
+    return stage
+
+
+def make_failing_stage(result, started=None):
+    """A stage that returns `result`, once the `started` stage is running (so that it isn't just cancelled)."""
+
+    def stage(cancel_event):
+        print("failing stage started")
+        if started:
+            started.wait(timeout=5)
+        return result
+
+    return stage
+
+
+def make_raising_stage(started):
+    def stage(cancel_event):
+        started.wait(timeout=5)
+        raise RuntimeError("OBS is not running")
+
+    return stage
+
+
+def run_stages(stages):
+    stdout = io.StringIO()
+    with redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+        result = run_pre_run_stages_in_parallel(stages)
+        assert sys.stdout is stdout
+    return result, stdout.getvalue()
+
+
+def test_all_stages_succeed():
+    result, output = run_stages({"Redis": make_failing_stage(0), "OBS": make_failing_stage(0)})
+    assert result == 0
+    # Each stage's output comes out in one block under its name
+    assert "── Redis ──\nfailing stage started\n" in output
+    assert "── OBS ──\nfailing stage started\n" in output
+    print("✅ test_all_stages_succeed passed.")
+
+
+def test_first_failure_decides_the_result():
+    seen = {}
+    waiting_stage = make_waiting_stage(seen, result=2)
+    result, output = run_stages({"Redis": make_failing_stage(3, seen["started"]), "OBS": waiting_stage})
+    assert result == 3
+    assert seen["is_cancelled"]
+    assert "❌ Error in Redis" in output
+    assert "🛑 OBS stopped after Redis failed" in output
+    print("✅ test_first_failure_decides_the_result passed.")
+
+
+def test_exception_maps_to_1_and_restores_stdout():
+    seen = {}
+    waiting_stage = make_waiting_stage(seen, result=5)
+    result, output = run_stages({"Redis": waiting_stage, "OBS": make_raising_stage(seen["started"])})
+    assert result == 1
+    assert seen["is_cancelled"]
+    assert "❌ Error in OBS: OBS is not running" in output
+    print("✅ test_exception_maps_to_1_and_restores_stdout passed.")
+
+
+if __name__ == "__main__":
+    test_all_stages_succeed()
+    test_first_failure_decides_the_result()
+    test_exception_maps_to_1_and_restores_stdout()
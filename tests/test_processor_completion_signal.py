@@ -0,0 +1,120 @@
+import argparse
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.consts.bookmarks_consts import (
+    PROCESSOR_DONE_KEY_PREFIX,
+    PROCESSOR_DONE_STREAM,
+    PROCESSOR_SIGNAL_DB,
+)
+from app.processor.processor_completion_signal import (
+    new_processor_run_id,
+    start_processor_completion_wait,
+    wait_for_processor_completion,
+)
+from standalone_utils import stub_game_processor
+from tests.fake_redis import FakeRedisServer
+
+SIGNALS = ["key", "pubsub", "stream"]
+
+
+@contextmanager
+def fake_signal_redis():
+    """The stub processor signals on the same fake Redis that we wait on."""
+    server = FakeRedisServer()
+    original_get_redis = stub_game_processor.get_redis
+    stub_game_processor.get_redis = lambda args, db: server.client(db)
+    try:
+        yield server.client(PROCESSOR_SIGNAL_DB)
+    finally:
+        stub_game_processor.get_redis = original_get_redis
+
+
+def signal_done(run_id, signal):
+    stub_game_processor.signal_done(argparse.Namespace(run_id=run_id, signal=signal, signal_db=PROCESSOR_SIGNAL_DB))
+
+
+def test_signal_after_wait_starts():
+    for signal in SIGNALS:
+        with fake_signal_redis() as r:
+            run_id = new_processor_run_id()
+            completion_wait = start_processor_completion_wait(r, run_id, signal)
+            threading.Timer(0.05, signal_done, args=(run_id, signal)).start()
+            assert wait_for_processor_completion(completion_wait, timeout=2) is not None, signal
+            if signal == "key":
+                assert not r.exists(f"{PROCESSOR_DONE_KEY_PREFIX}{run_id}")
+    print("✅ test_signal_after_wait_starts passed.")
+
+
+def test_signal_between_start_and_wait_is_not_missed():
+    # A fast processor signals before we block: start (subscribe / note the stream position) comes before the trigger.
+    for signal in SIGNALS:
+        with fake_signal_redis() as r:
+            run_id = new_processor_run_id()
+            completion_wait = start_processor_completion_wait(r, run_id, signal)
+            signal_done(run_id, signal)
+            assert wait_for_processor_completion(completion_wait, timeout=2) is not None, signal
+    print("✅ test_signal_between_start_and_wait_is_not_missed passed.")
+
+
+def test_other_runs_signals_are_ignored():
+    for signal in SIGNALS:
+        with fake_signal_redis() as r:
+            run_id = new_processor_run_id()
+            completion_wait = start_processor_completion_wait(r, run_id, signal)
+            signal_done(new_processor_run_id(), signal)
+            assert wait_for_processor_completion(completion_wait, timeout=0.2) is None, signal
+    print("✅ test_other_runs_signals_are_ignored passed.")
+
+
+def test_stale_key_is_cleared_on_start():
+    with fake_signal_redis() as r:
+        run_id = new_processor_run_id()
+        signal_done(run_id, "key")
+        completion_wait = start_processor_completion_wait(r, run_id, "key")
+        assert wait_for_processor_completion(completion_wait, timeout=0.2) is None
+    print("✅ test_stale_key_is_cleared_on_start passed.")
+
+
+def test_stream_entries_before_start_are_skipped():
+    with fake_signal_redis() as r:
+        run_id = new_processor_run_id()
+        # Left over from earlier runs, including one for this run id
+        signal_done(new_processor_run_id(), "stream")
+        signal_done(run_id, "stream")
+        stale_entry_id = r.xrevrange(PROCESSOR_DONE_STREAM, count=1)[0][0]
+
+        completion_wait = start_processor_completion_wait(r, run_id, "stream")
+        assert completion_wait["stream_last_id"] == stale_entry_id
+        assert wait_for_processor_completion(completion_wait, timeout=0.2) is None
+
+        completion_wait = start_processor_completion_wait(r, run_id, "stream")
+        signal_done(new_processor_run_id(), "stream")
+        signal_done(run_id, "stream")
+        assert wait_for_processor_completion(completion_wait, timeout=2) is not None
+        assert completion_wait["stream_last_id"] == r.xrevrange(PROCESSOR_DONE_STREAM, count=1)[0][0]
+    print("✅ test_stream_entries_before_start_are_skipped passed.")
+
+
+def test_timeout_returns_none_and_closes_the_wait():
+    for signal in SIGNALS:
+        with fake_signal_redis() as r:
+            completion_wait = start_processor_completion_wait(r, new_processor_run_id(), signal)
+            pubsub = completion_wait["pubsub"]
+            assert wait_for_processor_completion(completion_wait, timeout=0.1) is None, signal
+            assert completion_wait["pubsub"] is None
+            if signal == "pubsub":
+                assert pubsub.is_closed
+    print("✅ test_timeout_returns_none_and_closes_the_wait passed.")
+
+
+if __name__ == "__main__":
+    test_signal_after_wait_starts()
+    test_signal_between_start_and_wait_is_not_missed()
+    test_other_runs_signals_are_ignored()
+    test_stale_key_is_cleared_on_start()
+    test_stream_entries_before_start_are_skipped()
+    test_timeout_returns_none_and_closes_the_wait()
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.consts.bookmarks_consts import (
+    PROCESSOR_REQUEST_QUEUE,
+    PROCESSOR_SIGNAL_DB,
+    PROCESSOR_WORKER_HEARTBEAT_KEY_PREFIX,
+)
+from app.processor.processor_completion_signal import new_processor_run_id
+from app.processor.processor_queue import (
+    count_processor_workers,
+    is_processor_worker_alive,
+    new_processor_run_request,
+    run_processor_via_queue,
+)
+from standalone_utils import stub_game_processor
+from tests.fake_redis import FakeRedisServer
+
+SESSIONS_DB = 3
+
+
+@contextmanager
+def stub_processor_workers(consumers=1, max_runs=1):
+    """`stub_game_processor.py --serve --consumers N --max-runs M` against a fake Redis, in a thread."""
+    server = FakeRedisServer()
+    original_get_redis = stub_game_processor.get_redis
+    stub_game_processor.get_redis = lambda args, db: server.client(db)
+    args = argparse.Namespace(
+        host="localhost", port=6379, db=0, socket=None, run_id=None, signal="none", signal_db=PROCESSOR_SIGNAL_DB,
+        async_delay=0.0, async_part=False, serve=True, consumers=consumers, max_runs=max_runs)
+    serve_result = {}
+    serve_thread = threading.Thread(target=lambda: serve_result.update(returncode=stub_game_processor.serve(args)))
+    serve_thread.start()
+    try:
+        yield server, serve_thread, serve_result
+    finally:
+        serve_thread.join(timeout=10)
+        stub_game_processor.get_redis = original_get_redis
+
+
+def wait_for_workers(r, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while count_processor_workers(r) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return count_processor_workers(r)
+
+
+def test_run_round_trip():
+    with stub_processor_workers(max_runs=1) as (server, serve_thread, serve_result):
+        r = server.client(PROCESSOR_SIGNAL_DB)
+        run_id = new_processor_run_id()
+        run_request = new_processor_run_request(run_id, timeout=5, bookmark_id="folder:01 a", redis_db=SESSIONS_DB)
+        run_result = run_processor_via_queue(r, run_request, timeout=5)
+
+        assert run_result is not None
+        assert run_result["run_id"] == run_id
+        assert run_result["returncode"] == 0
+        assert run_result["error"] is None
+        # The worker ran against the request's DB, and the reply list is cleaned up
+        assert server.client(SESSIONS_DB).get(f"{stub_game_processor.STUB_KEY_PREFIX}:run_count") == b"1"
+        assert not r.exists(run_request["reply_to"])
+
+        serve_thread.join(timeout=5)
+        assert serve_result["returncode"] == 0
+    print("✅ test_run_round_trip passed.")
+
+
+def test_unanswered_request_is_taken_off_the_queue():
+    server = FakeRedisServer()
+    r = server.client(PROCESSOR_SIGNAL_DB)
+    run_request = new_processor_run_request(new_processor_run_id(), timeout=1)
+    assert run_processor_via_queue(r, run_request, timeout=1) is None
+    assert r.lrange(PROCESSOR_REQUEST_QUEUE, 0, -1) == []
+    print("✅ test_unanswered_request_is_taken_off_the_queue passed.")
+
+
+def test_expired_request_is_skipped():
+    with stub_processor_workers(max_runs=1) as (server, serve_thread, serve_result):
+        r = server.client(PROCESSOR_SIGNAL_DB)
+        # Queued by a run that has stopped waiting: the worker drops it and serves the next one
+        expired_run_request = new_processor_run_request(new_processor_run_id(), timeout=5, redis_db=SESSIONS_DB)
+        expired_run_request["expires_at"] = time.time() - 1
+        r.lpush(PROCESSOR_REQUEST_QUEUE, json.dumps(expired_run_request))
+
+        run_request = new_processor_run_request(new_processor_run_id(), timeout=5, redis_db=SESSIONS_DB)
+        run_result = run_processor_via_queue(r, run_request, timeout=5)
+        assert run_result is not None and run_result["run_id"] == run_request["run_id"]
+
+        serve_thread.join(timeout=5)
+        assert not r.exists(expired_run_request["reply_to"])
+        assert server.client(SESSIONS_DB).get(f"{stub_game_processor.STUB_KEY_PREFIX}:run_count") == b"1"
+    print("✅ test_expired_request_is_skipped passed.")
+
+
+def test_worker_heartbeats_are_counted():
+    server = FakeRedisServer()
+    r = server.client(PROCESSOR_SIGNAL_DB)
+    assert count_processor_workers(r) == 0
+    assert not is_processor_worker_alive(r)
+    r.set("gg:processor:done:123", "done")
+    assert count_processor_workers(r) == 0
+    r.set(f"{PROCESSOR_WORKER_HEARTBEAT_KEY_PREFIX}1234:0", 1234)
+    assert count_processor_workers(r) == 1
+    assert is_processor_worker_alive(r)
+    print("✅ test_worker_heartbeats_are_counted passed.")
+
+
+def test_stub_workers_heartbeat_until_stopped():
+    with stub_processor_workers(consumers=2, max_runs=1) as (server, serve_thread, serve_result):
+        r = server.client(PROCESSOR_SIGNAL_DB)
+        assert wait_for_workers(r, 2) == 2
+        assert is_processor_worker_alive(r)
+
+        run_request = new_processor_run_request(new_processor_run_id(), timeout=5, redis_db=SESSIONS_DB)
+        assert run_processor_via_queue(r, run_request, timeout=5) is not None
+        serve_thread.join(timeout=5)
+        assert not serve_thread.is_alive()
+        assert count_processor_workers(r) == 0
+        assert not is_processor_worker_alive(r)
+    print("✅ test_stub_workers_heartbeat_until_stopped passed.")
+
+
+if __name__ == "__main__":
+    test_run_round_trip()
+    test_unanswered_request_is_taken_off_the_queue()
+    test_expired_request_is_skipped()
+    test_worker_heartbeats_are_counted()
+    test_stub_workers_heartbeat_until_stopped()
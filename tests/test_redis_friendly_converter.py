@@ -0,0 +1,117 @@
+import io
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.bookmarks.redis_states import redis_friendly_converter
+from app.bookmarks.redis_states.redis_friendly_converter import (
+    convert_friendly_to_redis,
+    get_friendly_redis_state_view,
+    iter_flat_redis_state_items,
+    write_friendly_redis_state_data_stream,
+    write_friendly_redis_state_stream,
+)
+
+
+def to_friendly_from_data(redis_data):
+    output_stream = io.StringIO()
+    write_friendly_redis_state_data_stream(redis_data, output_stream)
+    return json.loads(output_stream.getvalue())
+
+
+def to_friendly_from_file(redis_data):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        redis_state_path = os.path.join(tmp_dir, "redis_before.json")
+        with open(redis_state_path, "w") as f:
+            json.dump(redis_data, f, indent=2)
+        output_stream = io.StringIO()
+        write_friendly_redis_state_stream(redis_state_path, output_stream)
+        return json.loads(output_stream.getvalue())
+
+
+def assert_round_trip(redis_data):
+    for to_friendly in (to_friendly_from_data, to_friendly_from_file):
+        friendly_data = to_friendly(redis_data)
+        assert convert_friendly_to_redis(friendly_data, set(redis_data)) == redis_data
+
+
+def test_round_trip():
+    redis_data = {
+        "game:marvel_rivals:folder": "videos",
+        "game:marvel_rivals:settings": {"volume": 3, "nested": {"a": [1, 2]}},
+        "session": "1",
+        "empty": {},
+    }
+    assert to_friendly_from_data(redis_data)["game"]["marvel_rivals"]["folder"] == "videos"
+    assert_round_trip(redis_data)
+    print("✅ test_round_trip passed.")
+
+
+def test_prefix_conflicting_keys_in_either_order():
+    for redis_data in ({"a": "1", "a:c": "2"}, {"a:c": "2", "a": "1"}):
+        friendly_data = to_friendly_from_data(redis_data)
+        assert friendly_data == {"a": {"": "1", "c": "2"}}
+        assert_round_trip(redis_data)
+        # Without a reference, the "" leaf still goes back to its parent key
+        assert convert_friendly_to_redis(friendly_data) == {"a": "1", "a:c": "2"}
+
+    assert_round_trip({"a": {"x": 1}, "a:b:c": 2, "a:b": 3, "b::c": 4})
+    print("✅ test_prefix_conflicting_keys_in_either_order passed.")
+
+
+def test_large_input_is_streamed_in_chunks():
+    redis_data = {
+        f"game:{game_index}:mission:{mission_index}": {"progress": mission_index, "text": "x" * (mission_index % 50)}
+        for game_index in range(40)
+        for mission_index in range(250)
+    }
+    redis_data.update({f"game:{game_index}": game_index for game_index in range(40)})
+
+    original_chunk_size = redis_friendly_converter.STREAM_CHUNK_SIZE
+    redis_friendly_converter.STREAM_CHUNK_SIZE = 64
+    try:
+        assert dict(iter_flat_redis_state_items(io.StringIO(json.dumps(redis_data, indent=2)))) == redis_data
+        assert_round_trip(redis_data)
+    finally:
+        redis_friendly_converter.STREAM_CHUNK_SIZE = original_chunk_size
+    print("✅ test_large_input_is_streamed_in_chunks passed.")
+
+
+def test_cached_view_of_a_replaced_state_is_dropped():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        original_cache_dir = redis_friendly_converter.FRIENDLY_REDIS_STATES_CACHE_DIR
+        original_index_path = redis_friendly_converter.FRIENDLY_REDIS_STATES_CACHE_INDEX_PATH
+        redis_friendly_converter.FRIENDLY_REDIS_STATES_CACHE_DIR = os.path.join(tmp_dir, ".friendly")
+        redis_friendly_converter.FRIENDLY_REDIS_STATES_CACHE_INDEX_PATH = os.path.join(tmp_dir, ".friendly", "sources.json")
+        try:
+            redis_state_paths = [os.path.join(tmp_dir, name) for name in ("redis_before.json", "redis_after.json")]
+            for redis_state_path in redis_state_paths:
+                with open(redis_state_path, "w") as f:
+                    json.dump({"a:b": 1}, f)
+            first_view_path = get_friendly_redis_state_view(redis_state_paths[0])
+            assert get_friendly_redis_state_view(redis_state_paths[1]) == first_view_path
+
+            # Still the other state's view
+            with open(redis_state_paths[0], "w") as f:
+                json.dump({"a:b": 2}, f)
+            second_view_path = get_friendly_redis_state_view(redis_state_paths[0])
+            assert os.path.exists(first_view_path) and os.path.exists(second_view_path)
+
+            with open(redis_state_paths[1], "w") as f:
+                json.dump({"a:b": 3}, f)
+            get_friendly_redis_state_view(redis_state_paths[1])
+            assert not os.path.exists(first_view_path)
+            assert len(os.listdir(redis_friendly_converter.FRIENDLY_REDIS_STATES_CACHE_DIR)) == 3  # 2 views, the index
+        finally:
+            redis_friendly_converter.FRIENDLY_REDIS_STATES_CACHE_DIR = original_cache_dir
+            redis_friendly_converter.FRIENDLY_REDIS_STATES_CACHE_INDEX_PATH = original_index_path
+    print("✅ test_cached_view_of_a_replaced_state_is_dropped passed.")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_prefix_conflicting_keys_in_either_order()
+    test_large_input_is_streamed_in_chunks()
+    test_cached_view_of_a_replaced_state_is_dropped()
@@ -0,0 +1,154 @@
+import contextlib
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.bookmarks.redis_states import redis_state_storage
+from app.bookmarks.redis_states.redis_state_storage import (
+    is_redis_state_delta,
+    is_redis_state_delta_folder,
+    load_redis_state_file,
+    read_stored_redis_state,
+    save_redis_state_file,
+)
+
+
+@contextlib.contextmanager
+def delta_library(storage_mode="delta", keyframe_interval=8):
+    """A temporary folder of bookmarks, with the storage module pointed at it."""
+    patched = {
+        "REDIS_STATE_STORAGE_MODE": storage_mode,
+        "REDIS_STATE_DELTA_KEYFRAME_INTERVAL": keyframe_interval,
+        "REDIS_STATE_COMPRESSION": "none",
+    }
+    with tempfile.TemporaryDirectory() as library_dir:
+        patched["REDIS_STATE_OBJECTS_DIR"] = os.path.join(library_dir, ".objects")
+        originals = {name: getattr(redis_state_storage, name) for name in patched}
+        for name, value in patched.items():
+            setattr(redis_state_storage, name, value)
+        try:
+            folder_path = os.path.join(library_dir, "videos", "m1")
+            os.makedirs(folder_path)
+            yield folder_path
+        finally:
+            for name, value in originals.items():
+                setattr(redis_state_storage, name, value)
+
+
+def make_bookmark(folder_path, bookmark_name):
+    bookmark_path = os.path.join(folder_path, bookmark_name)
+    os.makedirs(bookmark_path)
+    with open(os.path.join(bookmark_path, "bookmark_meta.json"), "w") as f:
+        json.dump({"timestamp": "00:01"}, f)
+    return os.path.join(bookmark_path, "redis_after.json")
+
+
+def make_state(step):
+    state = {f"key:{index}": {"value": index} for index in range(20)}
+    state["step"] = step
+    return state
+
+
+def test_siblings_are_chained_as_deltas():
+    with delta_library() as folder_path:
+        states = {name: make_state(step) for step, name in enumerate(["01", "02", "03"])}
+        paths = {name: make_bookmark(folder_path, name) for name in states}
+        for name, state in states.items():
+            save_redis_state_file(paths[name], state)
+
+        assert not is_redis_state_delta(read_stored_redis_state(paths["01"]))
+        stored_03 = read_stored_redis_state(paths["03"])
+        assert is_redis_state_delta(stored_03)
+        assert stored_03["base"] == os.path.join("..", "02", "redis_after.json")
+        assert stored_03["chain_length"] == 2
+        for name, state in states.items():
+            assert load_redis_state_file(paths[name]) == state
+    print("✅ test_siblings_are_chained_as_deltas passed.")
+
+
+def test_previous_sibling_is_picked_in_natural_order():
+    with delta_library() as folder_path:
+        paths = {name: make_bookmark(folder_path, name) for name in ["9", "10"]}
+        save_redis_state_file(paths["9"], make_state(9))
+        save_redis_state_file(paths["10"], make_state(10))
+        assert read_stored_redis_state(paths["10"])["base"] == os.path.join("..", "9", "redis_after.json")
+    print("✅ test_previous_sibling_is_picked_in_natural_order passed.")
+
+
+def test_keyframe_every_interval():
+    with delta_library(keyframe_interval=3) as folder_path:
+        names = ["01", "02", "03", "04"]
+        paths = {name: make_bookmark(folder_path, name) for name in names}
+        for step, name in enumerate(names):
+            save_redis_state_file(paths[name], make_state(step))
+
+        chain_lengths = [redis_state_storage.get_delta_chain_length(read_stored_redis_state(paths[name])) for name in names]
+        assert chain_lengths == [0, 1, 2, 0]
+        assert load_redis_state_file(paths["04"]) == make_state(3)
+    print("✅ test_keyframe_every_interval passed.")
+
+
+def test_overwritten_base_rebases_its_dependents():
+    with delta_library() as folder_path:
+        names = ["01", "02", "03"]
+        paths = {name: make_bookmark(folder_path, name) for name in names}
+        for step, name in enumerate(names):
+            save_redis_state_file(paths[name], make_state(step))
+
+        save_redis_state_file(paths["01"], make_state(100))
+
+        assert not is_redis_state_delta(read_stored_redis_state(paths["02"]))
+        assert load_redis_state_file(paths["01"]) == make_state(100)
+        assert load_redis_state_file(paths["02"]) == make_state(1)
+        assert load_redis_state_file(paths["03"]) == make_state(2)
+    print("✅ test_overwritten_base_rebases_its_dependents passed.")
+
+
+def test_base_edited_by_hand_is_rebuilt():
+    with delta_library() as folder_path:
+        paths = {name: make_bookmark(folder_path, name) for name in ["01", "02"]}
+        save_redis_state_file(paths["01"], make_state(0))
+        save_redis_state_file(paths["02"], make_state(1))
+
+        edited_state = make_state(0)
+        edited_state["key:3"] = {"value": "edited"}
+        del edited_state["key:4"]
+        with open(paths["01"], "w") as f:
+            json.dump(edited_state, f)
+
+        assert load_redis_state_file(paths["02"]) == make_state(1)
+    print("✅ test_base_edited_by_hand_is_rebuilt passed.")
+
+
+def test_base_removed_by_hand_is_rebuilt():
+    with delta_library() as folder_path:
+        paths = {name: make_bookmark(folder_path, name) for name in ["01", "02"]}
+        save_redis_state_file(paths["01"], make_state(0))
+        save_redis_state_file(paths["02"], make_state(1))
+
+        os.remove(paths["01"])
+
+        assert load_redis_state_file(paths["02"]) == make_state(1)
+    print("✅ test_base_removed_by_hand_is_rebuilt passed.")
+
+
+def test_json_mode_folders_are_not_scanned_for_deltas():
+    with delta_library(storage_mode="json") as folder_path:
+        paths = {name: make_bookmark(folder_path, name) for name in ["01", "02"]}
+        save_redis_state_file(paths["01"], make_state(0))
+        save_redis_state_file(paths["02"], make_state(1))
+        assert not is_redis_state_delta_folder(folder_path)
+        assert not is_redis_state_delta(read_stored_redis_state(paths["02"]))
+    print("✅ test_json_mode_folders_are_not_scanned_for_deltas passed.")
+
+
+if __name__ == "__main__":
+    test_siblings_are_chained_as_deltas()
+    test_previous_sibling_is_picked_in_natural_order()
+    test_keyframe_every_interval()
+    test_overwritten_base_rebases_its_dependents()
+    test_base_edited_by_hand_is_rebuilt()
+    test_base_removed_by_hand_is_rebuilt()
+    test_json_mode_folders_are_not_scanned_for_deltas()
@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.bookmarks.redis_states.redis_state_diff import (
+    diff_redis_state_key_hashes,
+    get_redis_state_data_key_hashes,
+    is_redis_state_diff_empty,
+)
+
+
+def diff_redis_state_data(before_data, after_data, ignored_key_patterns=None, read_keys=None):
+    before_hashes, get_before_value = get_redis_state_data_key_hashes(before_data)
+    after_hashes, get_after_value = get_redis_state_data_key_hashes(after_data)
+
+    def track(get_value):
+        def get_tracked_value(key):
+            if read_keys is not None:
+                read_keys.append(key)
+            return get_value(key)
+        return get_tracked_value
+
+    return diff_redis_state_key_hashes(
+        before_hashes, track(get_before_value), after_hashes, track(get_after_value), ignored_key_patterns)
+
+
+def test_only_changed_keys_are_read():
+    before_data = {f"session:{i}": {"hp": i} for i in range(100)}
+    after_data = {**before_data, "session:7": {"hp": 70}, "session:new": {"hp": 1}}
+    del after_data["session:9"]
+
+    read_keys = []
+    state_diff = diff_redis_state_data(before_data, after_data, read_keys=read_keys)
+    assert state_diff["added"] == {"session:new": {"hp": 1}}
+    assert state_diff["removed"] == {"session:9": {"hp": 9}}
+    assert state_diff["changed"] == {"session:7": [{"path": ["hp"], "op": "changed", "before": 7, "after": 70}]}
+    assert sorted(read_keys) == ["session:7", "session:7", "session:9", "session:new"]
+    print("✅ test_only_changed_keys_are_read passed.")
+
+
+def test_reordered_dicts_are_not_changes():
+    state_diff = diff_redis_state_data({"a": {"x": 1, "y": 2}}, {"a": {"y": 2, "x": 1}})
+    assert is_redis_state_diff_empty(state_diff) and state_diff["ignored"] == 0
+    print("✅ test_reordered_dicts_are_not_changes passed.")
+
+
+def test_ignored_keys_and_value_paths():
+    before_data = {"session:1": {"hp": 1, "updated_at": 10}, "gateway_listener_test": 1}
+    after_data = {"session:1": {"hp": 1, "updated_at": 11}, "gateway_listener_test": 2}
+    state_diff = diff_redis_state_data(before_data, after_data, ["*gateway_listener_test*", "session:*.updated_at"])
+    assert is_redis_state_diff_empty(state_diff) and state_diff["ignored"] == 2
+
+    state_diff = diff_redis_state_data(before_data, after_data)
+    assert set(state_diff["changed"]) == {"session:1", "gateway_listener_test"}
+    print("✅ test_ignored_keys_and_value_paths passed.")
+
+
+if __name__ == "__main__":
+    test_only_changed_keys_are_read()
+    test_reordered_dicts_are_not_changes()
+    test_ignored_keys_and_value_paths()
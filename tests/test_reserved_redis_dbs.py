@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.bookmarks.redis_states.redis_state_handlers import (
+    handle_validate_reserved_redis_dbs as validation,
+)
+
+
+class FakeConnectionPool:
+    connection_kwargs = {"host": "localhost", "port": 6379}
+
+
+class FakeRedis:
+    """Just enough of a redis client for the reserved DB checks: DB number -> list of keys."""
+
+    def __init__(self, keys_by_db, db, database_count):
+        self.keys_by_db = keys_by_db
+        self.db = db
+        self.database_count = database_count
+        self.connection_pool = FakeConnectionPool()
+
+    def config_get(self, name):
+        return {"databases": str(self.database_count)}
+
+    def dbsize(self):
+        return len(self.keys_by_db.get(self.db, []))
+
+    def scan_iter(self, count=None):
+        return iter(self.keys_by_db.get(self.db, []))
+
+
+@contextmanager
+def fake_sessions_redis(keys_by_db, database_count=16):
+    original_get_redis_client = validation.get_redis_client
+    original_claims_path = validation.RESERVED_REDIS_DBS_CLAIMS_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        validation.get_redis_client = lambda db=0: FakeRedis(keys_by_db, db, database_count)
+        validation.RESERVED_REDIS_DBS_CLAIMS_PATH = os.path.join(tmp_dir, "reserved_redis_dbs.json")
+        try:
+            yield
+        finally:
+            validation.get_redis_client = original_get_redis_client
+            validation.RESERVED_REDIS_DBS_CLAIMS_PATH = original_claims_path
+
+
+def test_empty_dbs_are_claimed_then_stay_usable():
+    keys_by_db = {0: [b"session:1"]}
+    with fake_sessions_redis(keys_by_db):
+        assert validation.handle_validate_reserved_redis_dbs([4, 5]) == 0
+        # Once claimed, bm's own leftovers don't count as foreign data
+        keys_by_db[4] = [b"session:1"]
+        assert validation.handle_validate_reserved_redis_dbs([4, 5]) == 0
+    print("✅ test_empty_dbs_are_claimed_then_stay_usable passed.")
+
+
+def test_unclaimed_db_with_data_is_refused():
+    with fake_sessions_redis({5: [b"someone_else:1"]}):
+        assert validation.handle_validate_reserved_redis_dbs([4, 5]) == 1
+    print("✅ test_unclaimed_db_with_data_is_refused passed.")
+
+
+def test_too_few_databases_and_overlaps_are_refused():
+    with fake_sessions_redis({}, database_count=4):
+        assert validation.handle_validate_reserved_redis_dbs([]) == 0
+        assert validation.handle_validate_reserved_redis_dbs([4]) == 1
+    with fake_sessions_redis({}):
+        assert validation.handle_validate_reserved_redis_dbs([validation.LOCAL_REDIS_STAGING_DB]) == 1
+        assert validation.handle_validate_reserved_redis_dbs([validation.LOCAL_REDIS_SESSIONS_DB]) == 1
+    print("✅ test_too_few_databases_and_overlaps_are_refused passed.")
+
+
+if __name__ == "__main__":
+    test_empty_dbs_are_claimed_then_stay_usable()
+    test_unclaimed_db_with_data_is_refused()
+    test_too_few_databases_and_overlaps_are_refused()
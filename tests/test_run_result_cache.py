@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.bookmarks.redis_states import run_result_cache
+from app.types.bookmark_types import default_processed_flags
+
+
+@contextmanager
+def shared_before_state():
+    """Two sibling bookmarks whose runs load the same before-state file."""
+    original_determine_origin = run_result_cache.determine_origin_bm_redis_state_path_from_context
+    original_get_processor_version = run_result_cache.get_processor_version
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        redis_before_path = os.path.join(tmp_dir, "redis_before.json")
+        with open(redis_before_path, "w") as f:
+            json.dump({"session:1": {"score": 1}}, f)
+        run_result_cache.determine_origin_bm_redis_state_path_from_context = lambda *args: redis_before_path
+        run_result_cache.get_processor_version = lambda: "abc123"
+        try:
+            yield tmp_dir
+        finally:
+            run_result_cache.determine_origin_bm_redis_state_path_from_context = original_determine_origin
+            run_result_cache.get_processor_version = original_get_processor_version
+
+
+def make_bookmark(tmp_dir, name, video_filename=None, timestamp=None):
+    bookmark_path_slash_abs = os.path.join(tmp_dir, "folder", name)
+    os.makedirs(bookmark_path_slash_abs)
+    if video_filename:
+        with open(os.path.join(bookmark_path_slash_abs, "bookmark_meta.json"), "w") as f:
+            json.dump({"video_filename": video_filename, "timestamp": timestamp}, f)
+    return {
+        "bookmark_path_slash_abs": bookmark_path_slash_abs,
+        "bookmark_path_colon_rel": f"folder:{name}",
+    }
+
+
+def get_run_cache_key(matched_bookmark_obj, **settings):
+    current_run_settings_obj = {**default_processed_flags, **settings, "current_bookmark_obj": matched_bookmark_obj}
+    return run_result_cache.get_run_cache_key(current_run_settings_obj)
+
+
+def test_same_before_state_different_media_do_not_collide():
+    with shared_before_state() as tmp_dir:
+        first = make_bookmark(tmp_dir, "01 a", "game.mkv", 10.0)
+        second = make_bookmark(tmp_dir, "02 b", "game.mkv", 42.5)
+        third = make_bookmark(tmp_dir, "03 c", "other.mkv", 10.0)
+        run_cache_keys = {get_run_cache_key(bookmark) for bookmark in (first, second, third)}
+        assert None not in run_cache_keys
+        assert len(run_cache_keys) == 3
+        # The same frame in another bookmark is the same run
+        assert get_run_cache_key(make_bookmark(tmp_dir, "04 d", "game.mkv", 10.0)) == get_run_cache_key(first)
+    print("✅ test_same_before_state_different_media_do_not_collide passed.")
+
+
+def test_bookmarks_without_media_info_do_not_collide():
+    with shared_before_state() as tmp_dir:
+        first = make_bookmark(tmp_dir, "01 a")
+        second = make_bookmark(tmp_dir, "02 b")
+        assert get_run_cache_key(first) != get_run_cache_key(second)
+    print("✅ test_bookmarks_without_media_info_do_not_collide passed.")
+
+
+def test_no_obs_runs_share_the_before_state_key():
+    with shared_before_state() as tmp_dir:
+        first = make_bookmark(tmp_dir, "01 a", "game.mkv", 10.0)
+        second = make_bookmark(tmp_dir, "02 b", "game.mkv", 42.5)
+        assert get_run_cache_key(first, is_no_obs=True) == get_run_cache_key(second, is_no_obs=True)
+        assert get_run_cache_key(first, is_no_obs=True) != get_run_cache_key(first)
+    print("✅ test_no_obs_runs_share_the_before_state_key passed.")
+
+
+if __name__ == "__main__":
+    test_same_before_state_different_media_do_not_collide()
+    test_bookmarks_without_media_info_do_not_collide()
+    test_no_obs_runs_share_the_before_state_key()